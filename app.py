@@ -3,7 +3,13 @@ from components.sidebar import render_sidebar
 from components.upload import render_upload_dropzone
 from components.overview import render_overview
 from components.market_drilldown import render_market_drilldown
+from components.airport_pack import render_airport_pack_download
+from components.network_heatmap import render_network_heatmap
+from components.compare import render_compare
+from components.diagnostics import render_diagnostics
 from styles.custom import apply_custom_styles
+from utils.query_service import start_query_service
+from utils.render_timing import begin_rerun, diagnostics_enabled
 
 # Page configuration
 st.set_page_config(
@@ -13,6 +19,16 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Local JSON query service – one per server process, shared by all sessions
+@st.cache_resource
+def _query_service():
+    return start_query_service()
+
+_query_service()
+
+# Number this rerun for the per-component render timings
+begin_rerun()
+
 # Initialize session state variables if they don't exist
 if "file_processed" not in st.session_state:
     st.session_state.file_processed = False
@@ -90,6 +106,13 @@ section[data-testid="stSidebar"] {
     max-width:60px !important; 
     z-index: 1000; 
 }
+section[data-testid="stSidebar"][aria-expanded="true"] {
+    min-width: 300px !important;
+    max-width: 300px !important;
+}
+section[data-testid="stSidebar"][aria-expanded="true"] * {
+    color: #F6F9FC;
+}
 </style>
 """
 st.markdown(global_css, unsafe_allow_html=True)
@@ -107,12 +130,22 @@ with st.container():
         st.session_state.show_tabs = True
         st.toast("File uploaded successfully!", icon="🎉")
 
-if st.session_state.get("show_tabs", False):
-    tabs = st.tabs(["Overview", "Market Drill-down"]) 
+# Tabs appear once the background job has published its results
+if st.session_state.get("show_tabs", False) and st.session_state.get("data"):
+    tabs = st.tabs(["Overview", "Market Drill-down", "Network Heatmap", "Compare"])
     with tabs[0]:
         render_overview()
     with tabs[1]:
+        render_airport_pack_download()
         render_market_drilldown()
+    with tabs[2]:
+        render_network_heatmap()
+    with tabs[3]:
+        render_compare()
+
+# Per-component render timings (?diagnostics=1)
+if diagnostics_enabled():
+    render_diagnostics()
 
 # The previously misplaced session state initializations at the end of the script
 # have been removed, as they are now correctly handled at the top.
\ No newline at end of file
@@ -0,0 +1,54 @@
+import pandas as pd
+import streamlit as st
+
+from utils.airport_pack import PACK_FORMATS, build_airport_pack
+from utils.date_index import session_scoped_data
+from utils.metrics import DEFAULT_METRIC, metric_label
+from utils.prime_windows import PrimeWindowParams, cached_prime_windows_by_airport, session_prime_params
+from utils.render_timing import timed_render
+
+FORMAT_LABELS = {"xlsx": "Excel workbooks", "csv": "CSV files"}
+
+
+@st.cache_data(show_spinner=False)
+def cached_airport_pack(
+    dataset_key: str, params: PrimeWindowParams, fmt: str, value_name: str, _matrix: pd.DataFrame
+) -> bytes:
+    windows = cached_prime_windows_by_airport(dataset_key, params, _matrix)
+    return build_airport_pack(_matrix, windows, fmt, value_name)
+
+
+@timed_render
+def render_airport_pack_download() -> None:
+    """'Download airport pack': one workbook (or CSV folder) per airport, zipped, built on request."""
+    data = session_scoped_data(st.session_state.get("data", {}))
+    matrix: pd.DataFrame | None = data.get("airport_hour_matrix")
+    dataset_key = data.get("dataset_key")
+    if matrix is None or matrix.empty or not dataset_key:
+        return
+
+    fmt_col, action_col = st.columns([2, 3])
+    with fmt_col:
+        fmt = st.radio(
+            "Airport pack format", PACK_FORMATS, format_func=FORMAT_LABELS.get,
+            horizontal=True, key="airport_pack_format",
+        )
+    # the pack follows the sidebar's prime window parameters
+    request = (dataset_key, session_prime_params(), fmt)
+    with action_col:
+        if st.session_state.get("airport_pack_request") != request:
+            st.caption(f"Hourly table, top 10 hours and prime windows for each of {len(matrix)} airports.")
+            if st.button("Prepare airport pack"):
+                st.session_state.airport_pack_request = request
+                st.rerun()
+        else:
+            with st.spinner("Building airport pack…"):
+                value_name = f"Total_{metric_label(data.get('metric', DEFAULT_METRIC))}"
+                pack = cached_airport_pack(dataset_key, request[1], fmt, value_name, matrix)
+            today_str = pd.Timestamp.now().strftime("%Y-%m-%d")
+            st.download_button(
+                label="Download Airport Pack",
+                data=pack,
+                file_name=f"Airport_Pack_{today_str}.zip",
+                mime="application/zip",
+            )
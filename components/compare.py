@@ -0,0 +1,224 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from components.market_drilldown import format_hour, make_market_label, vertical_spacer
+from utils.compressed_upload import UPLOAD_TYPES
+from utils.compare import compare_cubes, compare_prime_windows
+from utils.data_processing import estimate_processing_memory, process_file, upload_dataset_key
+from utils.dataset_registry import get_dataset, list_datasets
+from utils.jobs import queue_position, release_job, submit_job
+from utils.prime_windows import PrimeWindowParams, cached_prime_windows_by_airport, session_prime_params
+from utils.render_timing import timed_render
+from utils.schema import SchemaError, validate_upload
+
+UPLOAD_OPTION = "Upload another report…"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Cached computations (keyed by dataset key – matrices are not hashed)
+# ──────────────────────────────────────────────────────────────────────────────
+@st.cache_data(show_spinner=False)
+def cached_comparison(
+    baseline_key: str, current_key: str, params: PrimeWindowParams, _baseline: dict, _current: dict
+) -> dict:
+    result = compare_cubes(_baseline["airport_hour_matrix"], _current["airport_hour_matrix"])
+    result["windows"] = compare_prime_windows(
+        cached_prime_windows_by_airport(baseline_key, params, _baseline["airport_hour_matrix"]),
+        cached_prime_windows_by_airport(current_key, params, _current["airport_hour_matrix"]),
+    )
+    return result
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ──────────────────────────────────────────────────────────────────────────────
+def _dataset_label(meta: dict) -> str:
+    mode = "local time" if meta.get("local_time") else "EST"
+    if meta.get("compact"):
+        mode += " · compact"
+    return f"{meta.get('name') or 'report'} · {meta['processed_at']} · {mode} · {meta['key'][:8]}"
+
+
+def _windows_text(windows: tuple) -> str:
+    return ", ".join(f"{format_hour(s)} – {format_hour(e)}" for s, e in windows) or "–"
+
+
+def _top_hour_text(baseline_hour, current_hour, moved: bool) -> str:
+    if pd.isna(current_hour):
+        return "dropped"
+    if pd.isna(baseline_hour):
+        return f"{format_hour(current_hour)} (new)"
+    return f"{format_hour(baseline_hour)} → {format_hour(current_hour)}" if moved else format_hour(current_hour)
+
+
+def _select_baseline(current_key: str) -> dict | None:
+    """Pick the baseline dataset from the registry or from a second upload."""
+    others = [m for m in list_datasets() if m["key"] != current_key]
+    labels = {_dataset_label(m): m["key"] for m in others}
+    choice = st.selectbox("Compare against", list(labels) + [UPLOAD_OPTION], key="compare_baseline")
+
+    if choice != UPLOAD_OPTION:
+        return get_dataset(labels[choice])
+
+    baseline_file = st.file_uploader("Baseline report", type=UPLOAD_TYPES, key="compare_upload")
+    _, local_time, compact = st.session_state.get("processed_key") or (None, False, False)
+    baseline_key = (baseline_file.file_id, local_time, compact) if baseline_file is not None else None
+
+    # the baseline is processed by a scheduler job like the main upload, so it
+    # queues behind other sessions' jobs and this script run never blocks on it
+    if st.session_state.get("compare_baseline_key") != baseline_key:
+        previous_job = st.session_state.pop("compare_job", None)
+        if previous_job is not None:
+            release_job(previous_job)
+        st.session_state.pop("compare_baseline_data", None)
+        st.session_state.pop("compare_baseline_error", None)
+        st.session_state.compare_baseline_key = baseline_key
+        if baseline_file is not None:
+            try:
+                sheets = validate_upload(baseline_file)
+            except SchemaError as exc:
+                st.session_state.compare_baseline_error = str(exc)
+            else:
+                st.session_state.compare_job = submit_job(
+                    upload_dataset_key(baseline_file, local_time, compact),
+                    estimate_processing_memory(baseline_file),
+                    process_file, baseline_file, local_time=local_time, compact=compact, _sheets=sheets,
+                )
+
+    if st.session_state.get("compare_job") is not None:
+        render_baseline_progress()
+    elif st.session_state.get("compare_baseline_error"):
+        st.error(st.session_state.compare_baseline_error)
+    return st.session_state.get("compare_baseline_data")
+
+
+@st.fragment(run_every=0.5)
+def render_baseline_progress() -> None:
+    """Poll the baseline's processing job: progress bar, cancel button, hand-off."""
+    job = st.session_state.get("compare_job")
+    if job is None:
+        return
+
+    if job.done:
+        st.session_state.pop("compare_job", None)
+        release_job(job)
+        if job.result is not None:
+            st.session_state.compare_baseline_data = job.result
+        elif job.error is not None:
+            st.session_state.compare_baseline_error = f"Processing failed: {job.error}"
+        else:
+            st.session_state.compare_baseline_error = "Baseline processing cancelled. Upload it again to restart."
+        st.rerun()
+
+    position = queue_position(job)
+    progress_col, cancel_col = st.columns([5, 1])
+    with progress_col:
+        if position is not None:
+            st.progress(0.0, text=f"Baseline waiting for a free worker – position {position} in queue…")
+        else:
+            st.progress(job.progress, text=f"Baseline: {job.stage}…")
+    with cancel_col:
+        if st.button("Cancel", key="cancel_baseline", use_container_width=True):
+            st.session_state.pop("compare_job", None)
+            release_job(job)
+            st.session_state.compare_baseline_error = "Baseline processing cancelled. Upload it again to restart."
+            st.rerun()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Main render function
+# ──────────────────────────────────────────────────────────────────────────────
+@timed_render
+def render_compare() -> None:
+    """Compare tab: biggest movers between the current upload and a baseline period."""
+    current = st.session_state.get("data", {})
+    current_key = current.get("dataset_key")
+    if current.get("airport_hour_matrix") is None or not current_key:
+        st.info("Upload a report to compare it with another period.")
+        return
+
+    st.markdown('<h3 class="section-title">Period-over-Period Comparison</h3>', unsafe_allow_html=True)
+    baseline = _select_baseline(current_key)
+    if baseline is None or baseline.get("airport_hour_matrix") is None:
+        st.caption("Choose a previously processed report or upload one to compare against.")
+        return
+    if baseline.get("dataset_key") == current_key:
+        st.warning("The baseline is the same dataset as the current upload.")
+        return
+
+    result = cached_comparison(baseline["dataset_key"], current_key, session_prime_params(), baseline, current)
+    airports, hours, cells, windows = result["airports"], result["hours"], result["cells"], result["windows"]
+
+    # ── headline numbers ─────────────────────────────────────────────────
+    base_total, cur_total = int(hours["Baseline_Plays"].sum()), int(hours["Current_Plays"].sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Airport Plays (current)", f"{cur_total:,}", f"{cur_total - base_total:+,}")
+    col2.metric("Top Hour Moved", f"{int(airports['Top_Hour_Moved'].sum())} airports")
+    col3.metric("Prime Windows Changed", f"{len(windows)} airports")
+
+    # ── per-hour change ──────────────────────────────────────────────────
+    vertical_spacer()
+    st.markdown('<h3 class="section-title">Change in Plays by Hour</h3>', unsafe_allow_html=True)
+    chart_df = hours.assign(
+        Hour=hours["Hour_24"].apply(format_hour),
+        Direction=hours["Change"].map(lambda c: "Up" if c >= 0 else "Down"),
+    )
+    fig = px.bar(
+        chart_df, x="Hour", y="Change", color="Direction",
+        color_discrete_map={"Up": "#12B76A", "Down": "#EF4444"},
+        template="plotly_white",
+    )
+    fig.update_layout(
+        height=320,
+        margin=dict(l=20, r=20, t=20, b=20),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Inter, sans-serif", size=14),
+        showlegend=False,
+        xaxis=dict(type="category"),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # ── biggest movers ───────────────────────────────────────────────────
+    st.markdown('<h3 class="section-title">Biggest Airport Movers</h3>', unsafe_allow_html=True)
+    movers = airports.head(15).assign(
+        Market=lambda d: d["Airport"].apply(make_market_label),
+        **{
+            "Top Hour": lambda d: [_top_hour_text(b, c, moved) for b, c, moved in zip(
+                d["Baseline_Top_Hour"], d["Current_Top_Hour"], d["Top_Hour_Moved"]
+            )],
+        },
+    )[["Airport", "Market", "Baseline_Plays", "Current_Plays", "Change", "Change_Pct", "Top Hour"]]
+    st.dataframe(
+        movers.style.format({
+            "Baseline_Plays": "{:,}", "Current_Plays": "{:,}", "Change": "{:+,}", "Change_Pct": "{:+.1f}%",
+        }, na_rep="new"),
+        use_container_width=True, hide_index=True,
+    )
+
+    st.markdown('<h3 class="section-title">Biggest Airport-Hour Movers</h3>', unsafe_allow_html=True)
+    top_cells = cells.head(20).assign(Hour=lambda d: d["Hour_24"].apply(format_hour))[
+        ["Airport", "Hour", "Baseline_Plays", "Current_Plays", "Change", "Change_Pct", "Rank_Shift"]
+    ]
+    st.dataframe(
+        top_cells.style.format({
+            "Baseline_Plays": "{:,}", "Current_Plays": "{:,}", "Change": "{:+,}",
+            "Change_Pct": "{:+.1f}%", "Rank_Shift": "{:+d}",
+        }, na_rep="new"),
+        use_container_width=True, hide_index=True,
+    )
+
+    # ── prime window changes ─────────────────────────────────────────────
+    st.markdown('<h3 class="section-title">Prime Window Changes</h3>', unsafe_allow_html=True)
+    if windows.empty:
+        st.caption("Every airport kept the same prime window(s).")
+    else:
+        st.dataframe(
+            windows.assign(
+                Market=windows["Airport"].apply(make_market_label),
+                Baseline=windows["Baseline_Windows"].apply(_windows_text),
+                Current=windows["Current_Windows"].apply(_windows_text),
+            )[["Airport", "Market", "Baseline", "Current"]],
+            use_container_width=True, hide_index=True,
+        )
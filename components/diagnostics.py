@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.jobs import scheduler_status
+from utils.render_timing import RENDER_BUDGET_MS, render_history
+
+
+def timing_summary(history: dict, budget_ms: float) -> pd.DataFrame:
+    """One row per component: last rerun, p50 / p95 / max over the history, reruns over budget."""
+    rows = []
+    for name, samples in history.items():
+        ms = np.array([s["ms"] for s in samples])
+        last = samples[-1]
+        rows.append({
+            "Component": name,
+            "Last_ms": last["ms"],
+            "Last_Elements": last["elements"],
+            "P50_ms": float(np.percentile(ms, 50)),
+            "P95_ms": float(np.percentile(ms, 95)),
+            "Max_ms": float(ms.max()),
+            "Over_Budget": int((ms > budget_ms).sum()),
+            "Reruns": len(samples),
+        })
+    columns = ["Component", "Last_ms", "Last_Elements", "P50_ms", "P95_ms", "Max_ms", "Over_Budget", "Reruns"]
+    return pd.DataFrame(rows, columns=columns).sort_values("Last_ms", ascending=False)
+
+
+def render_diagnostics() -> None:
+    """Render-time diagnostics: per-component timings for this session, flagged against the budget."""
+    with st.expander("Render diagnostics", expanded=False):
+        jobs = scheduler_status()
+        st.caption(
+            f"Processing jobs: {jobs['running']}/{jobs['workers']} workers busy, {jobs['queued']} queued · "
+            f"{jobs['reserved_mb']:,.0f} of {jobs['budget_mb']:,.0f} MB reserved"
+        )
+        budget = st.number_input(
+            "Budget per component (ms)", min_value=1.0, value=RENDER_BUDGET_MS, step=10.0,
+            key="render_budget_ms",
+        )
+        history = render_history()
+        if not history:
+            st.caption("No timings recorded yet.")
+            return
+
+        current_rerun = st.session_state.get("render_rerun", 0)
+        slow = [
+            f"{name} ({samples[-1]['ms']:,.0f} ms)"
+            for name, samples in history.items()
+            if samples[-1]["rerun"] == current_rerun and samples[-1]["ms"] > budget
+        ]
+        if slow:
+            st.warning(f"Over the {budget:,.0f} ms budget this rerun: " + ", ".join(slow))
+        else:
+            st.success(f"Every component rendered within {budget:,.0f} ms this rerun.")
+
+        summary = timing_summary(history, budget)
+        st.dataframe(
+            summary.style.format({
+                "Last_ms": "{:,.1f}", "P50_ms": "{:,.1f}", "P95_ms": "{:,.1f}", "Max_ms": "{:,.1f}",
+            }).apply(
+                lambda row: ["color: #EF4444" if row["Last_ms"] > budget else "" for _ in row], axis=1
+            ),
+            use_container_width=True, hide_index=True,
+        )
+        st.caption(
+            "Times include nested components (e.g. render_overview contains render_overview_chart). "
+            "Elements = messages sent to the browser."
+        )
@@ -2,17 +2,13 @@ import streamlit as st
 import pandas as pd
 # import numpy as np # Not strictly needed if using .mean() on Series and handling empty slices
 
-# ──────────────────────────────────────────────────────────────────────────────
-# Constants for Prime Play Window logic
-# ──────────────────────────────────────────────────────────────────────────────
-MIN_PRIME_WINDOW_LEN = 2
-MAX_PRIME_WINDOW_LEN = 4
-MIN_PLAYS_PERCENT_OF_RANGE1 = 0.70 # For justifying a second window
-
-# Constants for new scoring logic (as per "Recommended scoring tweaks")
-LOW_HOUR_RELATIVE_THRESHOLD = 0.70  # Min hour < 70% of window's *density* (avg plays/hr)
-WEAK_HOUR_PENALTY_PER_FRACTION = 0.20 # -20% to density score for each weak hour *fraction* of window
-
+from components.summary_card import card_row_html, empty_card_html, render_card_section
+from utils.date_index import session_scoped_data
+from utils.display_counts import play_rate
+from utils.metrics import DEFAULT_METRIC, format_value, metric_label
+from utils.prime_windows import cached_prime_windows_by_airport, session_prime_params
+from utils.processed_report import DIMENSION_MATRICES, DISPLAY_MATRICES
+from utils.render_timing import timed_render
 
 # ─── AIRPORT DICTIONARIES ────
 AIRPORT_TO_MARKET = {
@@ -63,6 +59,27 @@ AIRPORT_LONG_NAME = {
     "SMF": "Sacramento International Airport", "SWF": "New York Stewart International Airport",
     "TLH": "Tallahassee International Airport", "VPS": "Destin-Fort Walton Beach Airport", "SFS": "Various Private Aviation Terminals",
 }
+
+# PowerBI exports every timestamp in Eastern time; airports missing here (e.g. SFS) stay on it.
+SOURCE_TIMEZONE = "America/New_York"
+
+AIRPORT_TIMEZONE = {
+    "ATL": "America/New_York", "AUS": "America/Chicago", "BNA": "America/Chicago",
+    "BTR": "America/Chicago", "BWI": "America/New_York", "CAK": "America/New_York",
+    "CLE": "America/New_York", "CMH": "America/New_York", "CRP": "America/Chicago",
+    "DAB": "America/New_York", "DCA": "America/New_York", "DEN": "America/Denver",
+    "DTW": "America/Detroit", "ELP": "America/Denver", "EWR": "America/New_York",
+    "FAR": "America/Chicago", "FAT": "America/Los_Angeles", "FLL": "America/New_York",
+    "GSO": "America/New_York", "HNL": "Pacific/Honolulu", "HSV": "America/Chicago",
+    "IAD": "America/New_York", "ICT": "America/Chicago", "JAN": "America/Chicago",
+    "JFK": "America/New_York", "LBB": "America/Chicago", "LGA": "America/New_York",
+    "MDT": "America/New_York", "MDW": "America/Chicago", "MSP": "America/Chicago",
+    "MSY": "America/Chicago", "OMA": "America/Chicago", "ORD": "America/Chicago",
+    "PBI": "America/New_York", "PHL": "America/New_York", "PSC": "America/Los_Angeles",
+    "RDU": "America/New_York", "ROA": "America/New_York", "SAN": "America/Los_Angeles",
+    "SEA": "America/Los_Angeles", "SFO": "America/Los_Angeles", "SMF": "America/Los_Angeles",
+    "SWF": "America/New_York", "TLH": "America/New_York", "VPS": "America/Chicago",
+}
 # ──────────────────────────────────────────────────────────────────────────────
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -93,321 +110,185 @@ def vertical_spacer(height_px: int = 24) -> None: # Renamed arg to avoid conflic
     st.markdown(f"<div style='height:{height_px}px'></div>", unsafe_allow_html=True)
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Prime Play Window Finder Logic (Incorporating new scoring and edge trimming)
-# ──────────────────────────────────────────────────────────────────────────────
-# In components/market_drilldown.py
-# ... (constants and other helper functions remain the same) ...
-
-# ──────────────────────────────────────────────────────────────────────────────
-# Prime Play Window Finder Logic (Updated for Window #2 Trimming Debug)
+# Drill-down engine (one expander per member of a dimension)
 # ──────────────────────────────────────────────────────────────────────────────
-def find_prime_play_windows(overall_hourly_df: pd.DataFrame | None) -> list:
-    # ... (Initial checks and df_filtered preparation - same as before) ...
-    if overall_hourly_df is None or overall_hourly_df.empty: return []
-    if 'Hour_24' not in overall_hourly_df.columns or 'Total_Plays' not in overall_hourly_df.columns: return []
-
-    df = overall_hourly_df.copy()
-    df['Hour_24'] = pd.to_numeric(df['Hour_24'], errors='coerce')
-    df.dropna(subset=['Hour_24'], inplace=True)
-    df['Hour_24'] = df['Hour_24'].astype(int)
-    df['Total_Plays'] = pd.to_numeric(df['Total_Plays'], errors='coerce').fillna(0)
-    df_filtered = df.query("7 <= Hour_24 <= 21").sort_values("Hour_24").reset_index(drop=True)
-    if df_filtered.empty: return []
-    
-    all_windows = []
-    n_hours_available = len(df_filtered)
-    if n_hours_available < MIN_PRIME_WINDOW_LEN: return []
-
-    # ... (window generation loop - same as before) ...
-    for i in range(n_hours_available):
-        start_hour_series = df_filtered['Hour_24'].iloc[i]
-        for dur in range(MIN_PRIME_WINDOW_LEN, MAX_PRIME_WINDOW_LEN + 1):
-            if i + dur > n_hours_available: break
-            slice_df = df_filtered.iloc[i : i + dur]
-            if slice_df['Hour_24'].iloc[-1] != start_hour_series + dur - 1: break
-
-            total_plays = slice_df['Total_Plays'].sum()
-            density = total_plays / dur if dur > 0 else 0
-            weak_mask = slice_df['Total_Plays'] < LOW_HOUR_RELATIVE_THRESHOLD * density
-            weak_count = weak_mask.sum()
-            penalty_multiplier = 1.0 - (WEAK_HOUR_PENALTY_PER_FRACTION * (weak_count / dur)) if dur > 0 else 1.0
-            rank_score = density * penalty_multiplier
-
-            all_windows.append({
-                "Window_Start": int(slice_df['Hour_24'].iloc[0]),
-                "Window_End": int(slice_df['Hour_24'].iloc[-1]),
-                "Window_Duration": int(dur),
-                "Window_Total_Plays": int(total_plays),
-                "Density": round(density, 2),
-                "Weak_Count": int(weak_count),
-                "Rank_Score": round(rank_score, 2)
-            })
-    
-    if not all_windows: return []
-    windows_df = pd.DataFrame(all_windows)
-    if windows_df.empty: return []
-
-    windows_df_sorted = windows_df.sort_values(
-        by=["Rank_Score", "Window_Duration", "Window_Start"],
-        ascending=[False, True, True]
-    ).reset_index(drop=True)
-    
-    if windows_df_sorted.empty: return []
-
-    # --- Helper function for trimming a window ---
-    def _trim_window(start_hr, end_hr, duration_val, source_df_filtered): # Removed context_debug
-        _current_start = int(start_hr)
-        _current_end = int(end_hr)
-        _current_duration = int(duration_val)
-
-        # Trim weak start hour
-        while _current_duration > MIN_PRIME_WINDOW_LEN:
-            first_hour_plays_series = source_df_filtered[source_df_filtered['Hour_24'] == _current_start]['Total_Plays']
-            if first_hour_plays_series.empty: 
-                break
-            first_hour_plays = first_hour_plays_series.iloc[0]
-
-            current_window_segment_df = source_df_filtered[
-                (source_df_filtered['Hour_24'] >= _current_start) & (source_df_filtered['Hour_24'] <= _current_end)
-            ]
-            if current_window_segment_df.empty or _current_duration == 0: 
-                break 
-            current_segment_total_plays = current_window_segment_df['Total_Plays'].sum()
-            current_segment_density = current_segment_total_plays / _current_duration
-
-            if first_hour_plays < LOW_HOUR_RELATIVE_THRESHOLD * current_segment_density:
-                _current_start += 1
-                _current_duration -= 1
-            else:
-                break 
-
-        # Trim weak end hour
-        while _current_duration > MIN_PRIME_WINDOW_LEN:
-            last_hour_plays_series = source_df_filtered[source_df_filtered['Hour_24'] == _current_end]['Total_Plays']
-            if last_hour_plays_series.empty: 
-                break
-            last_hour_plays = last_hour_plays_series.iloc[0]
-            
-            current_window_segment_df = source_df_filtered[
-                (source_df_filtered['Hour_24'] >= _current_start) & (source_df_filtered['Hour_24'] <= _current_end)
-            ]
-            if current_window_segment_df.empty or _current_duration == 0: 
-                break
-            current_segment_total_plays = current_window_segment_df['Total_Plays'].sum()
-            current_segment_density = current_segment_total_plays / _current_duration
-            
-            if last_hour_plays < LOW_HOUR_RELATIVE_THRESHOLD * current_segment_density:
-                _current_end -= 1
-                _current_duration -= 1
-            else:
-                break
-        
-        final_trimmed_plays_df = source_df_filtered[
-            (source_df_filtered['Hour_24'] >= _current_start) & (source_df_filtered['Hour_24'] <= _current_end)
+# Every dimension reads its member × hour matrix from the processed report –
+# the same prime-window, top-3 and top-10 views for each, no raw rows read.
+DRILLDOWN_DIMENSIONS = {
+    "Airport": "Airports",
+    "Market_Code": "Roadside Markets",
+    "Airport_Group": "Airport Groups",
+    "Network_Name": "Airport Networks",
+}
+DIMENSION_STATE_KEY = "drilldown_dimension"
+
+
+def member_label(dimension: str, member: str) -> str:
+    """Expander title of one member – markets and groups are airport-style codes."""
+    if dimension == "Network_Name":
+        return str(member)
+    label = f"{make_market_label(member)} ({member})"
+    long_name = AIRPORT_LONG_NAME.get(str(member), "") if dimension == "Airport" else ""
+    return f"{label} – {long_name}" if long_name else label
+
+
+def member_hourly(plays: pd.Series, displays: pd.Series | None = None) -> pd.DataFrame:
+    """
+    Hourly totals of one matrix row (hours with rows only), dense-ranked, best
+    first; with the member's display-matrix row, ``Play_Rate`` / ``Displays`` follow.
+    """
+    hourly = plays.dropna().rename("Total_Plays").rename_axis("Hour_24").reset_index()
+    hourly["Hour_24"] = hourly["Hour_24"].astype(int)
+    hourly["Rank"] = hourly["Total_Plays"].rank(method="dense", ascending=False).astype(int)
+    if displays is not None:
+        hourly["Displays"] = displays.reindex(hourly["Hour_24"]).fillna(0).astype("int64").to_numpy()
+        hourly.insert(len(hourly.columns) - 1, "Play_Rate", play_rate(hourly["Total_Plays"], hourly["Displays"]))
+    return hourly.sort_values(["Rank", "Hour_24"])
+
+
+def member_displays(display_matrix: pd.DataFrame | None, member: str) -> pd.Series | None:
+    """A member's distinct displays per hour, or None when they are not known."""
+    if display_matrix is None or member not in display_matrix.index:
+        return None
+    return display_matrix.loc[member]
+
+
+def render_member_detail(hourly: pd.DataFrame, windows: list, label: str) -> None:
+    """Prime windows + top-3 cards (one element) and the top-10 table for one member."""
+    if not windows:
+        windows_row = empty_card_html("No qualifying hours (7 am – 9 pm)")
+    else:
+        window_cards = [
+            (
+                "Prime Window" if len(windows) == 1 else f"Window {idx + 1}",
+                f"{format_hour(start_hour)} – {format_hour(end_hour)}",
+                f"{format_value(total_plays)} Total {label}",
+            )
+            for idx, (start_hour, end_hour, total_plays) in enumerate(windows)
         ]
-        final_trimmed_plays = final_trimmed_plays_df['Total_Plays'].sum() if not final_trimmed_plays_df.empty else 0
-        
-        return _current_start, _current_end, _current_duration, int(final_trimmed_plays)
-
-    # --- Select and Trim Window #1 ---
-    best_window1_original_series = windows_df_sorted.iloc[0]
-    w1_trimmed_start, w1_trimmed_end, w1_trimmed_duration, w1_trimmed_plays = _trim_window(
-        best_window1_original_series["Window_Start"],
-        best_window1_original_series["Window_End"],
-        best_window1_original_series["Window_Duration"],
-        df_filtered
+        windows_row = card_row_html(window_cards, card_class="range-card")
+
+    top3 = hourly.head(3)
+    titles = ["Top Hour", "2nd Best", "3rd Best"]
+    kpi_cards = []
+    for idx_kpi, title in enumerate(titles):
+        if idx_kpi < len(top3):
+            row = top3.iloc[idx_kpi]
+            kpi_cards.append((title, format_hour(row["Hour_24"]), f"{format_value(row['Total_Plays'])} Total {label}"))
+        else:
+            kpi_cards.append((title, "-", "No Data"))
+
+    render_card_section(windows_row, card_row_html(kpi_cards), heading="Prime Play Windows")
+
+    st.markdown(f'<h3 class="section-title">Top 10 Hours by Total {label}</h3>', unsafe_allow_html=True)
+    if hourly.empty:
+        st.caption("No hourly data to display.")
+        return
+    tbl_data = hourly.head(10).assign(Hour=lambda df_: df_["Hour_24"].apply(format_hour))
+    columns = ["Hour", "Total_Plays", "Rank"]
+    formats = {f"Total {label}": format_value, "Rank": "{}"}
+    if "Play_Rate" in tbl_data.columns:
+        columns += ["Play_Rate", "Displays"]
+        formats.update({f"{label} per Display": "{:,.2f}", "Displays": "{:,}"})
+    tbl_data = tbl_data[columns].rename(columns={"Total_Plays": f"Total {label}", "Play_Rate": f"{label} per Display"})
+    st.dataframe(
+        tbl_data.style.format(formats, na_rep="-"), use_container_width=True, hide_index=True,
     )
-    result = [(w1_trimmed_start, w1_trimmed_end, w1_trimmed_plays)]
-
-    # --- Determine if a second window is justified (and trim it) ---
-    range1_plays_for_comparison = w1_trimmed_plays 
-    potential_range2_candidates = windows_df_sorted.iloc[1:].copy() 
-    selected_window2_details = None
-
-    for idx, candidate_w2_series in potential_range2_candidates.iterrows():
-        no_overlap = (candidate_w2_series["Window_End"] < w1_trimmed_start) or \
-                     (candidate_w2_series["Window_Start"] > w1_trimmed_end)
-        if not no_overlap:
-            continue
-
-        initial_plays_ok = candidate_w2_series["Window_Total_Plays"] >= MIN_PLAYS_PERCENT_OF_RANGE1 * range1_plays_for_comparison
-        if not initial_plays_ok:
-            continue
-        
-        # If initial checks pass, trim this candidate Window #2
-        w2_cand_trimmed_start, w2_cand_trimmed_end, w2_cand_trimmed_duration, w2_cand_trimmed_plays = _trim_window(
-            candidate_w2_series["Window_Start"],
-            candidate_w2_series["Window_End"],
-            candidate_w2_series["Window_Duration"],
-            df_filtered
-        )
-
-        if w2_cand_trimmed_duration < MIN_PRIME_WINDOW_LEN:
-             continue
-
-        final_plays_ok = w2_cand_trimmed_plays >= MIN_PLAYS_PERCENT_OF_RANGE1 * range1_plays_for_comparison
-        
-        if final_plays_ok:
-            selected_window2_details = (w2_cand_trimmed_start, w2_cand_trimmed_end, w2_cand_trimmed_plays)
-            break 
-
-    if selected_window2_details:
-        result.append(selected_window2_details)
-            
-    return result
+
+
+def _render_airports(
+    data, matrix: pd.DataFrame, display_matrix: pd.DataFrame | None, windows_by_member: dict, label: str
+) -> None:
+    """Airport members: grouped by market, with the networks used and low-hour flags."""
+    # airport-hours flagged far below their baseline by the pipeline, within the date range
+    date_range = data.get("date_range")
+    anomalies = data.get("airport_anomalies")
+    if anomalies is not None and date_range is not None:
+        anomalies = anomalies[anomalies["Date"].between(pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]))]
+    anomalies_by_airport = dict(tuple(anomalies.groupby("Airport"))) if anomalies is not None else {}
+    networks_by_airport = data.get("airport_networks", {})
+
+    for airport_code in sorted(matrix.index, key=lambda code: (make_market_label(code), code)):
+        expander_main_label = member_label("Airport", airport_code)
+        airport_anomalies = anomalies_by_airport.get(airport_code)
+        if airport_anomalies is not None:
+            expander_main_label += f" ⚠️ {len(airport_anomalies)}"
+
+        networks = sorted(networks_by_airport.get(airport_code, ()))
+        network_display_items = [f"[{n}]" for n in networks]
+        second_line_html = f'<span class="network-label">Networks used:</span> {", ".join(network_display_items) if network_display_items else "–"}'
+
+        with st.expander(expander_main_label, expanded=False):
+            st.markdown(second_line_html, unsafe_allow_html=True)
+
+            if airport_anomalies is not None:
+                n_low = len(airport_anomalies)
+                st.markdown(
+                    f'<span class="anomaly-badge">⚠️ {n_low} low hour{"s" if n_low > 1 else ""} '
+                    f'– far below this airport\'s usual plays (screens possibly offline)</span>',
+                    unsafe_allow_html=True,
+                )
+                low_hours = pd.DataFrame({
+                    "Date": airport_anomalies["Date"].dt.strftime("%b %d, %Y"),
+                    "Hour": airport_anomalies["Hour_24"].apply(format_hour),
+                    "Plays": airport_anomalies["Plays"],
+                    "Usual Plays": airport_anomalies["Baseline"].round().astype(int),
+                    "Robust Z": airport_anomalies["Robust_Z"],
+                })
+                st.dataframe(
+                    low_hours.style.format({"Plays": "{:,}", "Usual Plays": "{:,}", "Robust Z": "{:.2f}"}),
+                    use_container_width=True, hide_index=True,
+                )
+
+            hourly = member_hourly(matrix.loc[airport_code], member_displays(display_matrix, airport_code))
+            render_member_detail(hourly, windows_by_member[airport_code], label)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Main render function
 # ──────────────────────────────────────────────────────────────────────────────
+@timed_render
 def render_market_drilldown() -> None:
-    raw_df: pd.DataFrame | None = st.session_state.get("data", {}).get("raw")
-
-    if raw_df is None or raw_df.empty:
-        st.info("Upload a report to see market details.")
-        return
+    """Drill-down tab: airports, roadside markets, airport groups or networks, one expander each."""
+    # the sidebar's metric; airport matrices are restricted to its date range
+    data = session_scoped_data(st.session_state.get("data", {}))
 
-    df = raw_df.copy()
-    if "Network Code" in df.columns and "Network_Code" not in df.columns:
-        df = df.rename(columns={"Network Code": "Network_Code"})
+    dimension = st.radio(
+        "Drill down by", list(DRILLDOWN_DIMENSIONS), format_func=DRILLDOWN_DIMENSIONS.get,
+        horizontal=True, key=DIMENSION_STATE_KEY,
+    )
+    matrix: pd.DataFrame | None = data.get(DIMENSION_MATRICES[dimension])
 
-    if "Network_Code" not in df.columns:
-        st.error("Column 'Network Code' not found in the upload.")
-        return
-    
-    # Ensure 'Hour_24' column exists and is numeric for grouping
-    if 'Hour_24' not in df.columns:
-        st.error("Column 'Hour_24' not found in the upload, which is required for hourly analysis.")
+    if matrix is None and st.session_state.get("processing_job") is not None:
+        st.info("Market details are still being prepared…")
         return
-    df['Hour_24'] = pd.to_numeric(df['Hour_24'], errors='coerce')
-    df.dropna(subset=['Hour_24'], inplace=True) # Remove rows where Hour_24 could not be converted
-    df['Hour_24'] = df['Hour_24'].astype(int)
 
-    # Ensure '# Plays' column exists and is numeric
-    if '# Plays' not in df.columns:
-        st.error("Column '# Plays' not found in the upload, which is required for hourly analysis.")
+    if matrix is None or matrix.empty:
+        st.info("Upload a report to see market details." if matrix is None
+                else f"No {DRILLDOWN_DIMENSIONS[dimension].lower()} in this upload.")
         return
-    df['# Plays'] = pd.to_numeric(df['# Plays'], errors='coerce').fillna(0)
 
+    if dimension != "Airport" and data.get("date_range"):
+        st.caption("Totals cover the whole upload – the date range applies to airports only.")
 
-    if "Airport" not in df.columns:
-        df["Airport"] = df["Network_Code"].apply(extract_airport)
-    else:
-        df["Airport"] = df["Airport"].apply(lambda x: str(x).strip().upper() if pd.notna(x) else None)
+    # prime windows for every member at once from the matrix, memoized per
+    # (dataset, metric, date range, dimension, sidebar parameter tuple)
+    params = session_prime_params()
+    label = metric_label(data.get("metric", DEFAULT_METRIC))
+    windows_key = data["dataset_key"] if dimension == "Airport" else f"{data['dataset_key']}|{dimension}"
+    windows_by_member = cached_prime_windows_by_airport(windows_key, params, matrix)
+
+    # distinct displays per member and hour, for plays per display; they are not
+    # kept per date, so airports restricted to a date range show totals only
+    display_matrix = None
+    if dimension in DISPLAY_MATRICES and not (dimension == "Airport" and data.get("date_range")):
+        display_matrix = data.get(DISPLAY_MATRICES[dimension])
 
-    df["Market"] = df["Airport"].apply(make_market_label)
     st.write("") # Creates a bit of space before the first expander
-    sorted_market_labels = sorted(df["Market"].dropna().unique().tolist())
-
-    for market_group_name in sorted_market_labels:
-        market_group_df = df[df["Market"] == market_group_name].copy()
-        unique_airport_codes_in_group = sorted(market_group_df["Airport"].dropna().unique())
-
-        for airport_code in unique_airport_codes_in_group:
-            market_df = market_group_df[market_group_df["Airport"] == airport_code].copy()
-            if market_df.empty: continue
-
-            networks = sorted(market_df["Network_Code"].dropna().unique())
-            market_name_from_dict = make_market_label(airport_code)
-            long_name_from_dict = AIRPORT_LONG_NAME.get(str(airport_code) if airport_code else "", "")
-
-            expander_main_label = f"{market_name_from_dict} ({airport_code})"
-            if long_name_from_dict:
-                expander_main_label += f" – {long_name_from_dict}"
-            
-            network_display_items = [f"[{n}]" for n in networks]
-            second_line_html = f'<span class="network-label">Networks used:</span> {", ".join(network_display_items) if network_display_items else "–"}'
-            
-            with st.expander(expander_main_label, expanded=False):
-                st.markdown(second_line_html, unsafe_allow_html=True)
-                
-                hourly = (
-                    market_df.groupby("Hour_24", as_index=False)["# Plays"]
-                    .sum()
-                    .rename(columns={"# Plays": "Total_Plays"}) # This provides Total_Plays
-                )
-                # Ensure Total_Plays is numeric here as well, though '# Plays' conversion earlier should handle it.
-                hourly["Total_Plays"] = pd.to_numeric(hourly["Total_Plays"], errors='coerce').fillna(0)
-                hourly = hourly.sort_values(["Total_Plays", "Hour_24"], ascending=[False, True])
-
-                if not hourly.empty:
-                    hourly["Rank"] = hourly["Total_Plays"].rank(method="dense", ascending=False).astype(int)
-                    hourly = hourly.sort_values(["Rank", "Hour_24"])
-                else:
-                    # Ensure `hourly` has the right columns even if empty for `find_prime_play_windows`
-                    hourly = pd.DataFrame(columns=["Hour_24", "Total_Plays", "Rank"])
-
-
-                # ── PRIME PLAY WINDOW(S) SECTION FOR THIS AIRPORT (NEW) ──────────────
-                # Using h4 or a bolded st.markdown for subsection title
-                st.markdown('**Prime Play Windows**', unsafe_allow_html=False) # Simple bold text
-                # or st.markdown('<h4 class="subsection-title">Prime Play Window(s)</h4>', unsafe_allow_html=True)
-
-                prime_windows_list_airport = find_prime_play_windows(hourly) # Pass the airport-specific hourly data
-
-                if not prime_windows_list_airport:
-                    st.markdown(
-                        """
-                        <div class="kpi-card" style="text-align: center; padding: 10px 0; margin-bottom: 10px;">
-                            <span style="color: #6c757d; font-size: 0.85rem;">No qualifying hours (7 am – 9 pm)</span>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
-                else:
-                    # Using st.columns for horizontal layout of prime window cards.
-                    prime_window_cols = st.columns(len(prime_windows_list_airport))
-
-                    for idx, window_data in enumerate(prime_windows_list_airport):
-                        start_hour, end_hour, total_plays = window_data
-                        
-                        range_str = f"{format_hour(start_hour)} – {format_hour(end_hour)}"
-                        plays_str = f"{total_plays:,} Total Plays"
-
-                        card_label = "Prime Window"
-                        if len(prime_windows_list_airport) > 1:
-                            card_label = f"Window {idx + 1}"
-                        
-                        with prime_window_cols[idx]:
-                            # You can add a class like 'range-card' for specific styling
-                            prime_window_cols[idx].markdown(
-                                f"""
-                                <div class="kpi-card range-card">
-                                    <div class="summary-title">{card_label}</div>
-                                    <div class="summary-value">{range_str}</div>
-                                    <div class="summary-subtitle">{plays_str}</div>
-                                </div>
-                                """,
-                                unsafe_allow_html=True,
-                            )
-                vertical_spacer(15) # Space before Top Hour KPIs
-
-                # --- Existing Top 3 KPI cards ---
-                top3 = hourly.head(3)
-                titles = ["Top Hour", "2nd Best", "3rd Best"]
-                cols = st.columns(3)
-                for idx_kpi, col_kpi in enumerate(cols):
-                    with col_kpi:
-                        if idx_kpi < len(top3):
-                            row = top3.iloc[idx_kpi]
-                            hour_val, total_plays_val = row.get("Hour_24"), row.get("Total_Plays")
-                            hour_display = format_hour(hour_val)
-                            plays_display = f"{int(total_plays_val):,} Total Plays" if pd.notna(total_plays_val) and total_plays_val > 0 else ("0 Total Plays" if pd.notna(total_plays_val) else "No Data")
-                        else:
-                            hour_display, plays_display = "-", "No Data"
-                        col_kpi.markdown(f'<div class="kpi-card"><div class="summary-title">{titles[idx_kpi]}</div><div class="summary-value">{hour_display}</div><div class="summary-subtitle">{plays_display}</div></div>', unsafe_allow_html=True)
-                
-                vertical_spacer() # Existing spacer
-                st.markdown('<h3 class="section-title">Top 10 Hours by Total Plays</h3>', unsafe_allow_html=True)
-
-                if not hourly.empty:
-                    tbl_data = hourly.head(10).copy()
-                    tbl_data["Hour"] = tbl_data["Hour_24"].apply(format_hour)
-                    # Rank should already be there from earlier calculation
-                    if "Rank" not in tbl_data.columns: 
-                        tbl_data["Rank"] = tbl_data["Total_Plays"].rank(method="dense", ascending=False).astype(int)
-                    
-                    tbl_data = tbl_data[["Hour", "Total_Plays", "Rank"]].rename(columns={"Total_Plays": "Total Plays"})
-                    tbl_data["Total Plays"] = pd.to_numeric(tbl_data["Total Plays"], errors='coerce').fillna(0).astype(int)
-                    tbl_data["Rank"] = pd.to_numeric(tbl_data["Rank"], errors='coerce').fillna(0).astype(int)
-                    st.dataframe(tbl_data.style.format({"Total Plays": "{:,}", "Rank": "{}"}), use_container_width=True, hide_index=True)
-                else:
-                    st.caption("No hourly data to display for this airport.")
\ No newline at end of file
+    if dimension == "Airport":
+        _render_airports(data, matrix, display_matrix, windows_by_member, label)
+        return
+    for member in matrix.index:
+        with st.expander(member_label(dimension, member), expanded=False):
+            hourly = member_hourly(matrix.loc[member], member_displays(display_matrix, member))
+            render_member_detail(hourly, windows_by_member[member], label)
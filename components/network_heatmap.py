@@ -0,0 +1,158 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from components.market_drilldown import format_hour, make_market_label
+from utils.date_index import session_scoped_data
+from utils.metrics import DEFAULT_METRIC, metric_label
+from utils.prime_stability import cached_prime_window_stability
+from utils.prime_windows import PrimeWindowParams, prime_windows_by_airport, session_prime_params
+from utils.render_timing import timed_render
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Figure builder (cached per dataset)
+# ──────────────────────────────────────────────────────────────────────────────
+def _airport_hour_layout(fig: go.Figure, y_labels: list) -> None:
+    """Shared layout of the airports × hours heatmaps: hour ticks on top, one labelled row per airport."""
+    hours = list(range(24))
+    fig.update_layout(
+        height=max(300, 26 * len(y_labels) + 80),
+        margin=dict(l=20, r=20, t=20, b=20),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Inter, sans-serif", size=13),
+        xaxis=dict(
+            tickmode="array",
+            tickvals=hours,
+            ticktext=[format_hour(h) for h in hours],
+            side="top",
+        ),
+        yaxis=dict(
+            tickmode="array",
+            tickvals=list(range(len(y_labels))),
+            ticktext=y_labels,
+            autorange="reversed",
+        ),
+    )
+
+
+@st.cache_data(show_spinner=False)
+def build_heatmap_figure_json(
+    dataset_key: str, params: PrimeWindowParams, label: str, _matrix: pd.DataFrame
+) -> str:
+    """
+    Build the airports × hours heatmap with prime windows outlined, serialised
+    to Plotly JSON. Keyed on ``dataset_key``, the window parameters and the
+    metric label – the matrix itself is not hashed.
+    """
+    matrix = _matrix.reindex(columns=range(24))
+    airports = matrix.index.tolist()
+    hours = list(range(24))
+    y_labels = [f"{make_market_label(code)} ({code})" for code in airports]
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.to_numpy(),
+            x=hours,
+            y=list(range(len(airports))),
+            customdata=[[label] * 24 for label in y_labels],
+            colorscale=["#E0E7FF", "#4F8EF7"],
+            hoverongaps=False,
+            hovertemplate=f"%{{customdata}}<br>Hour %{{x}}: %{{z:,}} {label.lower()}<extra></extra>",
+            colorbar=dict(title=label, thickness=12),
+        )
+    )
+
+    # outline each airport's prime window(s)
+    windows_by_airport = prime_windows_by_airport(matrix, params)
+    for row_idx, code in enumerate(airports):
+        for start_hour, end_hour, _ in windows_by_airport[code]:
+            fig.add_shape(
+                type="rect",
+                x0=start_hour - 0.5, x1=end_hour + 0.5,
+                y0=row_idx - 0.5, y1=row_idx + 0.5,
+                line=dict(color="#0A2540", width=2),
+                fillcolor="rgba(0,0,0,0)",
+            )
+
+    _airport_hour_layout(fig, y_labels)
+    return fig.to_json()
+
+
+@st.cache_data(show_spinner=False)
+def build_stability_figure_json(dataset_key: str, params: PrimeWindowParams, _stability: pd.DataFrame) -> str:
+    """
+    Build the airports × hours heatmap of day-by-day prime window stability,
+    serialised to Plotly JSON and keyed like ``build_heatmap_figure_json``.
+    """
+    fractions = _stability.reindex(columns=range(24))
+    airports = fractions.index.tolist()
+    hours = list(range(24))
+    y_labels = [f"{make_market_label(code)} ({code})" for code in airports]
+    days = _stability["Days"].tolist()
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=fractions.to_numpy() * 100,
+            x=hours,
+            y=list(range(len(airports))),
+            customdata=[[(label, n_days)] * 24 for label, n_days in zip(y_labels, days)],
+            zmin=0, zmax=100,
+            colorscale=["#F6F9FC", "#0A2540"],
+            hovertemplate="%{customdata[0]}<br>Hour %{x}: prime on %{z:.0f}% of %{customdata[1]} days<extra></extra>",
+            colorbar=dict(title="% of days", thickness=12),
+        )
+    )
+    _airport_hour_layout(fig, y_labels)
+    return fig.to_json()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Main render function
+# ──────────────────────────────────────────────────────────────────────────────
+@timed_render
+def render_network_heatmap() -> None:
+    """Network Heatmap tab: every airport's hourly plays in one chart."""
+    data_dict = session_scoped_data(st.session_state.get("data", {}))
+    matrix: pd.DataFrame | None = data_dict.get("airport_hour_matrix")
+    label = metric_label(data_dict.get("metric", DEFAULT_METRIC))
+
+    if matrix is None and st.session_state.get("processing_job") is not None:
+        st.info("The network heatmap is still being prepared…")
+        return
+
+    if matrix is None or matrix.empty:
+        st.info("Upload a report to see the network heatmap.")
+        return
+
+    st.markdown(
+        f'<h3 class="section-title">Total {label} by Airport and Hour</h3>',
+        unsafe_allow_html=True,
+    )
+    st.caption("Outlined cells mark each airport's prime play window(s) (7 am – 9 pm).")
+
+    params = session_prime_params()
+    fig_json = build_heatmap_figure_json(data_dict.get("dataset_key", ""), params, label, matrix)
+    st.plotly_chart(pio.from_json(fig_json), use_container_width=True)
+
+    # ── day-by-day stability of the prime windows ────────────────────────
+    index = data_dict.get("date_index")
+    if index is None or not len(index.dates):
+        return
+    stability = cached_prime_window_stability(
+        data_dict.get("dataset_key", ""), params, data_dict.get("metric", DEFAULT_METRIC),
+        data_dict.get("date_range"), index,
+    )
+    if stability.empty:
+        return
+
+    st.markdown('<h3 class="section-title">Prime Window Stability</h3>', unsafe_allow_html=True)
+    st.caption(
+        "Prime windows found for every airport and day separately – each cell is the share of the "
+        "airport's reporting days on which that hour fell inside the day's window(s). Low shares under "
+        "an outlined window above mean it rests on a few heavy days."
+    )
+    stability_json = build_stability_figure_json(data_dict.get("dataset_key", ""), params, stability)
+    st.plotly_chart(pio.from_json(stability_json), use_container_width=True)
@@ -1,5 +1,70 @@
 import streamlit as st
 
+from utils.date_index import DATE_RANGE_KEY, dataset_date_bounds
+from utils.metrics import DEFAULT_METRIC, METRIC_STATE_KEY, metric_label
+from utils.prime_windows import DEFAULT_PRIME_PARAMS, PARAM_STATE_KEYS
+from utils.render_timing import timed_render
+
+
+def _reset_prime_params() -> None:
+    for field, key in PARAM_STATE_KEYS.items():
+        st.session_state[key] = getattr(DEFAULT_PRIME_PARAMS, field)
+
+
+def _reset_date_range() -> None:
+    bounds = dataset_date_bounds(st.session_state.get("data", {}))
+    if bounds is not None:
+        st.session_state[DATE_RANGE_KEY] = bounds
+
+
+def render_date_range_control() -> None:
+    """Date range for the Overview, Drill-down and Heatmap tabs; shown once a multi-day dataset is loaded."""
+    data = st.session_state.get("data", {})
+    bounds = dataset_date_bounds(data)
+    if bounds is None or bounds[0] == bounds[1]:
+        return
+
+    # every new dataset starts on its full range
+    if st.session_state.get("date_range_dataset") != data.get("dataset_key"):
+        st.session_state.date_range_dataset = data.get("dataset_key")
+        st.session_state[DATE_RANGE_KEY] = bounds
+
+    st.markdown("**Date Range**")
+    st.date_input("Dates", min_value=bounds[0], max_value=bounds[1], key=DATE_RANGE_KEY, format="MM/DD/YYYY")
+    st.button("All dates", on_click=_reset_date_range, use_container_width=True)
+
+
+def render_metric_control() -> None:
+    """Metric every summary and ranking uses; shown when the upload carries more than # Plays."""
+    metrics = st.session_state.get("data", {}).get("metrics", [])
+    if len(metrics) < 2:
+        return
+    if st.session_state.get(METRIC_STATE_KEY) not in metrics:
+        st.session_state[METRIC_STATE_KEY] = DEFAULT_METRIC
+
+    st.markdown("**Metric**")
+    st.selectbox("Metric", metrics, format_func=metric_label, key=METRIC_STATE_KEY, label_visibility="collapsed")
+
+
+def render_prime_window_controls() -> None:
+    """Sliders for the prime window finder; every tab picks them up on the next rerun."""
+    for field, key in PARAM_STATE_KEYS.items():
+        st.session_state.setdefault(key, getattr(DEFAULT_PRIME_PARAMS, field))
+
+    st.markdown("**Prime Window Tuning**")
+    st.slider("Shortest window (hours)", 1, 6, step=1, key=PARAM_STATE_KEYS["min_window_len"])
+    st.slider("Longest window (hours)", 1, 8, step=1, key=PARAM_STATE_KEYS["max_window_len"],
+              help="Raised to the shortest window if set below it.")
+    st.slider("Weak hour threshold", 0.0, 1.0, step=0.05, key=PARAM_STATE_KEYS["low_hour_relative_threshold"],
+              help="An hour is weak when its plays are below this share of the window's plays per hour.")
+    st.slider("Weak hour penalty", 0.0, 1.0, step=0.05, key=PARAM_STATE_KEYS["weak_hour_penalty_per_fraction"],
+              help="Score penalty per weak-hour fraction of the window.")
+    st.slider("Second window minimum", 0.0, 1.0, step=0.05, key=PARAM_STATE_KEYS["min_plays_percent_of_range1"],
+              help="A second window must carry at least this share of the first window's plays.")
+    st.button("Reset to defaults", on_click=_reset_prime_params, use_container_width=True)
+
+
+@timed_render
 def render_sidebar():
     """Render the sidebar with hover expand functionality"""
     st.markdown(
@@ -7,4 +72,8 @@ def render_sidebar():
         <div class="sidebar-container"></div>
         """,
         unsafe_allow_html=True
-    )
\ No newline at end of file
+    )
+    with st.sidebar:
+        render_metric_control()
+        render_date_range_control()
+        render_prime_window_controls()
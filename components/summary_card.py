@@ -1,5 +1,43 @@
+import html
+from typing import Iterable, Optional, Tuple
+
 import streamlit as st
 
+Card = Tuple[str, str, str]  # (title, value, subtitle)
+
+# Card rows are templated into one HTML string per section, so a whole section
+# of cards is a single markdown element instead of st.columns + one element per
+# card + spacers.
+KPI_CARD_HTML = (
+    '<div class="kpi-card{card_class}"><div class="summary-title">{title}</div>'
+    '<div class="summary-value">{value}</div><div class="summary-subtitle">{subtitle}</div></div>'
+)
+EMPTY_CARD_HTML = '<div class="kpi-card empty-card"><span>{message}</span></div>'
+
+
+def card_row_html(cards: Iterable[Card], card_class: str = "") -> str:
+    """One flex row of KPI cards, equal widths."""
+    cells = "".join(
+        KPI_CARD_HTML.format(
+            card_class=f" {card_class}" if card_class else "",
+            title=html.escape(str(title)), value=html.escape(str(value)), subtitle=html.escape(str(subtitle)),
+        )
+        for title, value, subtitle in cards
+    )
+    return f'<div class="summary-cards-container">{cells}</div>'
+
+
+def empty_card_html(message: str) -> str:
+    """A full-width placeholder card (e.g. no prime window found)."""
+    return f'<div class="summary-cards-container">{EMPTY_CARD_HTML.format(message=html.escape(message))}</div>'
+
+
+def render_card_section(*rows: str, heading: Optional[str] = None) -> None:
+    """Render card rows (and an optional small heading) as one markdown element."""
+    title = f'<div class="card-heading">{html.escape(heading)}</div>' if heading else ""
+    st.markdown(f'<div class="card-section">{title}{"".join(rows)}</div>', unsafe_allow_html=True)
+
+
 def render_summary_card(title, value, subtitle):
     """Render a summary card with a value and subtitle"""
     st.markdown(
@@ -11,4 +49,4 @@ def render_summary_card(title, value, subtitle):
         </div>
         """,
         unsafe_allow_html=True
-    )
\ No newline at end of file
+    )
@@ -1,7 +1,17 @@
 import streamlit as st
 import pandas as pd
-from utils.data_processing import process_file
+from utils.compressed_upload import UPLOAD_TYPES
+from utils.data_processing import (
+    estimate_processing_memory,
+    export_raw_rows,
+    process_file,
+    upload_dataset_key,
+)
+from utils.jobs import queue_position, release_job, submit_job
+from utils.render_timing import timed_render
+from utils.schema import SchemaError, validate_upload
 
+@timed_render
 def render_upload_dropzone():
     """Render a custom styled file upload dropzone"""
     st.markdown(
@@ -15,7 +25,7 @@ def render_upload_dropzone():
                 </svg>
             </div>
             <div class="upload-text" style="font-size:1.1rem; font-weight:600;">Drag and drop your file below or click to browse</div>
-            <div class="upload-subtext" style="font-size:0.95rem; color:#555;">Accepts .xlsx and .csv files</div>
+            <div class="upload-subtext" style="font-size:0.95rem; color:#555;">Accepts .xlsx and .csv files – CSVs may be compressed</div>
         </div>
         """,
         unsafe_allow_html=True
@@ -23,10 +33,10 @@ def render_upload_dropzone():
     # Place the uploader directly (not hidden)
     uploaded_file = st.file_uploader(
         "Upload Excel or CSV",
-        type=["xlsx", "csv"],
+        type=UPLOAD_TYPES,
         label_visibility="visible"
     )
-    st.caption("Accepted file types: .xlsx, .csv. Drag-and-drop or click above.")
+    st.caption("Accepted file types: .xlsx, .csv, .csv.gz, .csv.bz2, .zip (one .csv or .xlsx inside). Drag-and-drop or click above.")
     
     # --- ADD YOUR NEW INSTRUCTIONS HERE ---
     st.markdown("**Directions:** Upload hourly report sourced from PowerBI reporting.")
@@ -36,20 +46,119 @@ def render_upload_dropzone():
     st.markdown("**Timezone Note:** PowerBI always pulls in EST.")
     # --- END OF ADDED CODE ---
 
-    # If file is uploaded, process it
-    if uploaded_file is not None and not st.session_state.get("file_processed", False):
-        data = process_file(uploaded_file)
-        st.session_state.data = data
-        
+    local_time = st.toggle(
+        "Use airport local time",
+        value=False,
+        help="Convert each airport's hours from EST to the airport's own timezone "
+             "before building summaries and prime windows. Roadside boards stay in EST.",
+    )
+    compact = st.toggle(
+        "Compact storage",
+        value=False,
+        help="Keep only plays summed by date, hour, network and system instead of every "
+             "raw row. All views work the same; full rows are available as an export.",
+    )
+
+    # If file is uploaded (or the timezone/storage mode changed), queue it on the
+    # process-wide scheduler; this session stops waiting on any older upload's job
+    # (which is cancelled unless another session submitted the same file).
+    processed_key = (uploaded_file.file_id, local_time, compact) if uploaded_file is not None else None
+    if st.session_state.get("processed_key") != processed_key:
+        previous_job = st.session_state.pop("processing_job", None)
+        if previous_job is not None:
+            release_job(previous_job)
+        st.session_state.pop("data", None)
+        st.session_state.pop("processing_status", None)
+        st.session_state.pop("processing_error", None)
+        st.session_state.pop("published_revision", None)
+        st.session_state.pop("raw_export", None)
+        st.session_state.processed_key = processed_key
+        if uploaded_file is not None:
+            try:
+                sheets = validate_upload(uploaded_file)  # header + sample only – fails in milliseconds
+            except SchemaError as exc:
+                st.session_state.processing_error = str(exc)
+            else:
+                st.session_state.processing_job = submit_job(
+                    upload_dataset_key(uploaded_file, local_time, compact),
+                    estimate_processing_memory(uploaded_file),
+                    process_file, uploaded_file, local_time=local_time, compact=compact, _sheets=sheets,
+                )
+
+    if st.session_state.get("processing_job") is not None:
+        render_processing_progress()
+    elif st.session_state.get("processing_error"):
+        st.error(st.session_state.processing_error)
+    elif st.session_state.get("processing_status"):
+        st.info(st.session_state.processing_status)
+
+    data = st.session_state.get("data")
+    # partial results (published while the job runs) have no report yet
+    if uploaded_file is not None and data and "report_bytes" in data:
         # Add download button for processed report
-        report_bytes = data.get('report_bytes', b'')
         today_str = pd.Timestamp.now().strftime('%Y-%m-%d')
         st.download_button(
             label="Download Total Plays Report",
-            data=report_bytes,
+            data=data["report_bytes"],
             file_name=f"PlayRate_Report_{today_str}.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             on_click=lambda: st.toast("Report ready ✓", icon="✅")
         )
+
+        # compact datasets keep no raw rows – rebuild them from the upload on request
+        if data.get("compact"):
+            if st.session_state.get("raw_export") is None:
+                if st.button("Prepare raw rows export"):
+                    with st.spinner("Re-reading raw rows…"):
+                        st.session_state.raw_export = export_raw_rows(uploaded_file, local_time=local_time)
+                    st.rerun()
+            else:
+                st.download_button(
+                    label="Download Raw Rows (CSV)",
+                    data=st.session_state.raw_export,
+                    file_name=f"PlayRate_Raw_{today_str}.csv",
+                    mime="text/csv",
+                )
     
-    return uploaded_file
\ No newline at end of file
+    return uploaded_file
+
+
+@st.fragment(run_every=0.5)
+def render_processing_progress():
+    """Poll the background processing job: progress bar, cancel button, hand-off."""
+    job = st.session_state.get("processing_job")
+    if job is None:
+        return
+
+    if job.done:
+        st.session_state.pop("processing_job", None)
+        release_job(job)
+        if job.result is not None:
+            st.session_state.data = job.result
+        elif job.error is not None:
+            st.session_state.processing_error = f"Processing failed: {job.error}"
+        else:
+            st.session_state.processing_status = "Processing cancelled. Upload the file again to restart."
+        st.rerun()
+
+    # hand over tables published so far so finished tabs render early
+    if job.revision != st.session_state.get("published_revision"):
+        st.session_state.published_revision = job.revision
+        if job.partial:
+            st.session_state.data = job.partial
+            st.rerun()
+
+    position = queue_position(job)
+    progress_col, cancel_col = st.columns([5, 1])
+    with progress_col:
+        if position is not None:
+            st.progress(0.0, text=f"Waiting for a free worker – position {position} in queue…")
+        else:
+            st.progress(job.progress, text=f"{job.stage}…")
+    with cancel_col:
+        if st.button("Cancel", key="cancel_processing", use_container_width=True):
+            # other sessions waiting on the same file keep their job running
+            st.session_state.pop("processing_job", None)
+            release_job(job)
+            st.session_state.processing_status = "Processing cancelled. Upload the file again to restart."
+            st.rerun()
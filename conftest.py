@@ -0,0 +1 @@
+# conftest.py – lets the tests import ``utils`` / ``components`` from the repo root
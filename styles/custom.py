@@ -1,6 +1,9 @@
 # custom.py
 import streamlit as st
 
+from utils.render_timing import timed_render
+
+@timed_render
 def apply_custom_styles() -> None:
     """Inject global CSS styles for the Streamlit app."""
     st.markdown(
@@ -58,6 +61,16 @@ def apply_custom_styles() -> None:
                         0  4px  6px -2px rgba(0,0,0,0.05);
         }
 
+        /* one markdown element per card section: rows of equal-width cards */
+        .card-section{ margin-bottom:24px; }
+        .card-section .summary-cards-container + .summary-cards-container{ margin-top:15px; }
+        .card-section .card-heading{ font-weight:600; margin-bottom:8px; }
+        .summary-cards-container > .kpi-card{ flex:1 1 0; }
+        .kpi-card.empty-card{
+            flex-basis:100%; text-align:center; padding:20px 0;
+            color:#6c757d; font-size:0.9rem;
+        }
+
         .summary-title   { 
             font-weight:500; /* Medium weight for title */
             font-size:0.9rem; /* Slightly smaller */
@@ -134,6 +147,18 @@ def apply_custom_styles() -> None:
             color: var(--text-muted); 
             font-style: italic;
         }
+
+        /* Low-hour anomaly badge (Market Drill-down) */
+        span.anomaly-badge {
+            display: inline-block;
+            background: #FEF3C7;
+            color: #92400E;
+            border: 1px solid #FCD34D;
+            border-radius: 999px;
+            padding: 2px 10px;
+            font-size: 0.8rem;
+            font-weight: 500;
+        }
         </style>
         """,
         unsafe_allow_html=True,
@@ -0,0 +1,37 @@
+# tests/conftest.py
+import pytest
+
+import utils.parallel_ingest as parallel_ingest
+import utils.raw_store as raw_store
+from utils.data_processing import process_file
+from report_checks import ROWS, SEED
+from utils.synthetic_report import synthetic_upload
+
+
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    """Raw rows go to the test's own directory, and process_file starts and ends with an empty cache."""
+    monkeypatch.setattr(raw_store, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(parallel_ingest, "CACHE_DIR", tmp_path)
+    process_file.clear()
+    yield tmp_path
+    process_file.clear()
+
+
+@pytest.fixture
+def process_upload(isolated_cache, monkeypatch):
+    """
+    ``process(path, ...)`` runs the same synthetic export through one ingest
+    path: ``serial``, ``parallel`` (byte-range workers) or ``streamed`` (gzip).
+    """
+    def process(path: str = "serial", compact: bool = False, local_time: bool = False):
+        upload = synthetic_upload(ROWS, seed=SEED, gzipped=(path == "streamed"), extra_metrics=True)
+        with monkeypatch.context() as patch:
+            if path == "parallel":
+                patch.setattr(parallel_ingest, "PARALLEL_MIN_BYTES", 0)
+                patch.setattr(parallel_ingest, "MAX_WORKERS", 3)
+            assert parallel_ingest.use_parallel_ingest(upload) == (path == "parallel")
+            report = process_file(upload, local_time=local_time, compact=compact)
+        process_file.clear()  # the next path must not be answered from the cache
+        return report
+    return process
@@ -0,0 +1,41 @@
+# tests/report_checks.py
+"""Shared by the ingest tests: the synthetic export's size, and report / stored-row comparisons."""
+import numpy as np
+import pandas as pd
+
+from utils.processed_report import VIEW_NAMES
+from utils.raw_store import iter_raw_frames
+
+# the synthetic export every ingest test processes
+ROWS = 6_000
+SEED = 7
+
+
+def raw_rows(report) -> pd.DataFrame:
+    return pd.concat(iter_raw_frames(report["raw_path"]), ignore_index=True)
+
+
+def assert_same_report(expected, actual) -> None:
+    """Every summary view of every metric, prime windows, anomalies, networks and date index are equal."""
+    assert actual["metrics"] == expected["metrics"]
+    for metric in expected["metrics"]:
+        for name in VIEW_NAMES:
+            pd.testing.assert_frame_equal(
+                actual.view(name, metric).reset_index(drop=True),
+                expected.view(name, metric).reset_index(drop=True),
+                obj=f"{name}[{metric}]",
+            )
+    assert actual["airport_prime_windows"] == expected["airport_prime_windows"]
+    pd.testing.assert_frame_equal(actual["airport_anomalies"], expected["airport_anomalies"])
+    pd.testing.assert_series_equal(
+        actual.airport_networks.map(sorted), expected.airport_networks.map(sorted)
+    )
+
+    expected_index, actual_index = expected["date_index"], actual["date_index"]
+    np.testing.assert_array_equal(actual_index.dates, expected_index.dates)
+    for part in ("airports", "systems"):
+        expected_part, actual_part = getattr(expected_index, part), getattr(actual_index, part)
+        pd.testing.assert_index_equal(actual_part.labels, expected_part.labels)
+        np.testing.assert_array_equal(actual_part.rows, expected_part.rows)
+        for metric, values in expected_part.values.items():
+            np.testing.assert_allclose(actual_part.values[metric], values, rtol=1e-9)  # float sums vary by order
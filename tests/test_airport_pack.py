@@ -0,0 +1,34 @@
+# tests/test_airport_pack.py
+"""The airport pack zip: one readable workbook (or CSV folder) per airport, in airport order."""
+import io
+import zipfile
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from utils.airport_pack import build_airport_pack
+from utils.prime_windows import prime_windows_by_airport
+
+
+def _matrix() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(rng.integers(0, 1000, (3, 24)).astype(float), index=["ATL", "DEN", "SEA"], columns=range(24))
+
+
+def test_xlsx_pack():
+    matrix = _matrix()
+    pack = zipfile.ZipFile(io.BytesIO(build_airport_pack(matrix, prime_windows_by_airport(matrix), "xlsx")))
+    assert pack.namelist() == ["ATL_Atlanta.xlsx", "DEN_Denver.xlsx", "SEA_Seattle.xlsx"]
+    wb = openpyxl.load_workbook(io.BytesIO(pack.read("DEN_Denver.xlsx")))
+    assert wb.sheetnames == ["Hourly", "Top_10", "Prime_Windows"]
+    assert [c.value for c in wb["Hourly"][1]] == ["Hour_24", "Hour", "Total_Plays", "Rank"]
+    assert sum(row[2] for row in wb["Hourly"].iter_rows(min_row=2, values_only=True)) == matrix.loc["DEN"].sum()
+
+
+def test_csv_pack():
+    matrix = _matrix()
+    pack = zipfile.ZipFile(io.BytesIO(build_airport_pack(matrix, prime_windows_by_airport(matrix), "csv")))
+    assert len(pack.namelist()) == 3 * 3
+    top = pd.read_csv(pack.open("ATL_Atlanta/top_10.csv"))
+    assert len(top) == 10 and top["Rank"].is_monotonic_increasing
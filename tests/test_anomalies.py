@@ -0,0 +1,36 @@
+# tests/test_anomalies.py
+"""Low-hour flags: real drops are flagged, the export's cut-off first and last days are not."""
+import numpy as np
+import pandas as pd
+
+from utils.anomalies import find_airport_anomalies
+from utils.date_index import build_date_index
+
+
+def _cube(first_hour: int, last_hour: int, days: int = 10) -> pd.DataFrame:
+    """One airport, 100 plays every hour, the export starting at ``first_hour`` and ending at ``last_hour``."""
+    stamps = pd.date_range("2025-05-01", periods=days * 24, freq="h")
+    stamps = stamps[(stamps >= stamps[0] + pd.Timedelta(hours=first_hour))
+                    & (stamps <= stamps[-1] - pd.Timedelta(hours=23 - last_hour))]
+    return pd.DataFrame({
+        "System_Type": "Airport", "Airport": "DEN",
+        "Date": stamps.normalize(), "Hour_24": stamps.hour, "# Plays": np.full(len(stamps), 100, dtype="int64"),
+    })
+
+
+def test_partial_first_and_last_days_are_not_flagged():
+    assert find_airport_anomalies(build_date_index(_cube(first_hour=18, last_hour=5))).empty
+
+
+def test_offline_hours_are_flagged():
+    cube = _cube(first_hour=18, last_hour=5)
+    offline = (cube["Date"] == "2025-05-05") & cube["Hour_24"].between(9, 11)
+    flags = find_airport_anomalies(build_date_index(cube[~offline]))  # no rows at all: screens offline
+    assert flags["Hour_24"].tolist() == [9, 10, 11]
+    assert (flags["Date"] == "2025-05-05").all() and (flags["Plays"] == 0).all()
+
+
+def test_no_airport_rows_give_an_empty_typed_table():
+    roadside = _cube(first_hour=0, last_hour=23).assign(System_Type="Roadside", Airport=np.nan)
+    flags = find_airport_anomalies(build_date_index(roadside))
+    assert flags.empty and pd.api.types.is_datetime64_dtype(flags["Date"])
@@ -0,0 +1,29 @@
+# tests/test_compact_storage.py
+"""Compact storage keeps only the aggregate cube, yet every view matches full storage."""
+import io
+
+import pandas as pd
+import pytest
+
+from report_checks import ROWS, SEED, assert_same_report, raw_rows
+from utils.data_processing import CUBE_DIMENSIONS, export_raw_rows
+from utils.synthetic_report import synthetic_upload
+
+
+@pytest.mark.parametrize("path", ["serial", "parallel", "streamed"])
+def test_compact_matches_full_storage(path, process_upload):
+    full = process_upload("serial")
+    compact = process_upload(path, compact=True)
+    assert compact["compact"]
+    assert_same_report(full, compact)
+
+
+def test_compact_stores_the_cube_and_exports_full_rows(process_upload):
+    full, compact = process_upload("serial"), process_upload("serial", compact=True)
+    stored = raw_rows(compact)
+    assert list(stored.columns[:len(CUBE_DIMENSIONS)]) == CUBE_DIMENSIONS
+    assert len(stored) < len(raw_rows(full))
+
+    exported = pd.read_csv(io.BytesIO(export_raw_rows(synthetic_upload(ROWS, seed=SEED, extra_metrics=True))))
+    assert len(exported) == ROWS
+    assert exported["# Plays"].sum() == stored["# Plays"].sum()
@@ -0,0 +1,33 @@
+# tests/test_compressed_upload.py
+"""Compressed CSV uploads are streamed into the same report as the plain CSV."""
+import bz2
+import gzip
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from report_checks import ROWS, SEED, assert_same_report, raw_rows
+from utils.data_processing import process_file
+from utils.synthetic_report import as_upload, generate_report
+
+
+def _zip(data: bytes) -> bytes:
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("export.csv", data)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("suffix, compress", [
+    (".csv.gz", lambda data: gzip.compress(data, mtime=0)),
+    (".csv.bz2", bz2.compress),
+    (".zip", _zip),
+])
+def test_compressed_matches_plain_csv(suffix, compress, process_upload):
+    plain = process_upload("serial")
+    csv = generate_report(ROWS, seed=SEED, extra_metrics=True).to_csv(index=False).encode("utf-8")
+    streamed = process_file(as_upload(compress(csv), f"export{suffix}"))
+    assert_same_report(plain, streamed)
+    pd.testing.assert_frame_equal(raw_rows(streamed), raw_rows(plain), check_dtype=False)
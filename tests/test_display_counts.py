@@ -0,0 +1,57 @@
+# tests/test_display_counts.py
+"""Distinct-display counts and play rates match a direct count over the stored rows."""
+import numpy as np
+import pandas as pd
+
+from report_checks import raw_rows
+from utils.data_processing import process_file
+from utils.display_counts import combine_displays, count_displays, distinct_displays, play_rate
+from utils.synthetic_report import as_upload, generate_report
+
+
+def _nunique(rows: pd.DataFrame, keys: list) -> pd.Series:
+    return rows.dropna(subset=keys + ["Display"]).groupby(keys)["Display"].nunique().rename("Displays")
+
+
+def test_display_counts_match_nunique(process_upload):
+    report = process_upload("serial")
+    rows = raw_rows(report)
+    airport = rows[rows["System_Type"] == "Airport"]
+
+    hourly = report["airport_hourly"].set_index("Hour_24")
+    pd.testing.assert_series_equal(
+        hourly["Displays"].sort_index(), _nunique(airport, ["Hour_24"]), check_index_type=False, check_dtype=False,
+    )
+    by_code = report["airport_by_network_code"].set_index(["Airport", "Network_Code", "Hour_24"])
+    pd.testing.assert_series_equal(
+        by_code["Displays"].sort_index(), _nunique(airport, ["Airport", "Network_Code", "Hour_24"]),
+        check_index_type=False, check_dtype=False,
+    )
+    pd.testing.assert_series_equal(
+        report["airport_display_matrix"].stack().sort_index(), _nunique(airport, ["Airport", "Hour_24"]),
+        check_names=False, check_index_type=False, check_dtype=False,
+    )
+    np.testing.assert_allclose(
+        by_code["Play_Rate"], (by_code["Network_Plays"] / by_code["Displays"]).round(2),
+    )
+
+
+def test_partial_display_tables_combine_in_any_order(process_upload):
+    rows = raw_rows(process_upload("serial"))
+    whole = count_displays(distinct_displays(rows), ["Market_Code", "Hour_24"])
+    parts = [distinct_displays(part) for part in np.array_split(rows.sample(frac=1, random_state=0), 4)]
+    for ordered in (parts, parts[::-1]):
+        pd.testing.assert_frame_equal(count_displays(combine_displays(ordered), ["Market_Code", "Hour_24"]), whole)
+
+
+def test_play_rate_without_displays_is_missing():
+    rate = play_rate(pd.Series([10, 9, 0]), pd.Series([4, 0, 0]))
+    assert rate[0] == 2.5 and rate[1:].isna().all()
+
+
+def test_an_upload_without_airport_rows_has_no_airport_displays(isolated_cache):
+    export = generate_report(2_000, seed=3)
+    roadside = export[export["Network Code"].isna()]
+    report = process_file(as_upload(roadside.to_csv(index=False).encode("utf-8"), "roadside.csv"))
+    assert report["airport_by_network_code"].empty and report["airport_hourly"].empty
+    assert report["roadside_by_market"]["Displays"].sum() > 0
@@ -0,0 +1,22 @@
+# tests/test_local_time.py
+"""Local-time mode shifts airport screens to their airport's timezone, and nothing else."""
+import pandas as pd
+
+from utils.data_processing import clean_frame
+
+
+def _rows(system: str, network_code: str, display: str) -> dict:
+    return {
+        "System": system, "Display": display, "Network Code": network_code,
+        "# Plays": 1, "Date & Hour - EST": "05/01/2025 10:00:00 AM",
+    }
+
+
+def test_local_time_converts_airport_rows_only():
+    df = pd.DataFrame([
+        _rows("AdPortal", "DEN_DIG", "den_a1"),
+        _rows("SpotChart", "DEN_ROAD", "12DEN34"),  # roadside code with an airport prefix
+        _rows("AdPortal", "ZZZ_DIG", "zzz_a1"),  # no known timezone
+    ])
+    cleaned = clean_frame(df, local_time=True)
+    assert cleaned["Hour_24"].tolist() == [8, 10, 10]
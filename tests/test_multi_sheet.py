@@ -0,0 +1,79 @@
+# tests/test_multi_sheet.py
+"""A workbook split over several sheets: one worker per sheet agrees with the serial read."""
+import io
+
+import pandas as pd
+import pytest
+
+import utils.parallel_ingest as parallel_ingest
+from report_checks import ROWS, SEED, assert_same_report, raw_rows
+from utils.data_processing import process_file
+from utils.schema import SchemaError, parse_timestamps, validate_upload
+from utils.synthetic_report import as_upload, generate_report
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _workbook(sheets: dict):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+    return as_upload(output.getvalue(), "export.xlsx", XLSX)
+
+
+@pytest.fixture(scope="module")
+def export() -> pd.DataFrame:
+    return generate_report(ROWS, seed=SEED, extra_metrics=True)
+
+
+@pytest.fixture(scope="module")
+def weeks(export) -> dict:
+    """The export split by week, plus a blank sheet that must be skipped."""
+    dates = parse_timestamps(export["Date & Hour - EST"]).dt.normalize()
+    first_week = dates < dates.min() + pd.Timedelta(days=7)
+    return {"Week 1": export[first_week], "Notes": pd.DataFrame(), "Week 2": export[~first_week]}
+
+
+def _process(upload, monkeypatch, parallel: bool):
+    sheets = validate_upload(upload)
+    with monkeypatch.context() as patch:
+        if parallel:
+            patch.setattr(parallel_ingest, "PARALLEL_SHEETS_MIN_BYTES", 0)
+            patch.setattr(parallel_ingest, "MAX_WORKERS", 3)
+        assert parallel_ingest.use_parallel_sheets(upload, sheets) == parallel
+        report = process_file(upload, _sheets=sheets)
+    process_file.clear()  # the next path must not be answered from the cache
+    return report
+
+
+def test_sheets_in_parallel_match_serial(isolated_cache, monkeypatch, export, weeks):
+    assert validate_upload(_workbook(weeks)) == ["Week 1", "Week 2"]
+
+    serial = _process(_workbook(weeks), monkeypatch, parallel=False)
+    parallel = _process(_workbook(weeks), monkeypatch, parallel=True)
+    assert_same_report(serial, parallel)
+    pd.testing.assert_frame_equal(raw_rows(parallel), raw_rows(serial), check_dtype=False)
+
+    # and both match the same rows uploaded as one CSV
+    single = as_upload(export.to_csv(index=False).encode("utf-8"), "export.csv")
+    assert_same_report(_process(single, monkeypatch, parallel=False), parallel)
+
+
+def test_padded_headers_are_read_the_same_by_sheet_workers(isolated_cache, monkeypatch, weeks):
+    padded = {name: df.rename(columns=lambda c: f" {c} ") for name, df in weeks.items()}
+    assert_same_report(
+        _process(_workbook(weeks), monkeypatch, parallel=False),
+        _process(_workbook(padded), monkeypatch, parallel=True),
+    )
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_a_bad_sheet_is_reported_not_dropped(isolated_cache, monkeypatch, weeks, parallel):
+    upload = _workbook({**weeks, "Week 2": weeks["Week 2"].drop(columns="# Plays")})
+    with monkeypatch.context() as patch:
+        if parallel:
+            patch.setattr(parallel_ingest, "PARALLEL_SHEETS_MIN_BYTES", 0)
+            patch.setattr(parallel_ingest, "MAX_WORKERS", 3)
+        with pytest.raises(SchemaError, match=r"^Sheet 'Week 2': .*missing column\(s\): '# Plays'"):
+            process_file(upload)
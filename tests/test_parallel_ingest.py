@@ -0,0 +1,16 @@
+# tests/test_parallel_ingest.py
+"""Byte-range map-reduce ingest gives the same report as the serial path."""
+import pandas as pd
+
+from report_checks import assert_same_report, raw_rows
+
+
+def test_parallel_matches_serial(process_upload):
+    serial = process_upload("serial")
+    parallel = process_upload("parallel")
+    assert_same_report(serial, parallel)
+    pd.testing.assert_frame_equal(raw_rows(parallel), raw_rows(serial), check_dtype=False)
+
+
+def test_parallel_matches_serial_in_local_time(process_upload):
+    assert_same_report(process_upload("serial", local_time=True), process_upload("parallel", local_time=True))
@@ -0,0 +1,118 @@
+# tests/test_prime_windows.py
+"""
+The vectorized prime-window finder against a plain per-airport loop over the
+same rules (score desc / shorter / earlier, weak-edge trim, second window),
+plus the sidebar parameters and their per-tuple memoization.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import prime_windows
+from utils.prime_windows import (
+    PRIME_FIRST_HOUR,
+    PRIME_LAST_HOUR,
+    PrimeWindowParams,
+    cached_prime_windows_by_airport,
+    find_prime_play_windows,
+    prime_windows_by_airport,
+)
+
+
+def _trim(plays, start, end, params):
+    while end - start + 1 > params.min_window_len:
+        total = sum(plays[h] for h in range(start, end + 1))
+        if plays[start] >= params.low_hour_relative_threshold * total / (end - start + 1):
+            break
+        start += 1
+    while end - start + 1 > params.min_window_len:
+        total = sum(plays[h] for h in range(start, end + 1))
+        if plays[end] >= params.low_hour_relative_threshold * total / (end - start + 1):
+            break
+        end -= 1
+    return start, end, int(sum(plays[h] for h in range(start, end + 1)))
+
+
+def reference_windows(plays: dict, params: PrimeWindowParams) -> list:
+    """``plays`` maps hour → plays for the hours that have rows."""
+    candidates = []
+    for start in range(PRIME_FIRST_HOUR, PRIME_LAST_HOUR + 1):
+        for dur in range(params.min_window_len, params.max_window_len + 1):
+            hours = range(start, start + dur)
+            if hours[-1] > PRIME_LAST_HOUR or any(h not in plays for h in hours):
+                break
+            total = sum(plays[h] for h in hours)
+            density = total / dur
+            weak = sum(plays[h] < params.low_hour_relative_threshold * density for h in hours)
+            score = round(density * (1.0 - params.weak_hour_penalty_per_fraction * weak / dur), 2)
+            candidates.append((-score, dur, start, total))
+    if not candidates:
+        return []
+    candidates.sort()
+
+    _, dur, start, _ = candidates[0]
+    s1, e1, plays1 = _trim(plays, start, start + dur - 1, params)
+    windows = [(s1, e1, plays1)]
+    threshold = params.min_plays_percent_of_range1 * plays1
+    for _, dur, start, total in candidates[1:]:
+        end = start + dur - 1
+        if not (end < s1 or start > e1) or int(total) < threshold:
+            continue
+        s2, e2, plays2 = _trim(plays, start, end, params)
+        if e2 - s2 + 1 >= params.min_window_len and plays2 >= threshold:
+            windows.append((s2, e2, plays2))
+            break
+    return windows
+
+
+def _random_matrix(seed: int, n_airports: int = 40) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    matrix = rng.integers(0, 500, size=(n_airports, 24)).astype("float64")
+    matrix[rng.random(matrix.shape) < 0.1] = np.nan  # hours with no rows
+    matrix[0] = np.nan  # an airport with no prime-hour data at all
+    matrix[1, :] = 100.0  # flat day: ties broken by duration then start
+    return pd.DataFrame(matrix, index=[f"A{i:02d}" for i in range(n_airports)], columns=range(24))
+
+
+@pytest.mark.parametrize("params", [
+    PrimeWindowParams(),
+    PrimeWindowParams(min_window_len=1, max_window_len=6),
+    PrimeWindowParams(min_window_len=3, max_window_len=3, low_hour_relative_threshold=0.9),
+    PrimeWindowParams(weak_hour_penalty_per_fraction=0.5, min_plays_percent_of_range1=0.4),
+])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_vectorized_finder_matches_reference(params, seed):
+    matrix = _random_matrix(seed)
+    windows = prime_windows_by_airport(matrix, params)
+    for airport, row in matrix.iterrows():
+        expected = reference_windows(row.dropna().to_dict(), params)
+        assert windows[airport] == expected, airport
+
+        hourly = pd.DataFrame({"Hour_24": row.dropna().index, "Total_Plays": row.dropna().to_numpy()})
+        assert find_prime_play_windows(hourly, params) == expected, airport
+
+
+def test_no_hourly_rows_means_no_windows():
+    assert find_prime_play_windows(pd.DataFrame({"Hour_24": [], "Total_Plays": []})) == []
+
+
+def test_session_params_default_and_clamp_longest_window(monkeypatch):
+    monkeypatch.setattr(prime_windows.st, "session_state", {})
+    assert prime_windows.session_prime_params() == prime_windows.DEFAULT_PRIME_PARAMS
+
+    state = {prime_windows.PARAM_STATE_KEYS["min_window_len"]: 5, prime_windows.PARAM_STATE_KEYS["max_window_len"]: 3}
+    monkeypatch.setattr(prime_windows.st, "session_state", state)
+    params = prime_windows.session_prime_params()
+    assert (params.min_window_len, params.max_window_len) == (5, 5)
+
+
+def test_cached_windows_recompute_per_parameter_tuple():
+    cached_prime_windows_by_airport.clear()
+    matrix = _random_matrix(3)
+    wide = PrimeWindowParams(min_window_len=1, max_window_len=6)
+    assert cached_prime_windows_by_airport("k", PrimeWindowParams(), matrix) == prime_windows_by_airport(matrix)
+
+    # same (dataset, tuple): served from the cache, the unhashed matrix is not looked at again
+    assert cached_prime_windows_by_airport("k", PrimeWindowParams(), matrix * 0) == prime_windows_by_airport(matrix)
+    assert cached_prime_windows_by_airport("k", wide, matrix) == prime_windows_by_airport(matrix, wide)
+    cached_prime_windows_by_airport.clear()
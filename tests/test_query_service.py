@@ -0,0 +1,44 @@
+# tests/test_query_service.py
+"""Conditional GETs against the JSON query service."""
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from utils.dataset_registry import register_dataset
+from utils.query_service import QueryHandler
+
+DATASET = "etag-test"
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    register_dataset(DATASET, {"airport_hourly": pd.DataFrame({"Hour_24": [9], "Total_Plays": [5], "Rank": [1]})})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QueryHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/datasets/{DATASET}/airport_hourly"
+    server.shutdown()
+
+
+def _status(url: str, if_none_match: str = None) -> int:
+    request = urllib.request.Request(url, headers={"If-None-Match": if_none_match} if if_none_match else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def test_if_none_match_lists(base_url):
+    with urllib.request.urlopen(base_url) as response:
+        etag = response.headers["ETag"]
+
+    assert _status(base_url, etag) == 304
+    assert _status(base_url, f'"stale", {etag}') == 304
+    assert _status(base_url, f'"stale",W/{etag}') == 304
+    assert _status(base_url, "*") == 304
+    assert _status(base_url, '"stale", W/"other"') == 200
+    assert _status(base_url) == 200
@@ -0,0 +1,127 @@
+# tests/test_schema.py
+"""Pre-flight validation and export timestamp parsing."""
+import io
+import logging
+
+import pandas as pd
+import pytest
+
+import utils.schema as schema
+from utils.data_processing import process_file
+from utils.schema import SchemaError, parse_timestamps, validate_upload
+from utils.synthetic_report import as_upload, generate_report, synthetic_upload
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _csv(df: pd.DataFrame, name: str = "export.csv"):
+    return as_upload(df.to_csv(index=False).encode("utf-8"), name)
+
+
+def _workbook(sheets: dict, name: str = "export.xlsx"):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+    return as_upload(output.getvalue(), name, XLSX)
+
+
+@pytest.fixture(scope="module")
+def export() -> pd.DataFrame:
+    return generate_report(300, seed=2)
+
+
+def test_valid_exports_pass(export):
+    assert validate_upload(_csv(export)) == []
+    assert validate_upload(_workbook({"Week 1": export, "Blank": pd.DataFrame()})) == ["Week 1"]
+
+
+def test_missing_required_column(export):
+    with pytest.raises(SchemaError, match=r"missing column\(s\): '# Plays'\. Found: 'System', "):
+        validate_upload(_csv(export.drop(columns="# Plays")))
+
+
+def test_network_code_alias_is_accepted(export):
+    validate_upload(_csv(export.rename(columns={"Network Code": "Network_Code"})))
+
+
+@pytest.mark.parametrize("column, value, expected", [
+    ("# Plays", "lots", "Column '# Plays' should contain numbers – found 'lots'."),
+    ("Date & Hour - EST", "Tuesday", "Column 'Date & Hour - EST' should contain dates with hours – found 'Tuesday'."),
+])
+def test_wrong_sample_types(export, column, value, expected):
+    with pytest.raises(SchemaError) as exc:
+        validate_upload(_csv(export.assign(**{column: value})))
+    assert str(exc.value) == expected
+
+
+def test_a_few_bad_sample_values_are_tolerated(export):
+    validate_upload(_csv(export.assign(**{"# Plays": export["# Plays"].where(export.index > 2, "Total")})))
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"", "'export.csv' is empty."),
+    (b"System,Network Code,Display,Date & Hour - EST,# Plays\n", "'export.csv' has a header row but no data rows."),
+])
+def test_empty_file(data, expected):
+    with pytest.raises(SchemaError) as exc:
+        validate_upload(as_upload(data, "export.csv"))
+    assert str(exc.value) == expected
+
+
+def test_workbook_with_a_bad_sheet(export):
+    upload = _workbook({"Week 1": export, "Week 2": export.drop(columns="Display")})
+    with pytest.raises(SchemaError, match=r"^Sheet 'Week 2': .*missing column\(s\): 'Display'"):
+        validate_upload(upload)
+
+
+def test_workbook_without_data():
+    with pytest.raises(SchemaError, match=r"^'export.xlsx' is empty\.$"):
+        validate_upload(_workbook({"Sheet1": pd.DataFrame()}))
+
+
+def test_unreadable_file():
+    with pytest.raises(SchemaError, match=r"^Could not read 'export.xlsx': "):
+        validate_upload(as_upload(b"not a workbook", "export.xlsx", XLSX))
+
+EXPECTED = [pd.Timestamp("2025-05-07 13:00"), pd.Timestamp("2025-05-08 00:00")]
+
+
+@pytest.mark.parametrize("values", [
+    ["05/07/2025 01:00:00 PM", "05/08/2025 12:00:00 AM"],
+    ["05/07/2025 01:00 PM", "05/08/2025 12:00 AM"],
+    ["05/07/2025 13:00:00", "05/08/2025 00:00:00"],
+    ["05/07/2025 13:00", "05/08/2025 00:00"],
+    ["2025-05-07 13:00:00", "2025-05-08T00:00:00"],
+])
+def test_known_layouts_parse_without_fallback(values, caplog):
+    with caplog.at_level(logging.WARNING, logger="utils.schema"):
+        assert parse_timestamps(pd.Series(values)).tolist() == EXPECTED
+    assert not caplog.records
+
+
+def test_mixed_layouts_parse_the_same_in_any_chunk():
+    values = pd.Series(["05/07/2025 01:00:00 PM", "2025-05-08 00:00:00"])
+    assert parse_timestamps(values).tolist() == EXPECTED
+    assert parse_timestamps(values[::-1]).tolist() == EXPECTED[::-1]
+
+
+def test_unknown_layout_falls_back_and_is_logged(caplog):
+    values = pd.Series(["7 May 2025 13:00", "not a date", None])
+    with caplog.at_level(logging.WARNING, logger="utils.schema"):
+        parsed = parse_timestamps(values)
+    assert parsed[0] == EXPECTED[0] and parsed[1:].isna().all()
+    assert "match no known layout" in caplog.text
+
+
+def test_process_file_reuses_the_validated_sheets(isolated_cache, monkeypatch):
+    upload = synthetic_upload(2_000, seed=1)
+    sheets = validate_upload(upload)
+    assert sheets == []  # a CSV has no sheets
+
+    def read_again(*args, **kwargs):
+        raise AssertionError("the upload was validated again")
+
+    monkeypatch.setattr(schema, "read_samples", read_again)
+    report = process_file(upload, _sheets=sheets)
+    assert report["airport_hourly"]["Total_Plays"].sum() > 0
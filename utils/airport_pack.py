@@ -0,0 +1,119 @@
+# utils/airport_pack.py
+import tempfile
+import zipfile
+from typing import BinaryIO, Dict, List, Tuple
+
+import openpyxl
+import pandas as pd
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils.dataframe import dataframe_to_rows
+
+from components.market_drilldown import format_hour, make_market_label
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Per-airport report pack
+# ──────────────────────────────────────────────────────────────────────────────
+# One workbook (or folder of CSVs) per airport – hourly table, top 10 hours and
+# prime windows – built from the airport × hour matrix and the per-airport
+# windows, so no raw rows are read. Files are written one after another
+# straight into the zip entry – openpyxl is pure Python and holds the GIL, so
+# a thread pool bought nothing and only kept every finished file in memory –
+# and the zip itself spills from memory to a temp file once it grows large.
+PACK_SPOOL_BYTES = 32 * 1024 * 1024
+PACK_FORMATS = ("xlsx", "csv")
+TOP_HOURS = 10
+
+
+def airport_tables(
+    plays: pd.Series, windows: List[Tuple[int, int, int]], value_name: str = "Total_Plays"
+) -> Dict[str, pd.DataFrame]:
+    """
+    Hourly table (dense rank, like the drill-down), top hours and prime windows
+    for one airport; totals are headed ``value_name`` (e.g. ``Total_Impressions``).
+    """
+    hourly = plays.dropna().rename("Total_Plays").rename_axis("Hour_24").reset_index()
+    hourly["Hour_24"] = hourly["Hour_24"].astype(int)
+    if (hourly["Total_Plays"] % 1 == 0).all():
+        hourly["Total_Plays"] = hourly["Total_Plays"].astype("int64")
+    hourly["Hour"] = hourly["Hour_24"].apply(format_hour)
+    hourly["Rank"] = hourly["Total_Plays"].rank(method="dense", ascending=False).astype(int)
+    hourly = hourly.sort_values(["Rank", "Hour_24"])[["Hour_24", "Hour", "Total_Plays", "Rank"]]
+
+    prime = pd.DataFrame(
+        [(i + 1, format_hour(s), format_hour(e), e - s + 1, p) for i, (s, e, p) in enumerate(windows)],
+        columns=["Window", "Start", "End", "Hours", "Total_Plays"],
+    )
+    tables = {
+        "Hourly": hourly.sort_values("Hour_24"),
+        "Top_10": hourly.head(TOP_HOURS),
+        "Prime_Windows": prime,
+    }
+    return {name: df.rename(columns={"Total_Plays": value_name}) for name, df in tables.items()}
+
+
+def _airport_workbook(tables: Dict[str, pd.DataFrame]) -> openpyxl.Workbook:
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    bold = Font(bold=True)
+    fill = PatternFill(start_color="FFFFE0", end_color="FFFFE0", fill_type="solid")
+    for name, df in tables.items():
+        ws = wb.create_sheet(name)
+        for r in dataframe_to_rows(df, index=False, header=True):
+            ws.append(r)
+        for cell in ws[1]:
+            cell.font = bold
+        header = [c.value for c in ws[1]]
+        for row in ws.iter_rows(min_row=2):
+            for cell in row:
+                if isinstance(cell.value, int):
+                    cell.number_format = "#,##0"
+            if "Rank" in header and row[header.index("Rank")].value == 1:
+                for cell in row:
+                    cell.fill = fill
+    return wb
+
+
+def _write_airport_files(
+    zf: zipfile.ZipFile, code: str, plays: pd.Series, windows: list, fmt: str, value_name: str
+) -> None:
+    """Write one airport's workbook (or CSV folder) into the open zip."""
+    tables = airport_tables(plays, windows, value_name)
+    stem = f"{code}_{make_market_label(code)}".replace("/", "-").replace(" ", "_")
+    if fmt == "xlsx":
+        with zf.open(f"{stem}.xlsx", "w") as entry:
+            _airport_workbook(tables).save(entry)
+        return
+    for name, df in tables.items():
+        with zf.open(f"{stem}/{name.lower()}.csv", "w") as entry:
+            entry.write(df.to_csv(index=False).encode("utf-8"))
+
+
+def write_airport_pack(
+    output: BinaryIO,
+    airport_hour_matrix: pd.DataFrame,
+    windows_by_airport: Dict[str, list],
+    fmt: str = "xlsx",
+    value_name: str = "Total_Plays",
+) -> None:
+    """Write the pack zip to ``output``, one airport at a time in airport order."""
+    if fmt not in PACK_FORMATS:
+        raise ValueError(f"Unknown pack format '{fmt}'")
+    matrix = airport_hour_matrix.reindex(columns=range(24))
+    # workbooks are already deflated; CSVs compress well
+    compression = zipfile.ZIP_STORED if fmt == "xlsx" else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(output, "w", compression=compression) as zf:
+        for code in matrix.index:
+            _write_airport_files(zf, code, matrix.loc[code], windows_by_airport.get(code, []), fmt, value_name)
+
+
+def build_airport_pack(
+    airport_hour_matrix: pd.DataFrame,
+    windows_by_airport: Dict[str, list],
+    fmt: str = "xlsx",
+    value_name: str = "Total_Plays",
+) -> bytes:
+    """Zip of one workbook (``xlsx``) or one folder of CSVs (``csv``) per airport."""
+    with tempfile.SpooledTemporaryFile(max_size=PACK_SPOOL_BYTES) as spool:
+        write_airport_pack(spool, airport_hour_matrix, windows_by_airport, fmt, value_name)
+        spool.seek(0)
+        return spool.read()
@@ -0,0 +1,77 @@
+# utils/anomalies.py
+import numpy as np
+import pandas as pd
+
+from utils.date_index import DateIndex
+from utils.metrics import DEFAULT_METRIC
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Low-hour anomaly flags
+# ──────────────────────────────────────────────────────────────────────────────
+# For every airport and hour of day the baseline is the median of that hour's
+# daily plays over the days the airport reported at all (an hour with no rows
+# on such a day counts as 0 plays – screens offline). The export's first and
+# last days are usually cut mid-day, so on an airport's first and last
+# reporting day the hours before its first / after its last row are left out
+# instead. Each day's hour is scored with a robust z-score,
+# 0.6745 · (plays − median) / MAD, and flagged when it falls below ANOMALY_Z.
+# All airports, dates and hours are scored at once from the date index's
+# airport × date × hour array.
+ANOMALY_Z = -3.5  # Iglewicz–Hoaglin cut-off for modified z-scores
+MIN_BASELINE_DAYS = 5  # fewer reporting days → no baseline, no flags
+MIN_BASELINE_PLAYS = 10  # ignore hours that are normally (near) empty
+MIN_SCALE_FRACTION = 0.05  # MAD floor as a share of the median, for very steady hours
+
+ANOMALY_COLUMNS = ["Airport", "Date", "Hour_24", "Plays", "Baseline", "Robust_Z"]
+ANOMALY_DTYPES = {"Date": "datetime64[ns]", "Hour_24": "int64", "Plays": "int64", "Baseline": "float64", "Robust_Z": "float64"}
+
+
+def robust_z_scores(index: DateIndex):
+    """
+    Daily plays, per-(airport, hour) medians and robust z-scores, each an
+    airports × dates × hours array (NaN on days the airport did not report).
+    """
+    cumulative = index.airports
+    daily = np.diff(cumulative.values[DEFAULT_METRIC], axis=1).astype("float64")
+    has_rows = np.diff(cumulative.rows, axis=1) > 0  # airports × dates × hours
+    reported = has_rows.any(axis=2)  # airports × dates
+
+    # hours outside the first / last reporting day's span of rows: the export's cut
+    n_dates = reported.shape[1]
+    dates = np.arange(n_dates)[None, :, None]
+    hours = np.arange(has_rows.shape[2])[None, None, :]
+    first_day = reported.argmax(axis=1)[:, None, None]
+    last_day = (n_dates - 1 - reported[:, ::-1].argmax(axis=1))[:, None, None]
+    first_hour = has_rows.argmax(axis=2)[..., None]
+    last_hour = (has_rows.shape[2] - 1 - has_rows[..., ::-1].argmax(axis=2))[..., None]
+    cut = ((dates == first_day) & (hours < first_hour)) | ((dates == last_day) & (hours > last_hour))
+    daily = np.where(reported[..., None] & ~cut, daily, np.nan)
+
+    with np.errstate(all="ignore"):
+        baseline = np.nanmedian(daily, axis=1, keepdims=True)  # airports × 1 × hours
+        mad = np.nanmedian(np.abs(daily - baseline), axis=1, keepdims=True)
+        scale = np.maximum(mad, MIN_SCALE_FRACTION * baseline / 0.6745)
+        z = 0.6745 * (daily - baseline) / scale
+
+    days = np.sum(~np.isnan(daily), axis=1, keepdims=True)
+    scored = (days >= MIN_BASELINE_DAYS) & (baseline >= MIN_BASELINE_PLAYS)
+    return daily, baseline, np.where(scored, z, np.nan)
+
+
+def find_airport_anomalies(index: DateIndex) -> pd.DataFrame:
+    """Airport-hours far below their normal level, one row per (airport, date, hour)."""
+    if not len(index.dates) or not len(index.airports.labels):
+        return pd.DataFrame(columns=ANOMALY_COLUMNS).astype(ANOMALY_DTYPES)
+
+    daily, baseline, z = robust_z_scores(index)
+    with np.errstate(invalid="ignore"):
+        airport_idx, date_idx, hour_idx = np.nonzero(z < ANOMALY_Z)
+
+    return pd.DataFrame({
+        "Airport": index.airports.labels[airport_idx],
+        "Date": pd.to_datetime(index.dates[date_idx]),
+        "Hour_24": hour_idx,
+        "Plays": daily[airport_idx, date_idx, hour_idx].astype("int64"),
+        "Baseline": baseline[airport_idx, 0, hour_idx],
+        "Robust_Z": np.round(z[airport_idx, date_idx, hour_idx], 2),
+    }, columns=ANOMALY_COLUMNS)
@@ -0,0 +1,110 @@
+# utils/compare.py
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Period-over-period comparison of two airport × hour cubes
+# ──────────────────────────────────────────────────────────────────────────────
+HOURS = list(range(24))
+
+
+def align_matrices(baseline: pd.DataFrame, current: pd.DataFrame):
+    """Reindex both matrices onto the union of airports and all 24 hours (missing → 0)."""
+    airports = baseline.index.union(current.index)
+    base = baseline.reindex(index=airports, columns=HOURS).fillna(0)
+    cur = current.reindex(index=airports, columns=HOURS).fillna(0)
+    return base, cur
+
+
+def _hour_ranks(matrix: pd.DataFrame) -> pd.DataFrame:
+    """Rank hours within each airport (1 = busiest), ties share the better rank."""
+    return matrix.rank(axis=1, method="min", ascending=False).astype(int)
+
+
+def compare_cubes(baseline: pd.DataFrame, current: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Deltas between two airport × hour play matrices, computed as whole-array
+    operations – no raw rows are touched.
+
+    Returns ``airports`` (per-airport totals, change and top-hour shift; the
+    top hour is <NA> for a period without plays),
+    ``hours`` (network-wide per-hour change) and ``cells`` (every airport-hour
+    with its change and rank shift), each sorted by absolute change.
+    """
+    base, cur = align_matrices(baseline, current)
+    base_arr, cur_arr = base.to_numpy(dtype="float64"), cur.to_numpy(dtype="float64")
+    delta = cur_arr - base_arr
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cell_pct = np.where(base_arr > 0, delta / base_arr * 100, np.nan)
+
+    base_ranks, cur_ranks = _hour_ranks(base).to_numpy(), _hour_ranks(cur).to_numpy()
+
+    # ── per airport ──────────────────────────────────────────────────────
+    base_tot, cur_tot = base_arr.sum(axis=1), cur_arr.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tot_pct = np.where(base_tot > 0, (cur_tot - base_tot) / base_tot * 100, np.nan)
+    # an airport without plays in a period has no top hour there (<NA>: new / dropped)
+    base_top = pd.Series(base_arr.argmax(axis=1), dtype="Int64").mask(base_tot == 0)
+    cur_top = pd.Series(cur_arr.argmax(axis=1), dtype="Int64").mask(cur_tot == 0)
+    airports = pd.DataFrame({
+        "Airport": base.index,
+        "Baseline_Plays": base_tot.astype("int64"),
+        "Current_Plays": cur_tot.astype("int64"),
+        "Change": (cur_tot - base_tot).astype("int64"),
+        "Change_Pct": tot_pct,
+        "Baseline_Top_Hour": base_top,
+        "Current_Top_Hour": cur_top,
+        # only airports with plays in both periods can have moved
+        "Top_Hour_Moved": (base_top != cur_top).fillna(False).astype(bool),
+    })
+    airports = airports.iloc[np.argsort(-np.abs(airports["Change"].to_numpy()), kind="stable")]
+
+    # ── per hour (network-wide) ──────────────────────────────────────────
+    base_hr, cur_hr = base_arr.sum(axis=0), cur_arr.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hr_pct = np.where(base_hr > 0, (cur_hr - base_hr) / base_hr * 100, np.nan)
+    hours = pd.DataFrame({
+        "Hour_24": HOURS,
+        "Baseline_Plays": base_hr.astype("int64"),
+        "Current_Plays": cur_hr.astype("int64"),
+        "Change": (cur_hr - base_hr).astype("int64"),
+        "Change_Pct": hr_pct,
+    })
+
+    # ── every airport-hour cell ──────────────────────────────────────────
+    n_airports = len(base.index)
+    cells = pd.DataFrame({
+        "Airport": np.repeat(base.index.to_numpy(), 24),
+        "Hour_24": np.tile(HOURS, n_airports),
+        "Baseline_Plays": base_arr.ravel().astype("int64"),
+        "Current_Plays": cur_arr.ravel().astype("int64"),
+        "Change": delta.ravel().astype("int64"),
+        "Change_Pct": cell_pct.ravel(),
+        "Rank_Shift": (base_ranks - cur_ranks).ravel(),  # > 0 → hour climbed
+    })
+    cells = cells.iloc[np.argsort(-np.abs(cells["Change"].to_numpy()), kind="stable")]
+
+    return {
+        "airports": airports.reset_index(drop=True),
+        "hours": hours,
+        "cells": cells.reset_index(drop=True),
+    }
+
+
+def compare_prime_windows(baseline: Dict[str, list], current: Dict[str, list]) -> pd.DataFrame:
+    """
+    One row per airport whose prime window(s) differ between the two periods;
+    airports present in only one period (new / dropped) are not counted.
+    """
+    def _fmt(windows: list) -> tuple:
+        return tuple((int(s), int(e)) for s, e, _ in windows)
+
+    rows = []
+    for airport in sorted(set(baseline) & set(current)):
+        before, after = _fmt(baseline[airport]), _fmt(current[airport])
+        if before != after:
+            rows.append({"Airport": airport, "Baseline_Windows": before, "Current_Windows": after})
+    return pd.DataFrame(rows, columns=["Airport", "Baseline_Windows", "Current_Windows"])
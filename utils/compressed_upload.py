@@ -0,0 +1,91 @@
+# utils/compressed_upload.py
+import bz2
+import gzip
+import io
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Compressed uploads
+# ──────────────────────────────────────────────────────────────────────────────
+# .csv.gz / .csv.bz2 exports and .zip archives holding one CSV or XLSX export.
+# CSVs are decompressed as a stream while pandas parses them in chunks, so the
+# uncompressed file never exists in memory or on disk. A workbook inside a zip
+# is read out as-is: xlsx is itself a zip container that openpyxl must seek in,
+# and it is already compressed.
+UPLOAD_TYPES = ["xlsx", "csv", "gz", "bz2", "zip"]  # st.file_uploader matches the last suffix
+COMPRESSED_SUFFIXES = (".csv.gz", ".csv.bz2", ".zip")
+EXPORT_SUFFIXES = (".csv", ".xlsx")
+
+
+class CompressedUploadError(ValueError):
+    """The archive does not hold exactly one CSV or XLSX export."""
+
+
+def is_compressed(uploaded_file) -> bool:
+    return uploaded_file.name.lower().endswith(COMPRESSED_SUFFIXES)
+
+
+def _zip_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and info.filename.lower().endswith(EXPORT_SUFFIXES)
+    ]
+    if len(members) != 1:
+        found = ", ".join(info.filename for info in members) or "none"
+        raise CompressedUploadError(f"The zip should contain exactly one .csv or .xlsx export (found: {found}).")
+    return members[0]
+
+
+def export_name(uploaded_file) -> str:
+    """Name of the export inside the upload – ``report.csv.gz`` → ``report.csv``."""
+    name = uploaded_file.name
+    lowered = name.lower()
+    if lowered.endswith((".csv.gz", ".csv.bz2")):
+        return name.rsplit(".", 1)[0]
+    if lowered.endswith(".zip"):
+        position = uploaded_file.tell()
+        try:
+            uploaded_file.seek(0)
+            with zipfile.ZipFile(uploaded_file) as archive:
+                return _zip_member(archive).filename
+        except zipfile.BadZipFile as exc:
+            raise CompressedUploadError(f"'{name}' is not a readable zip archive.") from exc
+        finally:
+            uploaded_file.seek(position)
+    return name
+
+
+def is_csv_upload(uploaded_file) -> bool:
+    """True for a CSV export, plain or compressed."""
+    return export_name(uploaded_file).lower().endswith(".csv")
+
+
+@contextmanager
+def open_export(uploaded_file) -> Iterator[BinaryIO]:
+    """
+    Binary stream of the export inside the upload, from its start. Compressed
+    CSVs decompress lazily as the stream is read; plain uploads are returned
+    as themselves.
+    """
+    uploaded_file.seek(0)
+    lowered = uploaded_file.name.lower()
+    if lowered.endswith(".csv.gz"):
+        with gzip.GzipFile(fileobj=uploaded_file, mode="rb") as stream:
+            yield stream
+    elif lowered.endswith(".csv.bz2"):
+        with bz2.BZ2File(uploaded_file, mode="rb") as stream:
+            yield stream
+    elif lowered.endswith(".zip"):
+        with zipfile.ZipFile(uploaded_file) as archive:
+            member = _zip_member(archive)
+            with archive.open(member) as stream:
+                if member.filename.lower().endswith(".xlsx"):
+                    yield io.BytesIO(stream.read())  # openpyxl needs to seek in the workbook
+                else:
+                    yield stream
+    else:
+        yield uploaded_file
@@ -1,7 +1,8 @@
 # utils/data_processing.py
+import hashlib
 import io
-from datetime import datetime
-from typing import Dict, Any
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional
 
 import numpy as np
 import openpyxl
@@ -13,74 +14,98 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 # ──────────────────────────────────────────────────────────────────────────────
 #  Helper imports for Airport → Market tagging
 # ──────────────────────────────────────────────────────────────────────────────
-from components.market_drilldown import extract_airport, make_market_label
+from utils.anomalies import find_airport_anomalies
+from utils.compressed_upload import is_compressed, is_csv_upload, open_export
+from utils.dataset_registry import register_dataset
+from utils.display_counts import distinct_displays, with_display_counts
+from utils.date_index import build_date_index
+from utils.metrics import DEFAULT_METRIC, metric_columns
+from utils.prime_windows import find_prime_play_windows
+from utils.processed_report import (
+    SUMMARY_NAMES,
+    ProcessedReport,
+    aggregate_summaries,
+    summary_view,
+)
+from utils.raw_store import iter_raw_frames, write_raw_frame
+from utils.schema import parse_timestamps, validate_upload
+from components.market_drilldown import (
+    AIRPORT_TIMEZONE,
+    SOURCE_TIMEZONE,
+    extract_airport,
+    make_market_label,
+)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-#  MAIN FILE-PROCESSING FUNCTION
+#  Local-time conversion
 # ──────────────────────────────────────────────────────────────────────────────
-@st.cache_resource
-def process_file(uploaded_file) -> Dict[str, Any]:
+def local_timestamps(timestamps: pd.Series, airports: pd.Series) -> pd.Series:
     """
-    Parse the uploaded Excel/CSV, build all required summaries,
-    generate an Excel report, and return everything in a single dict.
+    Convert naive Eastern timestamps to each airport's local wall-clock time.
+
+    Rows are grouped by timezone so every group costs a single vectorised
+    ``tz_convert``; rows without a known airport keep their Eastern time.
     """
-    # 1. ── LOAD ────────────────────────────────────────────────────────────
-    if uploaded_file.name.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
-
-    original_cols = df.columns.tolist()
-
-    # 2. ── INITIAL CLEAN / EXTRA COLUMNS ───────────────────────────────────
-    def parse_system(row):
-        val = str(row["System"]).strip().upper()
-        if "SPOTCHART" in val:
-            return "Roadside"
-        if any(x in val for x in ("ADPORTAL", "RTB ADSERVER", "VISTAR SCHEDULING SERVICE")):
-            return "Airport"
-        return "Unknown"
-
-    def market_code(row):
-        display = str(row["Display"]).upper()
-        system_type = row["System_Type"]
-        if system_type == "Roadside":
-            import re
-
-            m = re.match(r"\D*([A-Z]{3})", re.sub(r"^\d+", "", display))
-            return m.group(1) if m else ""
-        return ""
-
-    def airport_group(row):
-        system_type = row["System_Type"]
-        network_code = row["Network Code"]
-        if system_type == "Airport" and pd.notna(network_code):
-            return str(network_code).split("_")[0].upper()
-        return ""
-
-    def hour_24(dt):
-        if pd.isna(dt):
-            return np.nan
-        try:
-            return pd.to_datetime(dt).hour
-        except Exception:
-            return np.nan
-
-    def network_name(row):
-        display = row["Display"]
-        system_type = row["System_Type"]
-        return str(display).upper() if system_type == "Airport" else ""
+    zones = airports.map(AIRPORT_TIMEZONE).fillna(SOURCE_TIMEZONE)
+    localized = timestamps.dt.tz_localize(
+        SOURCE_TIMEZONE,
+        ambiguous=np.zeros(len(timestamps), dtype=bool),  # repeated 1am → standard time
+        nonexistent="shift_forward",
+    )
 
-    # ------ apply cleaning helpers ----------------------------------------
-    df["System_Type"] = df.apply(parse_system, axis=1)
-    df["Hour_24"] = df["Date & Hour - EST"].apply(hour_24)
-    df["Market_Code"] = df.apply(market_code, axis=1)
-    df["Airport_Group"] = df.apply(airport_group, axis=1)
-    df["Network_Name"] = df.apply(network_name, axis=1)
-    df["# Plays"] = pd.to_numeric(df["# Plays"], errors="coerce").fillna(0).astype("int64")
+    local = timestamps.to_numpy(dtype="datetime64[ns]", copy=True)
+    for zone, positions in zones.groupby(zones, sort=False).indices.items():
+        if zone == SOURCE_TIMEZONE:
+            continue
+        converted = localized.iloc[positions].dt.tz_convert(zone).dt.tz_localize(None)
+        local[positions] = converted.to_numpy(dtype="datetime64[ns]")
+    return pd.Series(local, index=timestamps.index, name=timestamps.name)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  ROW CLEANING (module level so parallel ingest workers can run it too)
+# ──────────────────────────────────────────────────────────────────────────────
+def parse_system(row):
+    val = str(row["System"]).strip().upper()
+    if "SPOTCHART" in val:
+        return "Roadside"
+    if any(x in val for x in ("ADPORTAL", "RTB ADSERVER", "VISTAR SCHEDULING SERVICE")):
+        return "Airport"
+    return "Unknown"
+
+
+def market_code(row):
+    display = str(row["Display"]).upper()
+    system_type = row["System_Type"]
+    if system_type == "Roadside":
+        m = re.match(r"\D*([A-Z]{3})", re.sub(r"^\d+", "", display))
+        return m.group(1) if m else ""
+    return ""
+
+
+def airport_group(row):
+    system_type = row["System_Type"]
+    network_code = row["Network_Code"]
+    if system_type == "Airport" and pd.notna(network_code):
+        return str(network_code).split("_")[0].upper()
+    return ""
+
+
+def network_name(row):
+    display = row["Display"]
+    system_type = row["System_Type"]
+    return str(display).upper() if system_type == "Airport" else ""
+
+
+def clean_frame(
+    df: pd.DataFrame,
+    local_time: bool = False,
+    report: Callable[[str, float], None] = lambda stage, fraction: None,
+) -> pd.DataFrame:
+    """Add the System_Type / Market_Code / … / Airport / Date / Hour_24 columns to raw export rows."""
+    df.columns = [str(c).strip() for c in df.columns]
 
-    # 3. ── ***NEW***  TAG AIRPORT + MARKET FOR DRILL-DOWN ──────────────────
     # normalise header
     if "Network Code" in df.columns and "Network_Code" not in df.columns:
         df = df.rename(columns={"Network Code": "Network_Code"})
@@ -88,142 +113,175 @@ def process_file(uploaded_file) -> Dict[str, Any]:
     if "Network_Code" not in df.columns:
         raise ValueError("Column 'Network Code' not found in the uploaded file")
 
+    # ------ apply cleaning helpers ----------------------------------------
+    df["System_Type"] = df.apply(parse_system, axis=1)
+    report("Cleaning rows", 0.20)
+    df["Market_Code"] = df.apply(market_code, axis=1)
+    report("Cleaning rows", 0.25)
+    df["Airport_Group"] = df.apply(airport_group, axis=1)
+    report("Cleaning rows", 0.30)
+    df["Network_Name"] = df.apply(network_name, axis=1)
+    for metric in metric_columns(df.columns):
+        df[metric] = pd.to_numeric(df[metric], errors="coerce").fillna(0)
+    df[DEFAULT_METRIC] = df[DEFAULT_METRIC].astype("int64")
+
+    # ***NEW***  TAG AIRPORT + MARKET FOR DRILL-DOWN
+    report("Tagging airports and hours", 0.35)
     df["Airport"] = df["Network_Code"].apply(extract_airport)
     df["Market"] = df["Airport"].apply(make_market_label)
 
-    # 4. ── BUILD SUMMARY TABLES ────────────────────────────────────────────
-    raw_data = df.copy()
+    # date + hour of day – parsed once, vectorised; optionally shifted to airport local time
+    timestamps = parse_timestamps(df["Date & Hour - EST"])
+    if local_time:
+        # only airport screens keep airport hours; roadside codes can share an airport prefix
+        timestamps = local_timestamps(timestamps, df["Airport"].where(df["System_Type"] == "Airport"))
+    df["Date"] = timestamps.dt.normalize()
+    df["Hour_24"] = timestamps.dt.hour
+    return df
 
-    # overall hourly
-    overall_hourly = (
-        df.groupby("Hour_24", as_index=False)["# Plays"]
-        .sum()
-        .rename(columns={"# Plays": "Total_Plays"})
-    )
-    overall_hourly = overall_hourly.sort_values(
-        ["Total_Plays", "Hour_24"], ascending=[False, True]
-    )
-    overall_hourly["Rank"] = (
-        overall_hourly.groupby("Total_Plays", group_keys=False).cumcount() + 1
-    )
-    overall_hourly["Rank"] = (
-        overall_hourly["Rank"]
-        + overall_hourly["Total_Plays"].rank(method="min", ascending=False).astype(int)
-        - 1
-    )
-    overall_hourly = overall_hourly.sort_values(["Rank", "Hour_24"])
 
-    # ➜ Roadside / Airport summaries (unchanged from your original code)
-    roadside = df[df["System_Type"] == "Roadside"]
-    roadside_hourly = (
-        roadside.groupby("Hour_24", as_index=False)["# Plays"]
+# ──────────────────────────────────────────────────────────────────────────────
+#  AGGREGATE CUBE
+# ──────────────────────────────────────────────────────────────────────────────
+# Every summary is a sum of a metric column (# Plays, plus any other numeric
+# export columns in METRIC_COLUMNS) over a subset of these columns, so all of
+# them can be built from this much smaller grain instead of the raw rows.
+CUBE_DIMENSIONS = [
+    "System_Type",
+    "Market_Code",
+    "Airport_Group",
+    "Network_Name",
+    "Network_Code",
+    "Airport",
+    "Date",
+    "Hour_24",
+]
+
+
+def aggregate_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sum every metric column over ``CUBE_DIMENSIONS`` in one groupby (missing
+    keys kept as their own group) – the metric block is one rows × metrics array.
+    """
+    return (
+        df.groupby(CUBE_DIMENSIONS, dropna=False, sort=True)[metric_columns(df.columns)]
         .sum()
-        .rename(columns={"# Plays": "Total_Plays"})
-    )
-    roadside_hourly = roadside_hourly.sort_values(
-        ["Total_Plays", "Hour_24"], ascending=[False, True]
-    )
-    roadside_hourly["Rank"] = (
-        roadside_hourly.groupby("Total_Plays", group_keys=False).cumcount() + 1
-    )
-    roadside_hourly["Rank"] = (
-        roadside_hourly["Rank"]
-        + roadside_hourly["Total_Plays"]
-        .rank(method="min", ascending=False)
-        .astype(int)
-        - 1
+        .reset_index()
     )
-    roadside_hourly = roadside_hourly.sort_values(["Rank", "Hour_24"])
 
-    roadside_by_market = (
-        roadside.groupby(["Market_Code", "Hour_24"], as_index=False)["# Plays"]
-        .sum()
-        .rename(columns={"# Plays": "Market_Plays"})
-    )
-    roadside_by_market = roadside_by_market.sort_values(
-        ["Market_Code", "Market_Plays", "Hour_24"], ascending=[True, False, True]
-    )
-    roadside_by_market["Rank_within_Market"] = roadside_by_market.groupby(
-        "Market_Code"
-    )["Market_Plays"].rank(method="min", ascending=False).astype(int)
 
-    airport = df[df["System_Type"] == "Airport"]
-    airport_hourly = (
-        airport.groupby("Hour_24", as_index=False)["# Plays"]
-        .sum()
-        .rename(columns={"# Plays": "Total_Plays"})
-    )
-    airport_hourly = airport_hourly.sort_values(
-        ["Total_Plays", "Hour_24"], ascending=[False, True]
-    )
-    airport_hourly["Rank"] = (
-        airport_hourly.groupby("Total_Plays", group_keys=False).cumcount() + 1
-    )
-    airport_hourly["Rank"] = (
-        airport_hourly["Rank"]
-        + airport_hourly["Total_Plays"].rank(method="min", ascending=False).astype(int)
-        - 1
-    )
-    airport_hourly = airport_hourly.sort_values(["Rank", "Hour_24"])
+def combine_cubes(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """Reduce of partial cubes – exact for integer metrics, so order does not matter."""
+    return aggregate_cube(pd.concat(parts, ignore_index=True))
 
-    airport_by_group = (
-        airport.groupby(["Airport_Group", "Hour_24"], as_index=False)["# Plays"]
-        .sum()
-        .rename(columns={"# Plays": "Group_Plays"})
-    )
-    airport_by_group = airport_by_group.sort_values(
-        ["Airport_Group", "Group_Plays", "Hour_24"], ascending=[True, False, True]
-    )
-    airport_by_group["Rank_within_Group"] = airport_by_group.groupby(
-        "Airport_Group"
-    )["Group_Plays"].rank(method="min", ascending=False).astype(int)
 
-    airport_by_network = (
-        airport.groupby(["Network_Name", "Hour_24"], as_index=False)["# Plays"]
-        .sum()
-        .rename(columns={"# Plays": "Network_Plays"})
-    )
-    airport_by_network = airport_by_network.sort_values(
-        ["Network_Name", "Network_Plays", "Hour_24"], ascending=[True, False, True]
-    )
-    airport_by_network["Rank_within_Network"] = airport_by_network.groupby(
-        "Network_Name"
-    )["Network_Plays"].rank(method="min", ascending=False).astype(int)
+# ──────────────────────────────────────────────────────────────────────────────
+#  SUMMARY TABLES
+# ──────────────────────────────────────────────────────────────────────────────
+def build_airport_hourly(
+    cube: pd.DataFrame, metric: str = DEFAULT_METRIC, displays: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    airport = cube[cube["System_Type"] == "Airport"]
+    grouped = airport.groupby("Hour_24", as_index=False)[[metric]].sum()
+    if displays is not None:
+        grouped = with_display_counts(grouped, displays[displays["System_Type"] == "Airport"], ["Hour_24"])
+    return summary_view({"airport_by_hour": grouped}, "airport_hourly", metric)
+
+
+def build_metric_summaries(
+    cube: pd.DataFrame, metrics: List[str], displays: Optional[pd.DataFrame] = None
+) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Every summary table for each of ``metrics``, built from the aggregate cube.
+    Each groupby runs once with all metric columns; only the (small) grouped
+    tables are split and ranked per metric. Value columns keep their names
+    (``Total_Plays``, ``Market_Plays``, …) and hold the metric's totals; with
+    ``displays`` the rank column is followed by ``Play_Rate`` and ``Displays``.
+    ``process_file`` builds the same tables lazily through ``ProcessedReport``.
+    """
+    aggregates = aggregate_summaries(cube, metrics, displays)
+    return {
+        metric: {name: summary_view(aggregates, name, metric) for name in SUMMARY_NAMES}
+        for metric in metrics
+    }
+
+
+def build_summaries(
+    cube: pd.DataFrame, metric: str = DEFAULT_METRIC, displays: Optional[pd.DataFrame] = None
+) -> Dict[str, pd.DataFrame]:
+    """Every summary table except airport_hourly for one metric, built from the aggregate cube."""
+    tables = build_metric_summaries(cube, [metric], displays)[metric]
+    del tables["airport_hourly"]
+    return tables
 
-    # 5. ── CREATE EXCEL REPORT (unchanged) ─────────────────────────────────
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  EXCEL REPORT
+# ──────────────────────────────────────────────────────────────────────────────
+# every how many rows the raw-sheet writer reports progress (and checks for cancel)
+RAW_SHEET_PROGRESS_EVERY = 50_000
+# one sheet holds at most this many rows (header included); extra raw rows are left out
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def build_report(
+    raw_path: str,
+    n_raw: int,
+    tables: Mapping[str, pd.DataFrame],
+    report: Callable[[str, float], None] = lambda stage, fraction: None,
+    raw_sheet: str = "Raw_Data",
+) -> bytes:
+    """Write the Excel report; stored rows are streamed from the Arrow store in batches."""
     output = io.BytesIO()
     wb = openpyxl.Workbook()
 
     ws_raw = wb.active
-    ws_raw.title = "Raw_Data"
-    for r in dataframe_to_rows(raw_data, index=False, header=True):
-        ws_raw.append(r)
+    ws_raw.title = raw_sheet
+    remaining = EXCEL_MAX_ROWS - 1  # data rows that fit under the header
+    for i, batch in enumerate(iter_raw_frames(raw_path, batch_rows=RAW_SHEET_PROGRESS_EVERY)):
+        for r in dataframe_to_rows(batch.head(remaining), index=False, header=(i == 0)):
+            ws_raw.append(r)
+        remaining -= min(len(batch), remaining)
+        report("Writing Excel report", 0.55 + 0.3 * (EXCEL_MAX_ROWS - 1 - remaining) / max(n_raw, 1))
+        if remaining == 0:
+            break
 
     ws_top = wb.create_sheet("Top_Hours_Overall")
-    for r in dataframe_to_rows(overall_hourly.head(10), index=False, header=True):
+    for r in dataframe_to_rows(tables["overall_hourly"].head(10), index=False, header=True):
         ws_top.append(r)
 
     ws_rs_sum = wb.create_sheet("Roadside_Summary")
-    for r in dataframe_to_rows(roadside_hourly.head(5), index=False, header=True):
+    for r in dataframe_to_rows(tables["roadside_hourly"].head(5), index=False, header=True):
         ws_rs_sum.append(r)
 
     ws_rs_market = wb.create_sheet("Roadside_By_Market")
-    for r in dataframe_to_rows(roadside_by_market, index=False, header=True):
+    for r in dataframe_to_rows(tables["roadside_by_market"], index=False, header=True):
         ws_rs_market.append(r)
 
     ws_ap_sum = wb.create_sheet("Airport_Summary")
-    for r in dataframe_to_rows(airport_hourly.head(5), index=False, header=True):
+    for r in dataframe_to_rows(tables["airport_hourly"].head(5), index=False, header=True):
         ws_ap_sum.append(r)
 
     ws_ap_group = wb.create_sheet("Airport_By_Group")
-    for r in dataframe_to_rows(airport_by_group, index=False, header=True):
+    for r in dataframe_to_rows(tables["airport_by_group"], index=False, header=True):
         ws_ap_group.append(r)
 
     ws_ap_net = wb.create_sheet("Airport_By_Network")
-    for r in dataframe_to_rows(airport_by_network, index=False, header=True):
+    for r in dataframe_to_rows(tables["airport_by_network"], index=False, header=True):
         ws_ap_net.append(r)
 
+    ws_ap_code = wb.create_sheet("Airport_By_Network_Code")
+    for r in dataframe_to_rows(tables["airport_by_network_code"], index=False, header=True):
+        ws_ap_code.append(r)
+
+    if "airport_anomalies" in tables:
+        ws_ap_anom = wb.create_sheet("Airport_Anomalies")
+        anomalies = tables["airport_anomalies"].assign(Date=lambda d: d["Date"].dt.date)
+        for r in dataframe_to_rows(anomalies, index=False, header=True):
+            ws_ap_anom.append(r)
+
     # basic header formatting / highlighting (same as your original)
+    report("Formatting Excel report", 0.85)
     bold = Font(bold=True)
     fill = PatternFill(start_color="FFFFE0", end_color="FFFFE0", fill_type="solid")
     for ws in wb.worksheets:
@@ -245,6 +303,7 @@ def process_file(uploaded_file) -> Dict[str, Any]:
             "Rank_within_Market",
             "Rank_within_Group",
             "Rank_within_Network",
+            "Rank_within_Network_Code",
         ):
             if special in [c.value for c in ws[1]]:
                 idx = [c.value for c in ws[1]].index(special) + 1
@@ -253,18 +312,184 @@ def process_file(uploaded_file) -> Dict[str, Any]:
                         for cell in row:
                             cell.fill = fill
 
+    report("Saving Excel report", 0.95)
     wb.save(output)
-    output.seek(0)
+    return output.getvalue()
 
-    # 6. ── PACKAGE & RETURN ────────────────────────────────────────────────
-    summary: Dict[str, Any] = {
-        "overall_hourly": overall_hourly,
-        "roadside_hourly": roadside_hourly,
-        "roadside_by_market": roadside_by_market,
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  MAIN FILE-PROCESSING FUNCTION
+# ──────────────────────────────────────────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def process_file(
+    uploaded_file,
+    local_time: bool = False,
+    compact: bool = False,
+    _progress: Optional[Callable[[str, float], None]] = None,
+    _publish: Optional[Callable[[Mapping[str, Any]], None]] = None,
+    _sheets: Optional[List[str]] = None,
+) -> ProcessedReport:
+    """
+    Parse the uploaded Excel/CSV, aggregate all required summaries, generate
+    an Excel report, and return everything as a ``ProcessedReport`` (read like
+    a dict; summary tables are built on first access).
+
+    With ``local_time`` set, airport rows are bucketed by the airport's own
+    local hour instead of the Eastern hour PowerBI exports. Large CSVs are
+    split into byte ranges – and multi-sheet workbooks into sheets – and
+    cleaned/aggregated in worker processes; the partial cubes are summed
+    exactly, so the tables match the serial path. Every non-blank sheet of a
+    workbook is read and merged. Compressed CSVs (.csv.gz, .csv.bz2, .zip) are
+    parsed chunk by chunk while they are decompressed.
+
+    With ``compact`` set, only the aggregate cube (plays by date, hour, network
+    and system) is stored – every view reads it, and the Excel report carries it
+    in place of the raw rows. Full rows are then only available through
+    ``export_raw_rows``.
+
+    ``_progress(stage, fraction)`` is called between stages; a background job
+    cancels processing by raising from it. ``_publish(results)`` receives each
+    group of finished tables as soon as it exists – airport hourly totals and
+    prime windows first, then the ``ProcessedReport`` itself (still without
+    ``report_bytes``) – so the UI can render early. ``_sheets`` is what
+    ``validate_upload`` returned when the caller already validated the upload;
+    without it the upload is validated here. All three are excluded from the
+    cache key.
+    """
+    report = _progress or (lambda stage, fraction: None)
+    publish = _publish or (lambda results: None)
+
+    # 0. ── PRE-FLIGHT: header + sample rows only (once per upload) ─────────
+    sheets = _sheets
+    if sheets is None:
+        report("Validating file", 0.01)
+        sheets = validate_upload(uploaded_file)
+
+    # 1-3. ── LOAD, CLEAN, TAG → raw store + aggregate cube ──────────────────
+    report("Reading file", 0.02)
+    dataset_key = upload_dataset_key(uploaded_file, local_time, compact)
+
+    if use_parallel_ingest(uploaded_file):
+        cube, displays, raw_path, n_raw = parallel_ingest(
+            uploaded_file, local_time, dataset_key, report, compact=compact
+        )
+    elif use_parallel_sheets(uploaded_file, sheets):
+        cube, displays, raw_path, n_raw = parallel_sheet_ingest(
+            uploaded_file, sheets, local_time, dataset_key, report, compact=compact
+        )
+    elif is_compressed(uploaded_file) and is_csv_upload(uploaded_file):
+        cube, displays, raw_path, n_raw = stream_ingest(
+            uploaded_file, local_time, dataset_key, report, compact=compact
+        )
+    else:
+        df = read_upload(uploaded_file, sheets)
+
+        report("Cleaning rows", 0.15)
+        df = clean_frame(df, local_time, report)
+        n_raw = len(df)
+        cube = aggregate_cube(df)
+        displays = distinct_displays(df)  # distinct displays per cell, for play rates
+        # stored rows go to a memory-mapped Arrow file instead of session memory
+        report("Storing raw rows", 0.38)
+        raw_path = write_raw_frame(cube if compact else df, dataset_key)
+        del df
+    if compact:
+        n_raw = len(cube)
+
+    # 4a. ── AIRPORT HOURLY + PRIME WINDOWS (published first for Overview) ──
+    report("Building airport hourly totals", 0.40)
+    airport_hourly = build_airport_hourly(cube, displays=displays)
+    airport_prime_windows = find_prime_play_windows(airport_hourly)
+    publish({
         "airport_hourly": airport_hourly,
-        "airport_by_group": airport_by_group,
-        "airport_by_network": airport_by_network,
-        "raw": raw_data,  #  ← used by Market Drill-down
-        "report_bytes": output.read(),
-    }
+        "airport_prime_windows": airport_prime_windows,
+    })
+
+    # 4b. ── AGGREGATE REMAINING SUMMARIES (tables are built lazily) ──────
+    report("Building summaries", 0.45)
+    # one groupby pass per summary for all metrics; the report ranks each
+    # metric's tables on first access
+    metrics = metric_columns(cube.columns)
+    aggregates = aggregate_summaries(cube, metrics, displays)
+    date_index = build_date_index(cube)
+    summary = ProcessedReport(
+        aggregates,
+        dataset_key=dataset_key,
+        raw_path=raw_path,  # Arrow file the Excel report streams rows from (cube rows when compact)
+        compact=compact,
+        metrics=metrics,  # metric columns found in the upload
+        date_index=date_index,  # date-range selections
+        airport_prime_windows=airport_prime_windows,  # used by Overview
+        airport_anomalies=find_airport_anomalies(date_index),  # drill-down badges
+        views={"airport_hourly": airport_hourly},
+    )
+    publish(summary)
+
+    # 5. ── CREATE EXCEL REPORT ─────────────────────────────────────────────
+    report("Writing Excel report", 0.55)
+    summary.report_bytes = build_report(
+        raw_path, n_raw, summary, report, raw_sheet="Aggregated_Data" if compact else "Raw_Data",
+    )
+
+    # 6. ── REGISTER & RETURN ───────────────────────────────────────────────
+    register_dataset(dataset_key, summary, name=uploaded_file.name, local_time=local_time, compact=compact)
     return summary
+
+
+def upload_dataset_key(uploaded_file, local_time: bool = False, compact: bool = False) -> str:
+    """Identifies a dataset (file contents + processing mode) for per-dataset caches and job dedup."""
+    return hashlib.sha1(
+        uploaded_file.getvalue() + (b"|local" if local_time else b"|est") + (b"|compact" if compact else b"")
+    ).hexdigest()
+
+
+# peak RSS growth while processing, per byte uploaded (measured on synthetic
+# exports, Excel report included; compressed CSVs expand ~10× before parsing)
+PEAK_MEMORY_PER_BYTE = {"csv": 85, "xlsx": 210, "compressed": 800}
+
+
+def estimate_processing_memory(uploaded_file) -> int:
+    """Rough peak memory (bytes) ``process_file`` needs for this upload, for job admission."""
+    if is_compressed(uploaded_file):
+        factor = PEAK_MEMORY_PER_BYTE["compressed"]
+    else:
+        factor = PEAK_MEMORY_PER_BYTE["csv" if is_csv_upload(uploaded_file) else "xlsx"]
+    return factor * len(uploaded_file.getvalue())
+
+
+def read_upload(uploaded_file, sheets: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Parse the whole upload (CSV, or the given – by default every non-blank –
+    sheets of a workbook; compressed or not) into a frame of export rows.
+    """
+    csv = is_csv_upload(uploaded_file)
+    with open_export(uploaded_file) as stream:
+        if csv:
+            return pd.read_csv(stream, dtype=CSV_TEXT_DTYPES)
+        frames_by_sheet = pd.read_excel(stream, sheet_name=sheets or None)
+    frames = [
+        df.rename(columns=lambda c: str(c).strip())
+        for df in frames_by_sheet.values()
+        if len(df.columns) or len(df)
+    ]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def export_raw_rows(uploaded_file, local_time: bool = False) -> bytes:
+    """
+    Full cleaned rows as CSV – the explicit export path for compact datasets,
+    which keep only the aggregate cube. Re-parses the upload on demand.
+    """
+    df = clean_frame(read_upload(uploaded_file), local_time)
+    return df.to_csv(index=False).encode("utf-8")
+
+
+# imported last: the workers import this module for clean_frame / aggregate_cube
+from utils.parallel_ingest import (  # noqa: E402
+    CSV_TEXT_DTYPES,
+    parallel_ingest,
+    parallel_sheet_ingest,
+    stream_ingest,
+    use_parallel_ingest,
+    use_parallel_sheets,
+)
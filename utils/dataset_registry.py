@@ -0,0 +1,50 @@
+# utils/dataset_registry.py
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Process-wide registry of processed datasets
+# ──────────────────────────────────────────────────────────────────────────────
+# Keyed by the dataset key process_file computes (file contents + mode), so the
+# JSON service and compare mode can reach results produced in any session.
+MAX_DATASETS = 8
+
+_datasets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def register_dataset(dataset_key: str, data: Dict[str, Any], name: str = "", **meta: Any) -> None:
+    """Remember a processed dataset, evicting the least recently used beyond ``MAX_DATASETS``."""
+    entry = {
+        "key": dataset_key,
+        "name": name,
+        "processed_at": datetime.now().isoformat(timespec="seconds"),
+        **meta,
+    }
+    with _lock:
+        _datasets[dataset_key] = {"meta": entry, "data": data}
+        _datasets.move_to_end(dataset_key)
+        while len(_datasets) > MAX_DATASETS:
+            _datasets.popitem(last=False)
+
+
+def get_dataset(dataset_key: str) -> Optional[Dict[str, Any]]:
+    """Processed results for ``dataset_key`` (``"latest"`` = most recent), or None."""
+    with _lock:
+        if not _datasets:
+            return None
+        if dataset_key == "latest":
+            dataset_key = next(reversed(_datasets))
+        entry = _datasets.get(dataset_key)
+        if entry is None:
+            return None
+        _datasets.move_to_end(dataset_key)
+        return entry["data"]
+
+
+def list_datasets() -> List[Dict[str, Any]]:
+    """Metadata for every registered dataset, newest first."""
+    with _lock:
+        return [entry["meta"] for entry in reversed(_datasets.values())]
@@ -0,0 +1,184 @@
+# utils/date_index.py
+from collections import ChainMap
+from datetime import date
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.metrics import DEFAULT_METRIC, metric_columns, session_metric
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Date-range index
+# ──────────────────────────────────────────────────────────────────────────────
+# Every metric per (airport, date, hour) – and per (system type, date, hour) –
+# is stored as running sums over the dataset's dates, so the totals for any date
+# range are one subtraction per (row, hour): O(airports × hours) whatever the
+# number of raw rows or the length of the range. A parallel running count of
+# dates with rows keeps the "NaN = no rows that hour" meaning of the
+# airport × hour matrix exact for every range.
+#
+# Rows without a parseable date or hour are not indexed, so a range covering
+# every date can differ from the whole-upload tables by exactly those rows.
+HOURS = 24
+
+
+class CumulativePlays(NamedTuple):
+    labels: pd.Index  # airports or system types
+    values: Dict[str, np.ndarray]  # metric → labels × (dates + 1) × 24; [:, d] = total before date d
+    rows: np.ndarray  # int32, same shape; dates with rows before date d
+
+
+class DateIndex(NamedTuple):
+    dates: np.ndarray  # sorted unique datetime64[D]
+    airports: CumulativePlays
+    systems: CumulativePlays
+
+
+def _cumulate(keys: pd.Series, date_pos: np.ndarray, hours: np.ndarray,
+              values: Dict[str, np.ndarray], n_dates: int) -> CumulativePlays:
+    keep = keys.notna().to_numpy()
+    codes, labels = pd.factorize(keys[keep], sort=True)
+    cells = (codes * n_dates + date_pos[keep]) * HOURS + hours[keep]  # computed once for all metrics
+    size = len(labels) * n_dates * HOURS
+    shape = (len(labels), n_dates, HOURS)
+
+    cumulative = {}
+    for metric, metric_values in values.items():
+        totals = np.zeros(size, dtype=metric_values.dtype)
+        np.add.at(totals, cells, metric_values[keep])  # integer metrics sum exactly
+        cumulative[metric] = np.zeros((len(labels), n_dates + 1, HOURS), dtype=metric_values.dtype)
+        np.cumsum(totals.reshape(shape), axis=1, out=cumulative[metric][:, 1:])
+
+    present = np.bincount(cells, minlength=size) > 0
+    cum_rows = np.zeros((len(labels), n_dates + 1, HOURS), dtype="int32")
+    np.cumsum(present.reshape(shape), axis=1, dtype="int32", out=cum_rows[:, 1:])
+    return CumulativePlays(pd.Index(labels), cumulative, cum_rows)
+
+
+def build_date_index(cube: pd.DataFrame) -> DateIndex:
+    """Running sums of every metric over dates per (airport, hour) and (system type, hour) from the cube."""
+    dated = cube.dropna(subset=["Date", "Hour_24"])
+    day = dated["Date"].to_numpy(dtype="datetime64[D]")
+    dates = np.unique(day)
+    date_pos = np.searchsorted(dates, day)
+    hours = dated["Hour_24"].to_numpy().astype(int)
+    values = {
+        metric: dated[metric].to_numpy(dtype="int64" if pd.api.types.is_integer_dtype(dated[metric]) else "float64")
+        for metric in metric_columns(dated.columns)
+    }
+    return DateIndex(
+        dates,
+        _cumulate(dated["Airport"], date_pos, hours, values, len(dates)),
+        _cumulate(dated["System_Type"], date_pos, hours, values, len(dates)),
+    )
+
+
+def date_positions(index: DateIndex, start: date, end: date) -> Tuple[int, int]:
+    """Slice ``[lo, hi)`` of ``index.dates`` falling within ``start``…``end`` (inclusive)."""
+    lo = int(np.searchsorted(index.dates, np.datetime64(start, "D"), side="left"))
+    hi = int(np.searchsorted(index.dates, np.datetime64(end, "D"), side="right"))
+    return lo, max(lo, hi)
+
+
+def _range(cumulative: CumulativePlays, metric: str, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray]:
+    values = cumulative.values[metric]
+    return values[:, hi] - values[:, lo], cumulative.rows[:, hi] - cumulative.rows[:, lo]
+
+
+def range_airport_matrix(index: DateIndex, start: date, end: date, metric: str = DEFAULT_METRIC) -> pd.DataFrame:
+    """Airport × hour matrix for ``start``…``end`` – NaN where an airport has no rows that hour."""
+    plays, rows = _range(index.airports, metric, *date_positions(index, start, end))
+    active = rows.any(axis=1)
+    matrix = pd.DataFrame(
+        np.where(rows[active] > 0, plays[active], np.nan),
+        index=index.airports.labels[active].rename("Airport"),
+        columns=pd.RangeIndex(HOURS, name="Hour_24"),
+    )
+    return matrix
+
+
+def range_hourly(
+    index: DateIndex, start: date, end: date, system_type: Optional[str] = "Airport", metric: str = DEFAULT_METRIC
+) -> pd.DataFrame:
+    """
+    Hourly totals and rank for ``start``…``end`` – the same table as
+    ``build_airport_hourly`` (``system_type=None``: every system).
+    """
+    plays, rows = _range(index.systems, metric, *date_positions(index, start, end))
+    if system_type is not None:
+        selected = index.systems.labels == system_type
+        plays, rows = plays[selected], rows[selected]
+    totals, present = plays.sum(axis=0), rows.sum(axis=0) > 0
+
+    hourly = pd.DataFrame({"Hour_24": np.flatnonzero(present), "Total_Plays": totals[present]})
+    hourly = hourly.sort_values(["Total_Plays", "Hour_24"], ascending=[False, True], ignore_index=True)
+    hourly["Rank"] = np.arange(1, len(hourly) + 1)  # ties broken by hour, as in build_airport_hourly
+    return hourly
+
+
+@st.cache_data(show_spinner=False)
+def cached_range_tables(
+    dataset_key: str, start: date, end: date, metric: str, _index: DateIndex
+) -> Dict[str, pd.DataFrame]:
+    """Airport hourly table and airport × hour matrix for a date range, memoized per (dataset, range, metric)."""
+    return {
+        "airport_hourly": range_hourly(_index, start, end, metric=metric),
+        "airport_hour_matrix": range_airport_matrix(_index, start, end, metric),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Session view (date range + metric)
+# ──────────────────────────────────────────────────────────────────────────────
+DATE_RANGE_KEY = "date_range"
+
+
+def dataset_date_bounds(data: Mapping[str, Any]) -> Optional[Tuple[date, date]]:
+    """First and last date of a processed dataset, or None without a date index."""
+    index: Optional[DateIndex] = data.get("date_index")
+    if index is None or not len(index.dates):
+        return None
+    return pd.Timestamp(index.dates[0]).date(), pd.Timestamp(index.dates[-1]).date()
+
+
+def session_date_range(data: Mapping[str, Any]) -> Optional[Tuple[date, date]]:
+    """The sidebar's date range when it narrows the dataset; None when it covers every date."""
+    bounds = dataset_date_bounds(data)
+    selected = st.session_state.get(DATE_RANGE_KEY)
+    if bounds is None or not selected or len(selected) != 2:
+        return None  # no index, or the second date is still being picked
+    start, end = max(selected[0], bounds[0]), min(selected[1], bounds[1])
+    return None if (start, end) == bounds else (start, end)
+
+
+def session_scoped_data(data: Mapping[str, Any]) -> Mapping[str, Any]:
+    """
+    ``data`` as this session's sidebar selects it: the tables of the chosen
+    metric, with the airport hourly table and airport × hour matrix restricted
+    to the chosen date range. The dataset key is suffixed with the metric and
+    range so every per-dataset cache memoizes per selection; the precomputed
+    prime windows are dropped so views recompute them. ``scoped`` marks a
+    view that differs from the whole-upload "# Plays" tables. The selection
+    is layered over ``data`` (no table is copied or built ahead of use);
+    ``data`` is returned unchanged when nothing is selected.
+    """
+    metric = session_metric(data)
+    date_range = session_date_range(data)
+    if metric == DEFAULT_METRIC and date_range is None:
+        return data
+
+    selection: Dict[str, Any] = {"airport_prime_windows": None, "metric": metric, "scoped": True}
+    layers = [data]
+    key = data["dataset_key"]
+    if metric != DEFAULT_METRIC:
+        layers.insert(0, data["metric_tables"][metric])
+        key += f"|{metric}"
+    if date_range is not None:
+        start, end = date_range
+        layers.insert(0, cached_range_tables(data["dataset_key"], start, end, metric, data["date_index"]))
+        selection["date_range"] = date_range
+        key += f"|{start:%Y-%m-%d}|{end:%Y-%m-%d}"
+    selection["dataset_key"] = key
+    return ChainMap(selection, *layers)
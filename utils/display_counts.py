@@ -0,0 +1,85 @@
+# utils/display_counts.py
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Distinct displays behind each total
+# ──────────────────────────────────────────────────────────────────────────────
+# A play rate (plays per screen) needs the number of distinct displays that
+# played in each summary cell. Distinct counts do not add up across groups the
+# way plays do, so besides its cube every ingest part keeps its distinct
+# (cube dimensions without Date, Display) rows – a few rows per display and
+# hour, however many dates the upload spans. Parts are reduced by taking the
+# distinct rows of their concatenation, which is exact in any order.
+#
+# Both passes work on integer codes: columns are factorized, combined into one
+# int64 per row and deduplicated with one sorted ``np.unique``. The other cube
+# dimensions are all derived from System_Type, Network_Code and Display by the
+# cleaning helpers, so those three plus the hour identify a distinct row.
+DISPLAY_DIMENSIONS = [
+    "System_Type",
+    "Market_Code",
+    "Airport_Group",
+    "Network_Name",
+    "Network_Code",
+    "Airport",
+    "Hour_24",
+]
+DISPLAY_KEY = ["System_Type", "Network_Code", "Display", "Hour_24"]
+
+
+def distinct_displays(df: pd.DataFrame) -> pd.DataFrame:
+    """Distinct ``DISPLAY_DIMENSIONS`` + ``Display`` rows of cleaned rows (rows without a display skipped)."""
+    rows = df.loc[df["Display"].notna(), DISPLAY_DIMENSIONS + ["Display"]]
+    row_key = np.zeros(len(rows), dtype="int64")
+    for column in DISPLAY_KEY:
+        codes, labels = pd.factorize(rows[column], use_na_sentinel=False)
+        row_key = row_key * len(labels) + codes
+    _, first = np.unique(row_key, return_index=True)
+    return rows.iloc[first].reset_index(drop=True)
+
+
+def combine_displays(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """Reduce of partial display tables – their distinct union."""
+    return distinct_displays(pd.concat(parts, ignore_index=True))
+
+
+def count_displays(displays: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Distinct displays per ``keys`` group, as ``keys`` + ``Displays`` columns.
+    Rows with a missing key are left out, as in the summaries' groupbys.
+    """
+    rows = displays.dropna(subset=keys)
+    if rows.empty:
+        return pd.DataFrame({**{key: rows[key] for key in keys}, "Displays": pd.Series(dtype="int64")})
+
+    key_codes, key_labels = zip(*(pd.factorize(rows[key], sort=True) for key in keys))
+    shape = tuple(len(labels) for labels in key_labels)
+    group = np.ravel_multi_index(key_codes, shape)
+    display_codes, display_labels = pd.factorize(rows["Display"])
+
+    # one sorted unique pass over group × display pairs, then a count per group
+    pairs = np.unique(group.astype("int64") * len(display_labels) + display_codes)
+    groups, counts = np.unique(pairs // len(display_labels), return_counts=True)
+    positions = np.unravel_index(groups, shape)
+    return pd.DataFrame({
+        **{key: pd.Index(labels).take(position) for key, labels, position in zip(keys, key_labels, positions)},
+        "Displays": counts.astype("int64"),
+    })
+
+
+def with_display_counts(grouped: pd.DataFrame, displays: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """``grouped`` (one row per ``keys`` group) with a ``Displays`` column; 0 where no display is known."""
+    counts = count_displays(displays, keys)
+    if counts.empty:  # e.g. no airport rows – an all-NaN key column would not merge with object keys
+        return grouped.assign(Displays=np.zeros(len(grouped), dtype="int64"))
+    merged =grouped.merge(counts, on=keys, how="left")
+    merged["Displays"] = merged["Displays"].fillna(0).astype("int64")
+    return merged
+
+
+def play_rate(values: pd.Series, displays: pd.Series) -> pd.Series:
+    """``values`` per distinct display, NaN where no display is known."""
+    return (values / displays.where(displays > 0)).round(2)
@@ -0,0 +1,214 @@
+# utils/jobs.py
+import os
+import threading
+from collections import ChainMap, deque
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been asked to stop."""
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  BACKGROUND PROCESSING JOB
+# ──────────────────────────────────────────────────────────────────────────────
+class ProcessingJob:
+    """
+    Run ``func(*args, _progress=job.report, _publish=job.publish, **kwargs)``
+    on a daemon thread.
+
+    The worker calls ``report(stage, fraction)`` between stages; that is where
+    progress is published and where a pending cancel is honoured (by raising
+    ``JobCancelled``), so cancellation is cooperative and never leaves a
+    half-built result behind. ``publish(results)`` layers finished tables over
+    ``partial`` (without copying or materializing them) and bumps ``revision``
+    so the UI can show them before the job ends.
+    """
+
+    def __init__(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        self.stage = "Queued"
+        self.progress = 0.0
+        self.result: Any = None
+        self.partial: Mapping[str, Any] = {}
+        self.revision = 0
+        self.error: Optional[BaseException] = None
+        # set by the scheduler: dedup key, reserved bytes, sessions waiting on it
+        self.key: Optional[str] = None
+        self.memory = 0
+        self.subscribers = 0
+        self._on_done: Optional[Callable[["ProcessingJob"], None]] = None
+
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    # ── control ──────────────────────────────────────────────────────────
+    def start(self) -> "ProcessingJob":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def drop(self) -> None:
+        """Finish a job that was never started (cancelled while still queued)."""
+        self._cancel.set()
+        self.stage = "Cancelled"
+        self._func, self._args, self._kwargs = None, (), {}
+        self._finished.set()
+
+    # ── state ────────────────────────────────────────────────────────────
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    # ── worker side ──────────────────────────────────────────────────────
+    def report(self, stage: str, fraction: float) -> None:
+        """Publish progress; raises ``JobCancelled`` if a cancel is pending."""
+        if self._cancel.is_set():
+            raise JobCancelled(stage)
+        self.stage = stage
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+
+    def publish(self, results: Mapping[str, Any]) -> None:
+        """Expose a group of finished results; raises ``JobCancelled`` if cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.stage)
+        self.partial = ChainMap(results, self.partial) if self.partial else results
+        self.revision += 1
+
+    def _run(self) -> None:
+        try:
+            result = self._func(
+                *self._args, _progress=self.report, _publish=self.publish, **self._kwargs
+            )
+            if not self._cancel.is_set():
+                self.result = result
+                self.stage, self.progress = "Done", 1.0
+        except JobCancelled:
+            self.stage = "Cancelled"
+        except Exception as exc:  # surfaced to the UI, not raised in the thread
+            self.error = exc
+            self.stage = "Failed"
+        finally:
+            # drop the upload and any partial frames so a cancelled job frees its memory
+            self._func, self._args, self._kwargs = None, (), {}
+            self.partial = {}
+            self._finished.set()
+            if self._on_done is not None:
+                self._on_done(self)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  PROCESS-WIDE JOB SCHEDULER
+# ──────────────────────────────────────────────────────────────────────────────
+# Every session's upload goes through one FIFO queue. At most JOB_WORKERS jobs
+# run at once, and a job is only admitted while the memory reserved by running
+# jobs plus its own estimate stays within JOB_MEMORY_BUDGET (a job that alone
+# exceeds the budget still runs once nothing else is running). Jobs are keyed
+# by dataset key, so sessions submitting the same file in the same mode while
+# it is queued or running share one job instead of processing it twice.
+def _physical_memory_mb() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):  # not available on this platform
+        return 8192
+
+
+JOB_WORKERS = int(os.environ.get("TOP_PLAYS_JOB_WORKERS", "0")) or max(1, min(4, os.cpu_count() or 1))
+JOB_MEMORY_BUDGET = (
+    int(os.environ.get("TOP_PLAYS_JOB_MEMORY_MB", "0")) or _physical_memory_mb() // 2
+) * 1024 * 1024
+
+_queue: Deque[ProcessingJob] = deque()
+_running: List[ProcessingJob] = []
+_by_key: Dict[str, ProcessingJob] = {}
+_lock = threading.Lock()
+
+
+def submit_job(key: str, memory: int, func: Callable[..., Any], *args: Any, **kwargs: Any) -> ProcessingJob:
+    """
+    Queue ``func(*args, **kwargs)`` as a ``ProcessingJob`` expected to need
+    ``memory`` bytes, or join the live job already submitted under ``key``.
+    Every call must be paired with one ``release_job`` once the caller stops
+    waiting on the job.
+    """
+    with _lock:
+        job = _by_key.get(key)
+        if job is None or job.cancelled:
+            job = ProcessingJob(func, *args, **kwargs)
+            job.key, job.memory = key, memory
+            job._on_done = _job_finished
+            _by_key[key] = job
+            _queue.append(job)
+        job.subscribers += 1
+        _admit()
+    return job
+
+
+def release_job(job: ProcessingJob) -> None:
+    """Stop waiting on ``job``; it is cancelled once no session is waiting on it."""
+    with _lock:
+        job.subscribers = max(job.subscribers - 1, 0)
+        if job.subscribers or job.done:
+            return
+        if job in _queue:
+            _queue.remove(job)
+            _forget(job)
+            job.drop()
+            _admit()
+        else:
+            job.cancel()  # the worker stops at its next stage; _job_finished frees its slot
+
+
+def queue_position(job: ProcessingJob) -> Optional[int]:
+    """1-based position of ``job`` in the queue, or None once it has started."""
+    with _lock:
+        try:
+            return _queue.index(job) + 1
+        except ValueError:
+            return None
+
+
+def scheduler_status() -> Dict[str, Any]:
+    """Running/queued job counts and reserved memory, for diagnostics."""
+    with _lock:
+        return {
+            "workers": JOB_WORKERS,
+            "running": len(_running),
+            "queued": len(_queue),
+            "reserved_mb": round(sum(job.memory for job in _running) / (1024 * 1024), 1),
+            "budget_mb": round(JOB_MEMORY_BUDGET / (1024 * 1024), 1),
+        }
+
+
+def _forget(job: ProcessingJob) -> None:
+    if _by_key.get(job.key) is job:
+        del _by_key[job.key]
+
+
+def _admit() -> None:
+    """Start queued jobs in order while a worker slot and enough memory are free (``_lock`` held)."""
+    while _queue and len(_running) < JOB_WORKERS:
+        job = _queue[0]
+        reserved = sum(running.memory for running in _running)
+        if _running and reserved + job.memory > JOB_MEMORY_BUDGET:
+            return
+        _queue.popleft()
+        _running.append(job)
+        job.start()
+
+
+def _job_finished(job: ProcessingJob) -> None:
+    with _lock:
+        if job in _running:
+            _running.remove(job)
+        _forget(job)
+        _admit()
@@ -0,0 +1,212 @@
+# utils/load_test.py
+"""
+Concurrent-session load test for ``app.py``.
+
+    python -m utils.load_test --sessions 8 --rows 100000
+
+Each simulated session is its own ``AppTest`` driven from its own thread:
+landing page → upload of a synthetic report (background job polled the way
+the progress fragment does) → Overview / Market Drill-down reruns. Reports
+per-rerun latency percentiles per phase, CPU time and peak RSS of this
+process (one server worker) plus any ingest worker processes.
+
+``AppTest`` swaps a process-global mock runtime in and out around every run,
+so script reruns are serialized here; the job scheduler, caches and the
+dataset registry are shared and run concurrently exactly as in the server.
+Time spent waiting for another session's rerun is reported separately.
+"""
+import argparse
+import json
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from utils.data_processing import estimate_processing_memory, process_file, upload_dataset_key
+from utils.jobs import release_job, submit_job
+from utils.synthetic_report import synthetic_upload
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app.py"
+POLL_INTERVAL = 0.5  # matches render_processing_progress(run_every=0.5)
+PERCENTILES = (50, 90, 95, 99)
+PHASES = ("landing", "upload", "views")
+
+_rerun_lock = threading.Lock()  # AppTest is not safe to run from several threads at once
+
+
+def _peak_rss_mb() -> Tuple[float, float]:
+    """Peak RSS of this process and of its largest reaped child, in MB."""
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss: bytes on macOS, KiB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own * scale / 1e6, children * scale / 1e6
+
+
+def _cpu_seconds() -> float:
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(u.ru_utime + u.ru_stime for u in usage)
+
+
+def run_session(
+    session_id: int,
+    upload,
+    local_time: bool = False,
+    compact: bool = False,
+    view_reruns: int = 3,
+    timeout: float = 600,
+) -> Dict[str, Any]:
+    """Drive one session through upload → Overview → Market Drill-down; returns its rerun timings."""
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    timings: List[tuple] = []
+
+    def rerun(phase: str) -> None:
+        queued = time.perf_counter()
+        with _rerun_lock:
+            started = time.perf_counter()
+            at.run()
+            timings.append((phase, time.perf_counter() - started, started - queued))
+        if at.exception:
+            raise RuntimeError(f"session {session_id}: {at.exception[0].message}")
+
+    rerun("landing")
+
+    # AppTest cannot drive st.file_uploader, so hand the upload over the way
+    # render_upload_dropzone does once a file arrives
+    started = time.perf_counter()
+    job = submit_job(
+        upload_dataset_key(upload, local_time, compact), estimate_processing_memory(upload),
+        process_file, upload, local_time=local_time, compact=compact,
+    )
+    at.session_state["processing_job"] = job
+    at.session_state["show_tabs"] = True
+    at.session_state["file_processed"] = True
+    while "processing_job" in at.session_state:
+        rerun("upload")
+        if time.perf_counter() - started > timeout:
+            release_job(job)
+            raise TimeoutError(f"session {session_id}: processing did not finish in {timeout}s")
+        time.sleep(POLL_INTERVAL)
+    upload_seconds = time.perf_counter() - started
+
+    if "data" not in at.session_state:
+        raise RuntimeError(f"session {session_id}: {at.session_state['processing_error']}")
+
+    # all tabs render on every rerun – these are the Overview + Drill-down reruns
+    for _ in range(view_reruns):
+        rerun("views")
+    labels = [tab.label for tab in at.tabs]
+    if "Overview" not in labels or "Market Drill-down" not in labels:
+        raise RuntimeError(f"session {session_id}: tabs missing after upload ({labels})")
+
+    return {"session": session_id, "timings": timings, "upload_seconds": upload_seconds}
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Latency percentiles (ms) per phase plus end-to-end upload times."""
+    summary: Dict[str, Any] = {}
+    for phase in PHASES:
+        samples = np.array([(s, w) for r in results for p, s, w in r["timings"] if p == phase]) * 1000
+        if samples.size:
+            runs, waits = samples[:, 0], samples[:, 1]
+            summary[phase] = {
+                "reruns": int(runs.size),
+                **{f"p{q}": round(float(np.percentile(runs, q)), 1) for q in PERCENTILES},
+                "max": round(float(runs.max()), 1),
+                "wait_p95": round(float(np.percentile(waits, 95)), 1),
+            }
+    uploads = np.array([r["upload_seconds"] for r in results])
+    if uploads.size:
+        summary["upload_to_ready_s"] = {
+            "p50": round(float(np.percentile(uploads, 50)), 2),
+            "max": round(float(uploads.max()), 2),
+        }
+    return summary
+
+
+def run_load_test(
+    sessions: int = 4,
+    rows: int = 50_000,
+    same_file: bool = False,
+    local_time: bool = False,
+    compact: bool = False,
+    view_reruns: int = 3,
+    stagger: float = 0.0,
+    timeout: float = 600,
+) -> Dict[str, Any]:
+    """Run ``sessions`` concurrent sessions; returns summary, CPU seconds and peak RSS."""
+    # generate up front so the report's own cost stays out of the measurements
+    uploads = [synthetic_upload(rows, seed=0 if same_file else i) for i in range(sessions)]
+    rss_before, _ = _peak_rss_mb()
+    cpu_before, wall_before = _cpu_seconds(), time.perf_counter()
+
+    def start(i: int) -> Dict[str, Any]:
+        time.sleep(i * stagger)
+        return run_session(i, uploads[i], local_time, compact, view_reruns, timeout)
+
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="load-session") as pool:
+        results = list(pool.map(start, range(sessions)))
+
+    rss_peak, rss_children = _peak_rss_mb()
+    return {
+        "sessions": sessions,
+        "rows": rows,
+        "same_file": same_file,
+        "wall_s": round(time.perf_counter() - wall_before, 2),
+        "cpu_s": round(_cpu_seconds() - cpu_before, 2),
+        "peak_rss_mb": round(rss_peak, 1),
+        "rss_before_mb": round(rss_before, 1),
+        "peak_child_rss_mb": round(rss_children, 1),
+        "threads_at_end": threading.active_count(),
+        "latency_ms": summarize(results),
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['sessions']} sessions × {report['rows']:,} rows"
+          f"{' (same file)' if report['same_file'] else ''}")
+    print(f"wall {report['wall_s']}s · CPU {report['cpu_s']}s · peak RSS {report['peak_rss_mb']} MB "
+          f"(before {report['rss_before_mb']} MB, child processes {report['peak_child_rss_mb']} MB)")
+    print(f"{'phase':<8}{'reruns':>8}" + "".join(f"{f'p{q}':>10}" for q in PERCENTILES)
+          + f"{'max':>10}{'wait p95':>10}   (ms)")
+    for phase in PHASES:
+        stats = report["latency_ms"].get(phase)
+        if stats:
+            print(f"{phase:<8}{stats['reruns']:>8}"
+                  + "".join(f"{stats[f'p{q}']:>10.1f}" for q in PERCENTILES)
+                  + f"{stats['max']:>10.1f}{stats['wait_p95']:>10.1f}")
+    ready = report["latency_ms"].get("upload_to_ready_s")
+    if ready:
+        print(f"upload → ready: p50 {ready['p50']}s, max {ready['max']}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent sessions")
+    parser.add_argument("--rows", type=int, default=50_000, help="rows per synthetic report")
+    parser.add_argument("--same-file", action="store_true", help="every session uploads the same report")
+    parser.add_argument("--local-time", action="store_true", help="process in airport local time")
+    parser.add_argument("--compact", action="store_true", help="use compact storage")
+    parser.add_argument("--view-reruns", type=int, default=3, help="reruns after the data is ready")
+    parser.add_argument("--stagger", type=float, default=0.0, help="seconds between session starts")
+    parser.add_argument("--timeout", type=float, default=600, help="per-session timeout in seconds")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    report = run_load_test(
+        sessions=args.sessions, rows=args.rows, same_file=args.same_file,
+        local_time=args.local_time, compact=args.compact, view_reruns=args.view_reruns,
+        stagger=args.stagger, timeout=args.timeout,
+    )
+    _print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":  # guard required: parallel ingest spawns worker processes
+    main()
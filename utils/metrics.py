@@ -0,0 +1,44 @@
+# utils/metrics.py
+import os
+from typing import Any, Iterable, List, Mapping
+
+import streamlit as st
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Metric columns
+# ──────────────────────────────────────────────────────────────────────────────
+# "# Plays" is required; the other numeric export columns listed here are
+# summed alongside it in the same cube pass whenever an upload carries them.
+# Extend with TOP_PLAYS_METRICS (comma-separated column names).
+DEFAULT_METRIC = "# Plays"
+EXTRA_METRICS = tuple(
+    name.strip()
+    for name in os.environ.get("TOP_PLAYS_METRICS", "# Impressions,Impressions,Spend").split(",")
+    if name.strip() and name.strip() != DEFAULT_METRIC
+)
+METRIC_COLUMNS = (DEFAULT_METRIC,) + EXTRA_METRICS
+
+METRIC_STATE_KEY = "metric"
+
+
+def metric_columns(columns: Iterable[str]) -> List[str]:
+    """The metric columns present in ``columns``, in ``METRIC_COLUMNS`` order."""
+    present = set(columns)
+    return [name for name in METRIC_COLUMNS if name in present]
+
+
+def metric_label(metric: str) -> str:
+    """Display name of a metric column – ``"# Plays"`` → ``"Plays"``."""
+    return metric.lstrip("#").strip() or metric
+
+
+def format_value(value: Any) -> str:
+    """Thousands-separated; two decimals only for fractional values (e.g. spend)."""
+    value = float(value)
+    return f"{int(value):,}" if value.is_integer() else f"{value:,.2f}"
+
+
+def session_metric(data: Mapping[str, Any]) -> str:
+    """The sidebar's metric when the dataset has it, else ``DEFAULT_METRIC``."""
+    selected = st.session_state.get(METRIC_STATE_KEY, DEFAULT_METRIC)
+    return selected if selected in data.get("metrics", ()) else DEFAULT_METRIC
@@ -0,0 +1,239 @@
+# utils/parallel_ingest.py
+import io
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.compressed_upload import open_export
+from utils.display_counts import combine_displays, distinct_displays
+from utils.raw_store import CACHE_DIR, merge_raw_chunks, write_frame, write_raw_frame
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Map-reduce ingest for large CSVs
+# ──────────────────────────────────────────────────────────────────────────────
+# The CSV is cut into byte ranges on line boundaries; each worker process
+# parses, cleans and aggregates its range into a partial cube (plus its
+# distinct display rows) and writes its cleaned rows to an Arrow chunk. The
+# parent sums the partial cubes (exact for integer plays), takes the distinct
+# union of the display rows and concatenates the chunks in order, so the result
+# matches the single-process path. In compact mode no chunks are written – the cube
+# itself becomes the stored frame. Assumes no quoted field spans a line break, which
+# holds for PowerBI hourly exports.
+#
+# Workbooks split across several sheets (e.g. one per week) are mapped the same
+# way with one sheet per worker; each worker opens the workbook read-only and
+# parses only its sheet, so wall time stays close to that of the largest sheet.
+PARALLEL_MIN_BYTES = int(os.environ.get("TOP_PLAYS_PARALLEL_MIN_MB", "64")) * 1024 * 1024
+# xlsx is compressed and slow to parse, so sheets go parallel at a smaller size
+PARALLEL_SHEETS_MIN_BYTES = int(float(os.environ.get("TOP_PLAYS_PARALLEL_SHEETS_MIN_MB", "2")) * 1024 * 1024)
+# rows per chunk when a compressed CSV is parsed while it is decompressed
+STREAM_CHUNK_ROWS = 200_000
+MAX_WORKERS = int(os.environ.get("TOP_PLAYS_INGEST_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# text columns read as strings on every path, so per-range dtype inference
+# cannot change the values the cleaning helpers see
+CSV_TEXT_DTYPES = {"System": str, "Display": str, "Network Code": str, "Network_Code": str}
+
+
+def use_parallel_ingest(uploaded_file) -> bool:
+    size = getattr(uploaded_file, "size", None) or len(uploaded_file.getbuffer())
+    return uploaded_file.name.endswith(".csv") and size >= PARALLEL_MIN_BYTES and MAX_WORKERS > 1
+
+
+def split_line_ranges(path: Path, n_parts: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """Header length plus ``(start, end)`` byte ranges of ``path`` that each begin at a line start."""
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        header_len = data.find(b"\n") + 1 or size
+        step = max((size - header_len) // max(n_parts, 1), 1)
+
+        bounds = [header_len]
+        while bounds[-1] + step < size:
+            newline = data.find(b"\n", bounds[-1] + step)
+            if newline == -1:
+                break
+            bounds.append(newline + 1)
+    if bounds[-1] != size:
+        bounds.append(size)
+    return header_len, list(zip(bounds[:-1], bounds[1:]))
+
+
+def _ingest_range(
+    spill_path: str, header_len: int, start: int, end: int, local_time: bool, chunk_path: Optional[str]
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], int]:
+    """Worker: parse one byte range, clean it, store its rows, return its partial cube and displays."""
+    from utils.data_processing import aggregate_cube, clean_frame  # lazy – avoids an import cycle
+
+    with open(spill_path, "rb") as fh:
+        header = fh.read(header_len)
+        fh.seek(start)
+        body = fh.read(end - start)
+    df = pd.read_csv(io.BytesIO(header + body), dtype=CSV_TEXT_DTYPES)
+    del body
+    df = clean_frame(df, local_time)
+    if not os.path.exists(spill_path):  # job was cancelled while this range ran
+        return None, None, 0
+    if chunk_path is not None:
+        write_frame(df, Path(chunk_path))
+    return aggregate_cube(df), distinct_displays(df), len(df)
+
+
+def _ingest_sheet(
+    workbook_path: str, sheet: str, local_time: bool, chunk_path: Optional[str]
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], int]:
+    """Worker: parse one workbook sheet, clean it, store its rows, return its partial cube and displays."""
+    from utils.data_processing import aggregate_cube, clean_frame  # lazy – avoids an import cycle
+
+    df = pd.read_excel(workbook_path, sheet_name=sheet)
+    df = clean_frame(df, local_time)
+    if not os.path.exists(workbook_path):  # job was cancelled while this sheet ran
+        return None, None, 0
+    if chunk_path is not None:
+        write_frame(df, Path(chunk_path))
+    return aggregate_cube(df), distinct_displays(df), len(df)
+
+
+def _spill_upload(uploaded_file, spill_path: Path) -> None:
+    """Write the upload to disk so workers read their part instead of receiving it through a pipe."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    data = uploaded_file.getbuffer()
+    with open(spill_path, "wb") as fh:
+        fh.write(data)
+
+
+def _map_reduce(
+    worker: Callable,
+    tasks: List[tuple],
+    spill_path: Path,
+    dataset_key: str,
+    report: Callable[[str, float], None],
+    compact: bool,
+    stage: str,
+) -> Tuple[pd.DataFrame, pd.DataFrame, str, int]:
+    """
+    Run ``worker(*task, chunk_path)`` for every task in worker processes, then
+    sum the partial cubes, union the display tables and merge the row chunks in
+    task order. The spilled upload is removed afterwards – or on cancel, which
+    tells running workers to stop.
+    """
+    from utils.data_processing import combine_cubes
+
+    chunk_paths = [
+        None if compact else str(CACHE_DIR / f"chunk_{dataset_key}_{i}.arrow") for i in range(len(tasks))
+    ]
+    parts: List[Optional[pd.DataFrame]] = [None] * len(tasks)
+    display_parts: List[Optional[pd.DataFrame]] = [None] * len(tasks)
+    n_rows = 0
+
+    executor = ProcessPoolExecutor(
+        max_workers=min(MAX_WORKERS, len(tasks)),
+        mp_context=multiprocessing.get_context("spawn"),  # fork is unsafe in a threaded server
+    )
+    try:
+        futures = {executor.submit(worker, *task, chunk_paths[i]): i for i, task in enumerate(tasks)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            parts[i], display_parts[i], rows = future.result()
+            n_rows += rows
+            report(f"{stage} ({done}/{len(tasks)} parts)", 0.02 + 0.33 * done / len(tasks))
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        for chunk_path in filter(None, chunk_paths):
+            Path(chunk_path).unlink(missing_ok=True)
+        raise
+    else:
+        executor.shutdown()
+    finally:
+        spill_path.unlink(missing_ok=True)
+
+    report("Combining partial results", 0.36)
+    cube = combine_cubes(parts)
+    displays = combine_displays(display_parts)
+    raw_path = write_raw_frame(cube, dataset_key) if compact else merge_raw_chunks(chunk_paths, dataset_key)
+    return cube, displays, raw_path, n_rows
+
+
+def parallel_ingest(
+    uploaded_file,
+    local_time: bool,
+    dataset_key: str,
+    report: Callable[[str, float], None],
+    compact: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame, str, int]:
+    """Map-reduce the upload into ``(cube, displays, raw_path, n_rows)`` using worker processes."""
+    spill_path = CACHE_DIR / f"upload_{dataset_key}.csv"
+    _spill_upload(uploaded_file, spill_path)
+    header_len, ranges = split_line_ranges(spill_path, MAX_WORKERS)
+    tasks = [(str(spill_path), header_len, start, end, local_time) for start, end in ranges]
+    return _map_reduce(_ingest_range, tasks, spill_path, dataset_key, report, compact, "Parsing in parallel")
+
+
+def use_parallel_sheets(uploaded_file, sheets: List[str]) -> bool:
+    size = getattr(uploaded_file, "size", None) or len(uploaded_file.getbuffer())
+    return (uploaded_file.name.lower().endswith(".xlsx")  # a zipped workbook is read in-process
+            and len(sheets) > 1 and size >= PARALLEL_SHEETS_MIN_BYTES and MAX_WORKERS > 1)
+
+
+def parallel_sheet_ingest(
+    uploaded_file,
+    sheets: List[str],
+    local_time: bool,
+    dataset_key: str,
+    report: Callable[[str, float], None],
+    compact: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame, str, int]:
+    """Map-reduce a multi-sheet workbook into ``(cube, displays, raw_path, n_rows)``, one worker per sheet."""
+    spill_path = CACHE_DIR / f"upload_{dataset_key}.xlsx"
+    _spill_upload(uploaded_file, spill_path)
+    tasks = [(str(spill_path), sheet, local_time) for sheet in sheets]
+    return _map_reduce(_ingest_sheet, tasks, spill_path, dataset_key, report, compact, "Reading sheets in parallel")
+
+
+def stream_ingest(
+    uploaded_file,
+    local_time: bool,
+    dataset_key: str,
+    report: Callable[[str, float], None],
+    compact: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame, str, int]:
+    """
+    Parse a compressed CSV in ``STREAM_CHUNK_ROWS`` chunks while it is being
+    decompressed – each chunk is cleaned, aggregated and stored before the next
+    is inflated – and reduce into ``(cube, displays, raw_path, n_rows)`` like the workers do.
+    """
+    from utils.data_processing import aggregate_cube, clean_frame, combine_cubes
+
+    size = getattr(uploaded_file, "size", None) or len(uploaded_file.getbuffer())
+    parts: List[pd.DataFrame] = []
+    display_parts: List[pd.DataFrame] = []
+    chunk_paths: List[str] = []
+    n_rows = 0
+    try:
+        with open_export(uploaded_file) as stream:
+            for i, df in enumerate(pd.read_csv(stream, dtype=CSV_TEXT_DTYPES, chunksize=STREAM_CHUNK_ROWS)):
+                df = clean_frame(df, local_time)
+                parts.append(aggregate_cube(df))
+                display_parts.append(distinct_displays(df))
+                n_rows += len(df)
+                if not compact:
+                    chunk_path = CACHE_DIR / f"chunk_{dataset_key}_{i}.arrow"
+                    write_frame(df, chunk_path)
+                    chunk_paths.append(str(chunk_path))
+                # compressed bytes consumed so far drive the progress bar
+                report(f"Decompressing and parsing ({n_rows:,} rows)",
+                       0.02 + 0.33 * min(uploaded_file.tell() / max(size, 1), 1.0))
+    except BaseException:
+        for chunk_path in chunk_paths:
+            Path(chunk_path).unlink(missing_ok=True)
+        raise
+
+    report("Combining partial results", 0.36)
+    cube = combine_cubes(parts)
+    displays = combine_displays(display_parts)
+    raw_path = write_raw_frame(cube, dataset_key) if compact else merge_raw_chunks(chunk_paths, dataset_key)
+    return cube, displays, raw_path, n_rows
@@ -0,0 +1,90 @@
+# utils/prime_stability.py
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.date_index import HOURS, DateIndex, date_positions
+from utils.metrics import DEFAULT_METRIC
+from utils.prime_windows import DEFAULT_PRIME_PARAMS, PrimeWindowParams, prime_windows_from_array
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Day-by-day prime window stability
+# ──────────────────────────────────────────────────────────────────────────────
+# Prime windows are found for every (airport, date) slice of the date index's
+# airport × date × hour array in one batched run of the window finder, and each
+# hour is scored by the fraction of the airport's reporting days on which it
+# fell inside that day's window(s). An hour near 1.0 is prime day after day; a
+# whole-upload window built from one spike day shows up as low fractions.
+
+
+def daily_prime_membership(
+    index: DateIndex,
+    params: PrimeWindowParams = DEFAULT_PRIME_PARAMS,
+    metric: str = DEFAULT_METRIC,
+    positions: Optional[Tuple[int, int]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ``inside`` (airports × dates × hours, bool) – the hour is in that day's
+    prime window(s) – and ``reported`` (airports × dates, bool) for the dates
+    ``positions`` (a ``[lo, hi)`` slice of ``index.dates``; default all).
+    """
+    lo, hi = positions if positions is not None else (0, len(index.dates))
+    cumulative = index.airports
+    daily = np.diff(cumulative.values[metric][:, lo:hi + 1], axis=1).astype("float64")
+    present = np.diff(cumulative.rows[:, lo:hi + 1], axis=1) > 0
+    reported = present.any(axis=2)
+
+    rows = np.flatnonzero(reported.ravel())  # only (airport, date) slices with data
+    plays = np.where(present, daily, np.nan).reshape(-1, HOURS)[rows]
+
+    # mark each window's hours with +1 at its start and -1 past its end
+    edges = np.zeros((reported.size, HOURS + 1), dtype="int16")
+    for row, windows in zip(rows, prime_windows_from_array(plays, params)):
+        for start, end, _ in windows:
+            edges[row, start] += 1
+            edges[row, end + 1] -= 1
+    inside = np.cumsum(edges[:, :HOURS], axis=1) > 0
+    return inside.reshape(daily.shape), reported
+
+
+def prime_window_stability(
+    index: DateIndex,
+    params: PrimeWindowParams = DEFAULT_PRIME_PARAMS,
+    metric: str = DEFAULT_METRIC,
+    date_range: Optional[Tuple[date, date]] = None,
+) -> pd.DataFrame:
+    """
+    Airport × hour matrix of the fraction of reporting days the hour fell
+    inside that day's prime window(s), with a ``Days`` column counting the
+    reporting days. Restricted to ``date_range`` when given.
+    """
+    columns = pd.RangeIndex(HOURS, name="Hour_24")
+    positions = date_positions(index, *date_range) if date_range is not None else None
+    if not len(index.dates) or not len(index.airports.labels):
+        return pd.DataFrame(columns=columns.append(pd.Index(["Days"])))
+
+    inside, reported = daily_prime_membership(index, params, metric, positions)
+    days = reported.sum(axis=1)
+    active = days > 0
+    stability = pd.DataFrame(
+        inside[active].sum(axis=1) / days[active, None],
+        index=index.airports.labels[active].rename("Airport"),
+        columns=columns,
+    )
+    stability["Days"] = days[active]
+    return stability
+
+
+@st.cache_data(show_spinner=False)
+def cached_prime_window_stability(
+    dataset_key: str,
+    params: PrimeWindowParams,
+    metric: str,
+    date_range: Optional[Tuple[date, date]],
+    _index: DateIndex,
+) -> pd.DataFrame:
+    """``prime_window_stability`` memoized per (dataset, parameters, metric, range); the index is not hashed."""
+    return prime_window_stability(_index, params, metric, date_range)
@@ -0,0 +1,168 @@
+# utils/prime_windows.py
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Prime play window finder
+# ──────────────────────────────────────────────────────────────────────────────
+# Windows are runs of consecutive hours between 7 am and 9 pm (2–4 hours by
+# default), ranked by density (plays per hour) with a penalty for weak hours;
+# the winner is trimmed of weak edge hours, and a second non-overlapping window
+# is kept when it carries enough of the first one's plays.
+#
+# Candidates are scored for every airport at once from an airport × hour
+# matrix; only the per-airport pick/trim (a handful of windows) is a loop.
+PRIME_FIRST_HOUR = 7
+PRIME_LAST_HOUR = 21
+
+Window = Tuple[int, int, int]  # (start hour, end hour, total plays)
+
+
+class PrimeWindowParams(NamedTuple):
+    """Tuning knobs for the window finder; hashable, so results memoize per tuple."""
+    min_window_len: int = 2
+    max_window_len: int = 4
+    low_hour_relative_threshold: float = 0.70  # hour < 70% of the window's density is "weak"
+    weak_hour_penalty_per_fraction: float = 0.20  # -20% score per weak-hour fraction of the window
+    min_plays_percent_of_range1: float = 0.70  # a second window needs 70% of the first one's plays
+
+
+DEFAULT_PRIME_PARAMS = PrimeWindowParams()
+
+# session-state keys of the sidebar controls, one per parameter
+PARAM_STATE_KEYS = {field: f"prime_{field}" for field in PrimeWindowParams._fields}
+
+
+def session_prime_params() -> PrimeWindowParams:
+    """Parameters chosen in this session's sidebar (defaults until touched)."""
+    params = PrimeWindowParams(**{
+        field: st.session_state.get(key, getattr(DEFAULT_PRIME_PARAMS, field))
+        for field, key in PARAM_STATE_KEYS.items()
+    })
+    return params._replace(max_window_len=max(params.max_window_len, params.min_window_len))
+
+
+def _score_candidates(plays: np.ndarray, params: PrimeWindowParams):
+    """
+    Score every candidate window of every row of ``plays`` (rows × prime hours,
+    NaN = no data that hour). Returns per-candidate ``starts`` / ``durations``
+    and per-row ``totals`` / ``scores`` / ``valid`` arrays (rows × candidates).
+    """
+    present = ~np.isnan(plays)
+    values = np.where(present, plays, 0.0)
+    n_rows, n_hours = plays.shape
+
+    starts, durations, totals, scores, valid = [], [], [], [], []
+    for dur in range(max(params.min_window_len, 1), params.max_window_len + 1):
+        if dur > n_hours:
+            break
+        window = sliding_window_view(values, dur, axis=1)  # rows × starts × dur
+        total = window.sum(axis=2)
+        density = total / dur
+        weak = (window < params.low_hour_relative_threshold * density[..., None]).sum(axis=2)
+        score = np.round(density * (1.0 - params.weak_hour_penalty_per_fraction * (weak / dur)), 2)
+
+        starts.append(np.arange(n_hours - dur + 1))
+        durations.append(np.full(n_hours - dur + 1, dur))
+        totals.append(total)
+        scores.append(score)
+        valid.append(sliding_window_view(present, dur, axis=1).all(axis=2))  # consecutive hours only
+
+    if not starts:
+        empty = np.zeros((n_rows, 0))
+        return np.zeros(0, int), np.zeros(0, int), empty, empty, empty.astype(bool)
+    return (np.concatenate(starts), np.concatenate(durations),
+            np.hstack(totals), np.hstack(scores), np.hstack(valid))
+
+
+def _trim_window(row: np.ndarray, start: int, end: int, params: PrimeWindowParams) -> Tuple[int, int, int, int]:
+    """Drop weak first/last hours while the window is longer than the minimum."""
+    duration = end - start + 1
+    while duration > params.min_window_len:
+        if row[start] < params.low_hour_relative_threshold * (row[start:end + 1].sum() / duration):
+            start, duration = start + 1, duration - 1
+        else:
+            break
+    while duration > params.min_window_len:
+        if row[end] < params.low_hour_relative_threshold * (row[start:end + 1].sum() / duration):
+            end, duration = end - 1, duration - 1
+        else:
+            break
+    return start, end, duration, int(row[start:end + 1].sum())
+
+
+def prime_windows_from_array(plays: np.ndarray, params: PrimeWindowParams = DEFAULT_PRIME_PARAMS) -> List[List[Window]]:
+    """Prime windows for every row of a rows × 24 plays array (NaN = no data that hour)."""
+    prime = np.asarray(plays, dtype="float64")[:, PRIME_FIRST_HOUR:PRIME_LAST_HOUR + 1]
+    starts, durations, totals, scores, valid = _score_candidates(prime, params)
+
+    # best first: score desc, shorter first, earlier first; invalid windows last
+    order = np.lexsort((
+        np.broadcast_to(starts, scores.shape),
+        np.broadcast_to(durations, scores.shape),
+        np.where(valid, -scores, np.inf),
+    ), axis=1)
+
+    results: List[List[Window]] = []
+    values = np.nan_to_num(prime)
+    threshold_pct = params.min_plays_percent_of_range1
+    for r in range(prime.shape[0]):
+        ranked = [k for k in order[r] if valid[r, k]]
+        if not ranked:
+            results.append([])
+            continue
+
+        row = values[r]
+        first = ranked[0]
+        s1, e1, _, plays1 = _trim_window(row, starts[first], starts[first] + durations[first] - 1, params)
+        windows = [(s1 + PRIME_FIRST_HOUR, e1 + PRIME_FIRST_HOUR, plays1)]
+
+        for k in ranked[1:]:
+            s, e = starts[k], starts[k] + durations[k] - 1
+            if not (e < s1 or s > e1):
+                continue
+            if int(totals[r, k]) < threshold_pct * plays1:
+                continue
+            s2, e2, d2, plays2 = _trim_window(row, s, e, params)
+            if d2 >= params.min_window_len and plays2 >= threshold_pct * plays1:
+                windows.append((s2 + PRIME_FIRST_HOUR, e2 + PRIME_FIRST_HOUR, plays2))
+                break
+        results.append([(int(s), int(e), int(p)) for s, e, p in windows])
+    return results
+
+
+def find_prime_play_windows(
+    hourly_df: pd.DataFrame, params: PrimeWindowParams = DEFAULT_PRIME_PARAMS
+) -> List[Window]:
+    """Prime windows for one hourly table with ``Hour_24`` / ``Total_Plays`` columns."""
+    if hourly_df.empty:
+        return []
+    plays = np.full((1, 24), np.nan)
+    plays[0, hourly_df["Hour_24"].to_numpy(dtype="int64")] = hourly_df["Total_Plays"].to_numpy(dtype="float64")
+    return prime_windows_from_array(plays, params)[0]
+
+
+def prime_windows_by_airport(
+    airport_hour_matrix: pd.DataFrame, params: PrimeWindowParams = DEFAULT_PRIME_PARAMS
+) -> Dict[str, List[Window]]:
+    """Prime windows for every row of an airport × hour matrix (NaN = no rows that hour)."""
+    plays = airport_hour_matrix.reindex(columns=range(24)).to_numpy(dtype="float64")
+    return dict(zip(airport_hour_matrix.index, prime_windows_from_array(plays, params)))
+
+
+@st.cache_data(show_spinner=False)
+def cached_prime_windows_by_airport(
+    dataset_key: str, params: PrimeWindowParams, _matrix: pd.DataFrame
+) -> Dict[str, List[Window]]:
+    """``prime_windows_by_airport`` memoized per (dataset, parameter tuple); the matrix is not hashed."""
+    return prime_windows_by_airport(_matrix, params)
+
+
+@st.cache_data(show_spinner=False)
+def cached_prime_windows(dataset_key: str, params: PrimeWindowParams, _hourly: pd.DataFrame) -> List[Window]:
+    """``find_prime_play_windows`` for a dataset's network-wide hourly table, memoized per tuple."""
+    return find_prime_play_windows(_hourly, params)
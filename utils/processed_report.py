@@ -0,0 +1,314 @@
+# utils/processed_report.py
+import threading
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+import pandas as pd
+
+from utils.display_counts import count_displays, play_rate, with_display_counts
+from utils.metrics import DEFAULT_METRIC
+from utils.raw_store import retain_raw_path
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Processed report: aggregates + lazy summary views
+# ──────────────────────────────────────────────────────────────────────────────
+# process_file keeps one grouped table per summary with every metric column
+# side by side (the output of the single groupby pass). The ranked per-metric
+# DataFrames the tabs read are views built from them on first access and
+# memoized, so a metric nobody selects never has its tables built. The report
+# reads like the dict it replaced – ``report["airport_hourly"]``,
+# ``report.get("raw_path")`` – without materializing anything else.
+
+# summary name → (grouped table, group key(s), value column, rank column); key None = hourly table.
+# When the upload's displays are known, each table also carries ``Displays``
+# (distinct displays that played) and ``Play_Rate`` (value per display) after
+# its rank column – except airport_by_network, whose Network_Name is the
+# display itself; airport_by_network_code carries the per-network rate.
+SUMMARY_VIEWS: Dict[str, Tuple[str, Union[str, Tuple[str, ...], None], str, str]] = {
+    "overall_hourly": ("by_hour", None, "Total_Plays", "Rank"),
+    "roadside_hourly": ("roadside_by_hour", None, "Total_Plays", "Rank"),
+    "airport_hourly": ("airport_by_hour", None, "Total_Plays", "Rank"),
+    "roadside_by_market": ("roadside_by_market", "Market_Code", "Market_Plays", "Rank_within_Market"),
+    "airport_by_group": ("airport_by_group", "Airport_Group", "Group_Plays", "Rank_within_Group"),
+    "airport_by_network": ("airport_by_network", "Network_Name", "Network_Plays", "Rank_within_Network"),
+    "airport_by_network_code": (
+        "airport_by_network_code", ("Airport", "Network_Code"), "Network_Plays", "Rank_within_Network_Code",
+    ),
+}
+MATRIX_VIEW = "airport_hour_matrix"
+SUMMARY_NAMES = tuple(SUMMARY_VIEWS) + (MATRIX_VIEW,)
+
+# drill-down dimension → its dimension × hour matrix view; all but the airport
+# matrix are pivots of the per-dimension summary's grouped table
+DIMENSION_MATRICES: Dict[str, str] = {
+    "Airport": MATRIX_VIEW,
+    "Market_Code": "market_hour_matrix",
+    "Airport_Group": "group_hour_matrix",
+    "Network_Name": "network_hour_matrix",
+}
+PIVOT_VIEWS: Dict[str, Tuple[str, str]] = {
+    "market_hour_matrix": ("roadside_by_market", "Market_Code"),
+    "group_hour_matrix": ("airport_by_group", "Airport_Group"),
+    "network_hour_matrix": ("airport_by_network", "Network_Name"),
+}
+# drill-down dimension → its distinct displays × hour matrix, for the member
+# tables' play rates (a Network_Name member is a single display, so none)
+DISPLAY_MATRICES: Dict[str, str] = {
+    "Airport": "airport_display_matrix",
+    "Market_Code": "market_display_matrix",
+    "Airport_Group": "group_display_matrix",
+}
+DISPLAY_PIVOTS: Dict[str, Tuple[str, str]] = {
+    "airport_display_matrix": ("airport_displays", "Airport"),
+    "market_display_matrix": ("roadside_by_market", "Market_Code"),
+    "group_display_matrix": ("airport_by_group", "Airport_Group"),
+}
+RATE_COLUMNS = ["Play_Rate", "Displays"]
+VIEW_NAMES = SUMMARY_NAMES + tuple(PIVOT_VIEWS) + tuple(DISPLAY_PIVOTS)
+
+
+def _rank_hourly(hourly: pd.DataFrame) -> pd.DataFrame:
+    """Rank ``Hour_24`` / ``Total_Plays`` rows: by total, ties broken by the earlier hour."""
+    hourly = hourly.sort_values(
+        ["Total_Plays", "Hour_24"], ascending=[False, True]
+    )
+    hourly["Rank"] = (
+        hourly.groupby("Total_Plays", group_keys=False).cumcount() + 1
+    )
+    hourly["Rank"] = (
+        hourly["Rank"]
+        + hourly["Total_Plays"].rank(method="min", ascending=False).astype(int)
+        - 1
+    )
+    return hourly.sort_values(["Rank", "Hour_24"])
+
+
+def _value_columns(grouped: pd.DataFrame, keys: List[str], metric: str, value_name: str) -> pd.DataFrame:
+    """``keys`` + ``metric`` renamed to ``value_name``, plus ``Play_Rate`` / ``Displays`` when counted."""
+    table = grouped[keys + [metric]].rename(columns={metric: value_name})
+    if "Displays" in grouped.columns:
+        table["Play_Rate"] = play_rate(table[value_name], grouped["Displays"])
+        table["Displays"] = grouped["Displays"]
+    return table
+
+
+def _rank_within(grouped: pd.DataFrame, keys: List[str], metric: str, value_name: str, rank_name: str) -> pd.DataFrame:
+    """Per-``keys`` hourly totals of ``metric``, ranked within each ``keys`` group."""
+    table = _value_columns(grouped, keys + ["Hour_24"], metric, value_name)
+    table = table.sort_values(
+        keys + [value_name, "Hour_24"], ascending=[True] * len(keys) + [False, True]
+    )
+    table[rank_name] = table.groupby(keys)[value_name].rank(method="min", ascending=False).astype(int)
+    return table
+
+
+def _rates_last(table: pd.DataFrame) -> pd.DataFrame:
+    """Move ``Play_Rate`` / ``Displays`` behind the rank so existing columns keep their positions."""
+    rates = [column for column in RATE_COLUMNS if column in table.columns]
+    return table[[column for column in table.columns if column not in rates] + rates]
+
+
+def _hour_matrix(grouped: pd.DataFrame, key: str, column: str) -> pd.DataFrame:
+    """``key`` × hour matrix of ``column``; rows without a ``key`` member are left out."""
+    named = grouped[grouped[key].notna() & (grouped[key] != "")]  # untagged rows have no member
+    matrix = (
+        named.set_index([key, named["Hour_24"].astype(int)])[column]
+        .unstack("Hour_24")
+        .reindex(columns=range(24))
+        .sort_index()
+    )
+    matrix.columns.name = "Hour_24"
+    return matrix
+
+
+def _grouped(rows: pd.DataFrame, displays: Optional[pd.DataFrame], keys: List[str], metrics: List[str]) -> pd.DataFrame:
+    """Per-``keys`` sums of ``metrics``, plus distinct ``Displays`` when a display table is given."""
+    grouped = rows.groupby(keys, as_index=False)[metrics].sum()
+    return grouped if displays is None else with_display_counts(grouped, displays, keys)
+
+
+def aggregate_summaries(
+    cube: pd.DataFrame, metrics: List[str], displays: Optional[pd.DataFrame] = None
+) -> Dict[str, Any]:
+    """
+    Every grouped table the summaries need, one groupby each with all
+    ``metrics`` columns. With ``displays`` (``distinct_displays`` output) the
+    hourly, market, group and network-code tables also count distinct displays.
+    """
+    roadside = cube[cube["System_Type"] == "Roadside"]
+    airport = cube[cube["System_Type"] == "Airport"]
+    if displays is not None:
+        roadside_displays = displays[displays["System_Type"] == "Roadside"]
+        airport_displays = displays[displays["System_Type"] == "Airport"]
+    else:
+        roadside_displays = airport_displays = None
+    # airport × hour totals (an airport's missing hours become NaN in the matrix)
+    tagged = cube.dropna(subset=["Airport", "Hour_24"])
+    return {
+        "by_hour": _grouped(cube, displays, ["Hour_24"], metrics),
+        "roadside_by_hour": _grouped(roadside, roadside_displays, ["Hour_24"], metrics),
+        "airport_by_hour": _grouped(airport, airport_displays, ["Hour_24"], metrics),
+        "roadside_by_market": _grouped(roadside, roadside_displays, ["Market_Code", "Hour_24"], metrics),
+        "airport_by_group": _grouped(airport, airport_displays, ["Airport_Group", "Hour_24"], metrics),
+        # Network_Name is an airport row's display, so only the network-code grain counts displays
+        "airport_by_network": _grouped(airport, None, ["Network_Name", "Hour_24"], metrics),
+        "airport_by_network_code": _grouped(
+            airport, airport_displays, ["Airport", "Network_Code", "Hour_24"], metrics
+        ),
+        "by_airport": tagged.groupby(["Airport", tagged["Hour_24"].astype(int)])[metrics].sum(),
+        # networks seen per airport, for the drill-down's "Networks used" line
+        "airport_networks": tagged.dropna(subset=["Network_Code"]).groupby("Airport")["Network_Code"].unique(),
+        # distinct displays per airport × hour, for the drill-down's airport play rates
+        "airport_displays": None if displays is None else count_displays(displays, ["Airport", "Hour_24"]),
+    }
+
+
+def summary_view(aggregates: Dict[str, Any], name: str, metric: str = DEFAULT_METRIC) -> pd.DataFrame:
+    """Summary table or dimension × hour matrix ``name`` for ``metric``, from ``aggregate_summaries`` output."""
+    if name == MATRIX_VIEW:
+        matrix = (
+            aggregates["by_airport"][metric]
+            .unstack("Hour_24")
+            .reindex(columns=range(24))
+            .sort_index()
+        )
+        matrix.columns.name = "Hour_24"
+        return matrix
+
+    if name in PIVOT_VIEWS:
+        source, key = PIVOT_VIEWS[name]
+        return _hour_matrix(aggregates[source], key, metric)
+
+    if name in DISPLAY_PIVOTS:
+        # the same for every metric; no rows when displays were not counted
+        source, key = DISPLAY_PIVOTS[name]
+        grouped = aggregates.get(source)
+        if grouped is None or "Displays" not in grouped.columns:
+            return pd.DataFrame(columns=pd.RangeIndex(24, name="Hour_24"), dtype="int64")
+        return _hour_matrix(grouped, key, "Displays")
+
+    source, key, value_name, rank_name = SUMMARY_VIEWS[name]
+    grouped = aggregates[source]
+    if key is None:
+        return _rates_last(_rank_hourly(_value_columns(grouped, ["Hour_24"], metric, value_name)))
+    keys = [key] if isinstance(key, str) else list(key)
+    return _rates_last(_rank_within(grouped, keys, metric, value_name, rank_name))
+
+
+class MetricTables(Mapping):
+    """The summary views (and dimension matrices) of one metric, read from the report's memo."""
+    __slots__ = ("_report", "_metric")
+
+    def __init__(self, report: "ProcessedReport", metric: str) -> None:
+        self._report = report
+        self._metric = metric
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in VIEW_NAMES:
+            raise KeyError(name)
+        return self._report.view(name, self._metric)
+
+    def __contains__(self, name: object) -> bool:
+        return name in VIEW_NAMES
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(VIEW_NAMES)
+
+    def __len__(self) -> int:
+        return len(VIEW_NAMES)
+
+
+class ProcessedReport(Mapping):
+    """
+    Result of ``process_file``. Summary tables and dimension matrices
+    (``VIEW_NAMES``) are views of ``DEFAULT_METRIC``; ``metric_tables[metric]``
+    holds the same views for each other metric. ``airport_networks`` maps each
+    airport to the network codes it reported under. Fields still unset
+    (``report_bytes`` while the report is being written) read as missing keys.
+    """
+    __slots__ = (
+        "dataset_key", "raw_path", "compact", "metrics", "date_index",
+        "airport_prime_windows", "airport_anomalies", "report_bytes",
+        "_aggregates", "_views", "_lock", "__weakref__",
+    )
+    FIELDS = (
+        "dataset_key", "raw_path", "compact", "metrics", "date_index",
+        "airport_prime_windows", "airport_anomalies", "report_bytes",
+    )
+
+    def __init__(
+        self,
+        aggregates: Dict[str, Any],
+        *,
+        dataset_key: str,
+        raw_path: str,
+        compact: bool,
+        metrics: List[str],
+        date_index: Any,
+        airport_prime_windows: list,
+        airport_anomalies: pd.DataFrame,
+        report_bytes: Optional[bytes] = None,
+        views: Optional[Dict[str, pd.DataFrame]] = None,
+    ) -> None:
+        self._aggregates = aggregates
+        self._views: Dict[Tuple[str, str], pd.DataFrame] = {
+            (DEFAULT_METRIC, name): table for name, table in (views or {}).items()
+        }
+        self._lock = threading.Lock()  # cached across sessions; views are built once
+        self.dataset_key = dataset_key
+        self.raw_path = raw_path
+        retain_raw_path(raw_path, self)  # not pruned from the cache while this report lives
+        self.compact = compact
+        self.metrics = metrics
+        self.date_index = date_index
+        self.airport_prime_windows = airport_prime_windows
+        self.airport_anomalies = airport_anomalies
+        self.report_bytes = report_bytes
+
+    # ── views ────────────────────────────────────────────────────────────
+    def view(self, name: str, metric: str = DEFAULT_METRIC) -> pd.DataFrame:
+        """Summary table ``name`` for ``metric``, built on first access."""
+        with self._lock:
+            table = self._views.get((metric, name))
+            if table is None:
+                table = self._views[(metric, name)] = summary_view(self._aggregates, name, metric)
+            return table
+
+    def tables(self, metric: str = DEFAULT_METRIC) -> MetricTables:
+        return MetricTables(self, metric)
+
+    @property
+    def metric_tables(self) -> Dict[str, MetricTables]:
+        return {metric: self.tables(metric) for metric in self.metrics if metric != DEFAULT_METRIC}
+
+    # ── mapping interface ────────────────────────────────────────────────
+    @property
+    def airport_networks(self) -> pd.Series:
+        return self._aggregates["airport_networks"]
+
+    def __getitem__(self, key: str) -> Any:
+        if key in VIEW_NAMES:
+            return self.view(key)
+        if key == "metric_tables":
+            return self.metric_tables
+        if key == "airport_networks":
+            return self.airport_networks
+        if key in self.FIELDS and getattr(self, key) is not None:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in VIEW_NAMES or key in ("metric_tables", "airport_networks"):
+            return True
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        yield from VIEW_NAMES
+        yield from ("metric_tables", "airport_networks")
+        yield from (field for field in self.FIELDS if getattr(self, field) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        built = sorted(f"{name}[{metric}]" for metric, name in self._views)
+        return f"ProcessedReport({self.dataset_key!r}, metrics={self.metrics}, built={built})"
@@ -0,0 +1,151 @@
+# utils/query_service.py
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+
+from utils.prime_windows import prime_windows_by_airport
+from utils.dataset_registry import get_dataset, list_datasets
+
+logger = logging.getLogger(__name__)
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Local JSON query service
+# ──────────────────────────────────────────────────────────────────────────────
+#   GET /datasets                              → registered datasets (newest first)
+#   GET /datasets/<key>/airport_hourly         → airport hourly totals + rank
+#   GET /datasets/<key>/prime_windows          → network + per-airport prime windows
+#   GET /datasets/<key>/summaries/<name>       → one of SUMMARY_TABLES
+# <key> may be "latest". Bodies are cached per (dataset key, path) and carry an
+# ETag derived from both, so repeat requests are answered from memory or with 304.
+API_HOST = os.environ.get("TOP_PLAYS_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("TOP_PLAYS_API_PORT", "8765"))  # 0 disables the service
+
+SUMMARY_TABLES = (
+    "overall_hourly",
+    "roadside_hourly",
+    "roadside_by_market",
+    "airport_hourly",
+    "airport_by_group",
+    "airport_by_network",
+    "airport_by_network_code",
+)
+
+
+def _frame_records(df: Optional[pd.DataFrame]) -> Any:
+    return [] if df is None else json.loads(df.to_json(orient="records"))
+
+
+def _windows_json(windows: list) -> list:
+    return [{"start_hour": int(s), "end_hour": int(e), "total_plays": int(p)} for s, e, p in windows]
+
+
+def _build_payload(data: dict, resource: Tuple[str, ...]) -> Any:
+    """Resolve the path segments after /datasets/<key>/ to a JSON-able payload."""
+    if resource == ("airport_hourly",):
+        return _frame_records(data.get("airport_hourly"))
+    if resource == ("prime_windows",):
+        matrix = data.get("airport_hour_matrix")
+        by_airport = {} if matrix is None else prime_windows_by_airport(matrix)
+        return {
+            "network": _windows_json(data.get("airport_prime_windows") or []),
+            "airports": {code: _windows_json(w) for code, w in by_airport.items()},
+        }
+    if len(resource) == 2 and resource[0] == "summaries" and resource[1] in SUMMARY_TABLES:
+        return _frame_records(data.get(resource[1]))
+    raise KeyError("/".join(resource))
+
+
+@lru_cache(maxsize=256)
+def _cached_body(dataset_key: str, resource: Tuple[str, ...]) -> Tuple[bytes, str]:
+    """Encoded body and ETag; datasets are immutable per key so this never goes stale."""
+    data = get_dataset(dataset_key)
+    if data is None:
+        raise LookupError(dataset_key)
+    body = json.dumps(_build_payload(data, resource), separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(f"{dataset_key}/{'/'.join(resource)}".encode()).hexdigest()[:20] + '"'
+    return body, etag
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check: any listed tag (weak or strong) or ``*`` matches."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in tags or etag in {tag[2:] if tag.startswith("W/") else tag for tag in tags}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = "TopPlaysQuery/1.0"
+
+    def do_GET(self) -> None:  # noqa: N802 (stdlib naming)
+        parts = tuple(p for p in self.path.split("?", 1)[0].split("/") if p)
+
+        if parts == ("datasets",):
+            # listing changes as uploads arrive – never cached
+            self._send(200, json.dumps(list_datasets()).encode("utf-8"))
+            return
+        if len(parts) < 3 or parts[0] != "datasets":
+            self._send_error(404, "Unknown endpoint")
+            return
+
+        dataset_key, resource = parts[1], parts[2:]
+        if dataset_key == "latest":
+            latest = list_datasets()
+            if not latest:
+                self._send_error(404, "No datasets have been processed yet")
+                return
+            dataset_key = latest[0]["key"]
+
+        try:
+            body, etag = _cached_body(dataset_key, resource)
+        except KeyError:  # before LookupError, which it subclasses
+            self._send_error(404, f"Unknown resource '{'/'.join(resource)}'")
+            return
+        except LookupError:
+            self._send_error(404, f"Unknown dataset '{dataset_key}'")
+            return
+
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send(304, b"", etag=etag)
+        else:
+            self._send(200, body, etag=etag)
+
+    def _send(self, status: int, body: bytes, etag: Optional[str] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "private, max-age=0, must-revalidate")
+        else:
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("query service: " + format, *args)
+
+
+def start_query_service(host: str = API_HOST, port: int = API_PORT) -> Optional[ThreadingHTTPServer]:
+    """Serve the JSON API on a daemon thread; returns None if disabled or the port is taken."""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), QueryHandler)
+    except OSError as exc:
+        logger.warning("Query service not started on %s:%s (%s)", host, port, exc)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="query-service", daemon=True).start()
+    return server
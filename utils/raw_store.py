@@ -0,0 +1,142 @@
+# utils/raw_store.py
+import os
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Arrow IPC (Feather v2) backing store for processed raw rows
+# ──────────────────────────────────────────────────────────────────────────────
+# Raw rows live on disk, uncompressed so they can be memory-mapped; the report
+# builder streams them from the file in row slices instead of keeping the whole
+# frame on the Python heap for the life of the session.
+CACHE_DIR = Path(os.environ.get("TOP_PLAYS_CACHE_DIR", Path(tempfile.gettempdir()) / "top_plays_cache"))
+MAX_CACHED_FILES = 20
+
+# stored path → number of live objects (processed reports) still reading it;
+# pruning never deletes these, however old they are
+_in_use: Dict[str, int] = {}
+_in_use_lock = threading.Lock()
+
+
+def raw_path_for(dataset_key: str) -> Path:
+    return CACHE_DIR / f"raw_{dataset_key}.arrow"
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert to Arrow, stringifying any object column with mixed value types."""
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if df[col].dtype == object:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def retain_raw_path(path: str, owner: object) -> None:
+    """Keep ``path`` out of cache pruning for as long as ``owner`` is alive."""
+    with _in_use_lock:
+        _in_use[str(path)] = _in_use.get(str(path), 0) + 1
+    weakref.finalize(owner, _release_raw_path, str(path))
+
+
+def _release_raw_path(path: str) -> None:
+    with _in_use_lock:
+        if _in_use.get(path, 0) > 1:
+            _in_use[path] -= 1
+        else:
+            _in_use.pop(path, None)
+
+
+def _prune_cache(keep: Path) -> None:
+    files = sorted(CACHE_DIR.glob("raw_*.arrow"), key=lambda p: p.stat().st_mtime, reverse=True)
+    with _in_use_lock:
+        in_use = set(_in_use)
+    for stale in files[MAX_CACHED_FILES:]:
+        if stale != keep and str(stale) not in in_use:
+            stale.unlink(missing_ok=True)  # open memory maps stay valid on POSIX
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    """Write ``df`` to ``path`` as uncompressed Feather v2, atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    feather.write_feather(_to_arrow(df), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)  # readers never see a half-written file
+
+
+def write_raw_frame(df: pd.DataFrame, dataset_key: str) -> str:
+    """Write ``df`` to the cache as an uncompressed Feather v2 file and return its path."""
+    path = raw_path_for(dataset_key)
+    if path.exists():
+        os.utime(path)  # reused: now the newest file as far as pruning goes
+        return str(path)
+
+    write_frame(df, path)
+    _prune_cache(keep=path)
+    return str(path)
+
+
+def _unified_schema(schemas: List[pa.Schema]) -> pa.Schema:
+    """Per column: the one type all chunks agree on, else float64 for numbers, else string."""
+    fields = []
+    for i, field in enumerate(schemas[0]):
+        types = {s.field(i).type for s in schemas} - {pa.null()}
+        if len(types) <= 1:
+            fields.append(pa.field(field.name, types.pop() if types else pa.null()))
+        elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+            fields.append(pa.field(field.name, pa.float64()))
+        else:
+            fields.append(pa.field(field.name, pa.string()))
+    return pa.schema(fields)
+
+
+def merge_raw_chunks(chunk_paths: List[str], dataset_key: str) -> str:
+    """
+    Concatenate per-worker raw chunk files (in order) into one stored raw frame,
+    streaming batch by batch; chunks are deleted afterwards.
+    """
+    path = raw_path_for(dataset_key)
+    if not path.exists():
+        schemas = [feather.read_table(p, memory_map=True).schema for p in chunk_paths]
+        schema = _unified_schema(schemas)  # pandas metadata dropped; it can differ per chunk
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for chunk_path in chunk_paths:
+                with pa.memory_map(chunk_path, "r") as source:
+                    table = pa.ipc.open_file(source).read_all().replace_schema_metadata(None)
+                for name, field in zip(schema.names, schema):
+                    col = table.column(name)
+                    if col.type != field.type:
+                        col = col.cast(field.type, safe=False) if not pa.types.is_string(field.type) \
+                            else pa.array([None if v is None else str(v) for v in col.to_pylist()], pa.string())
+                        table = table.set_column(table.schema.get_field_index(name), name, col)
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        _prune_cache(keep=path)
+    else:
+        os.utime(path)  # reused: now the newest file as far as pruning goes
+    for chunk_path in chunk_paths:
+        Path(chunk_path).unlink(missing_ok=True)
+    return str(path)
+
+
+def iter_raw_frames(path: str, batch_rows: int = 50_000, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield a stored raw frame in row slices of at most ``batch_rows`` (at least one, possibly empty)."""
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    if table.num_rows == 0:
+        yield table.to_pandas()
+        return
+    for offset in range(0, table.num_rows, batch_rows):
+        yield table.slice(offset, batch_rows).to_pandas(split_blocks=True)
@@ -0,0 +1,98 @@
+# utils/render_timing.py
+import functools
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Per-component render timing
+# ──────────────────────────────────────────────────────────────────────────────
+# ``@timed_render`` wraps a render entry point and records, per rerun, how long
+# it took and how many elements it sent to the browser. History is kept per
+# session (last HISTORY_RERUNS samples per component) in session state; the
+# diagnostics view flags components over the budget. Elements are only counted
+# while diagnostics are on.
+RENDER_BUDGET_MS = float(os.environ.get("TOP_PLAYS_RENDER_BUDGET_MS", "200"))
+HISTORY_RERUNS = 50
+
+
+def diagnostics_enabled() -> bool:
+    """Shown with ``?diagnostics=1`` in the URL or ``TOP_PLAYS_DIAGNOSTICS=1``."""
+    return st.query_params.get("diagnostics") == "1" or os.environ.get("TOP_PLAYS_DIAGNOSTICS") == "1"
+
+
+@contextmanager
+def _counting_elements() -> Iterator[Optional[List[int]]]:
+    """
+    Running count of delta messages sent while the block runs, or None outside
+    a script run or with diagnostics off.
+
+    Streamlit has no public hook for outgoing messages, so this wraps the
+    script-run context's private ``_enqueue`` (as found in Streamlit 1.45) for
+    the duration of the block and always puts it back. It is only installed
+    while diagnostics are on; nested timed renders share the outermost wrapper.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None or not diagnostics_enabled() or not callable(getattr(ctx, "_enqueue", None)):
+        yield None
+        return
+    counter = getattr(ctx, "_render_timing_elements", None)
+    if counter is not None:  # an enclosing timed render is already counting
+        yield counter
+        return
+
+    counter = [0]
+    enqueue = ctx._enqueue
+
+    def counting_enqueue(msg):
+        if msg.HasField("delta"):
+            counter[0] += 1
+        enqueue(msg)
+
+    ctx._enqueue = counting_enqueue
+    ctx._render_timing_elements = counter
+    try:
+        yield counter
+    finally:
+        ctx._enqueue = enqueue
+        del ctx._render_timing_elements
+
+
+def begin_rerun() -> int:
+    """Mark the start of a script rerun (call once at the top of the app); returns its number."""
+    st.session_state.render_rerun = st.session_state.get("render_rerun", 0) + 1
+    return st.session_state.render_rerun
+
+
+def render_history() -> Dict[str, deque]:
+    """Component name → deque of ``{"rerun", "ms", "elements"}`` samples, oldest first."""
+    if "render_timings" not in st.session_state:
+        st.session_state.render_timings = {}
+    return st.session_state.render_timings
+
+
+def timed_render(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Record wall time and element count of every call to ``func`` in the session's history."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _counting_elements() as counter:
+            elements_before = counter[0] if counter else 0
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                history = render_history().setdefault(name, deque(maxlen=HISTORY_RERUNS))
+                history.append({
+                    "rerun": st.session_state.get("render_rerun", 0),
+                    "ms": (time.perf_counter() - started) * 1000,
+                    "elements": (counter[0] - elements_before) if counter else 0,
+                })
+
+    return wrapper
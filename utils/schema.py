@@ -0,0 +1,167 @@
+# utils/schema.py
+import logging
+import zipfile
+from typing import Dict, List
+
+import pandas as pd
+
+from utils.compressed_upload import is_csv_upload, open_export
+
+logger = logging.getLogger(__name__)
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Expected PowerBI export layout
+# ──────────────────────────────────────────────────────────────────────────────
+REQUIRED_COLUMNS = ["System", "Network Code", "Display", "Date & Hour - EST", "# Plays"]
+
+# header aliases that are accepted in place of the canonical column name
+COLUMN_ALIASES = {"Network Code": ("Network_Code",)}
+
+# "Date & Hour - EST" as PowerBI writes it, e.g. "05/07/2025 01:00:00 PM"
+TIMESTAMP_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+# other layouts seen in re-saved exports; no value matches two of them, so the
+# order they are tried in never changes a result
+TIMESTAMP_FORMATS = (
+    TIMESTAMP_FORMAT,
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "ISO8601",  # 2025-05-07 13:00:00, 2025-05-07T13:00
+)
+
+SAMPLE_ROWS = 50
+MAX_BAD_SAMPLE_FRACTION = 0.5  # tolerate e.g. a trailing "Total" row, not a wrong column
+
+
+class SchemaError(ValueError):
+    """The uploaded file is not a usable PowerBI hourly export."""
+
+
+def _format_order(values: pd.Series) -> List[str]:
+    """``TIMESTAMP_FORMATS`` with the first one that parses every sampled value moved to the front."""
+    sample = values.dropna().head(SAMPLE_ROWS)
+    for fmt in TIMESTAMP_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            return [fmt] + [other for other in TIMESTAMP_FORMATS if other != fmt]
+    return list(TIMESTAMP_FORMATS)
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Parse export timestamps, vectorised: the layout is picked from the first
+    ``SAMPLE_ROWS`` values and values it misses are retried with the other
+    ``TIMESTAMP_FORMATS`` (workbook datetimes parse under any of them). Only
+    values in none of them fall back to ``format="mixed"``, parsed one by one
+    and logged. Unparseable values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    order = _format_order(values)
+    parsed = pd.to_datetime(values, format=order[0], errors="coerce")
+    retry = parsed.isna() & values.notna()
+    for fmt in order[1:]:
+        if not retry.any():
+            return parsed
+        parsed[retry] = pd.to_datetime(values[retry], format=fmt, errors="coerce")
+        retry &= parsed.isna()
+    if retry.any():
+        logger.warning(
+            "%d timestamps match no known layout (e.g. %r); parsing them one by one",
+            int(retry.sum()), values[retry].iloc[0],
+        )
+        parsed[retry] = pd.to_datetime(values[retry], format="mixed", errors="coerce")
+    return parsed
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  PRE-FLIGHT VALIDATION
+# ──────────────────────────────────────────────────────────────────────────────
+def read_sample(uploaded_file, nrows: int = SAMPLE_ROWS) -> pd.DataFrame:
+    """Read the header plus the first ``nrows`` rows, leaving the file position untouched."""
+    return next(iter(read_samples(uploaded_file, nrows).values()))
+
+
+def read_samples(uploaded_file, nrows: int = SAMPLE_ROWS) -> Dict[str, pd.DataFrame]:
+    """
+    Header plus the first ``nrows`` rows of every sheet (sheet name → sample;
+    a CSV is one sheet named ``""``), leaving the file position untouched.
+    """
+    position = uploaded_file.tell()
+    try:
+        csv = is_csv_upload(uploaded_file)
+        with open_export(uploaded_file) as stream:  # compressed CSVs: only the first block is inflated
+            if csv:
+                return {"": pd.read_csv(stream, nrows=nrows)}
+            with pd.ExcelFile(stream) as workbook:
+                return {name: workbook.parse(name, nrows=nrows) for name in workbook.sheet_names}
+    except pd.errors.EmptyDataError as exc:
+        raise SchemaError(f"'{uploaded_file.name}' is empty.") from exc
+    except (pd.errors.ParserError, ValueError, OSError, EOFError, zipfile.BadZipFile) as exc:
+        raise SchemaError(f"Could not read '{uploaded_file.name}': {exc}") from exc
+    finally:
+        uploaded_file.seek(position)
+
+
+def data_sheet_names(samples: Dict[str, pd.DataFrame]) -> List[str]:
+    """Sheets with any content – blank sheets in a workbook are skipped, not rejected."""
+    return [name for name, sample in samples.items() if len(sample.columns) or len(sample)]
+
+
+def _check_sample_type(sample: pd.DataFrame, column: str, parsed: pd.Series, expected: str) -> None:
+    """Raise if too many non-empty sample values in ``column`` failed to parse."""
+    values = sample[column]
+    present = values.notna() & (values.astype(str).str.strip() != "")
+    bad = parsed.isna() & present
+    if not present.any() or bad.sum() / present.sum() > MAX_BAD_SAMPLE_FRACTION:
+        example = values[bad].astype(str).iloc[0] if bad.any() else ""
+        raise SchemaError(
+            f"Column '{column}' should contain {expected}"
+            + (f" – found '{example}'." if example else ", but the first rows are empty.")
+        )
+
+
+def validate_upload(uploaded_file) -> List[str]:
+    """
+    Check required columns and sample value types from the header and first rows
+    only, so a wrong export is rejected before the full parse. Every non-blank
+    sheet of a workbook must pass, since all of them are merged. Returns those
+    sheets in workbook order ([] for a CSV) for ``process_file``; raises ``SchemaError``.
+    """
+    samples = read_samples(uploaded_file)
+    sheets = data_sheet_names(samples)
+    if not sheets:
+        raise SchemaError(f"'{uploaded_file.name}' is empty.")
+    for sheet in sheets:
+        try:
+            _validate_sample(samples[sheet], uploaded_file.name)
+        except SchemaError as exc:
+            if len(sheets) > 1:
+                raise SchemaError(f"Sheet '{sheet}': {exc}") from exc
+            raise
+    return [] if is_csv_upload(uploaded_file) else sheets
+
+
+def _validate_sample(sample: pd.DataFrame, file_name: str) -> None:
+    columns = [str(c).strip() for c in sample.columns]
+    sample.columns = columns
+
+    missing: List[str] = [
+        col for col in REQUIRED_COLUMNS
+        if col not in columns and not any(a in columns for a in COLUMN_ALIASES.get(col, ()))
+    ]
+    if missing:
+        raise SchemaError(
+            "This doesn't look like a PowerBI hourly export – missing column(s): "
+            + ", ".join(f"'{c}'" for c in missing)
+            + ". Found: "
+            + (", ".join(f"'{c}'" for c in columns) or "no columns")
+            + "."
+        )
+
+    if sample.empty:
+        raise SchemaError(f"'{file_name}' has a header row but no data rows.")
+
+    _check_sample_type(sample, "# Plays",
+                       pd.to_numeric(sample["# Plays"], errors="coerce"), "numbers")
+    _check_sample_type(sample, "Date & Hour - EST",
+                       parse_timestamps(sample["Date & Hour - EST"]), "dates with hours")
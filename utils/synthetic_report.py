@@ -0,0 +1,111 @@
+# utils/synthetic_report.py
+import gzip
+import hashlib
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.Common_pb2 import FileURLs
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+from components.market_drilldown import AIRPORT_TO_MARKET
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Synthetic PowerBI hourly exports (load tests, benchmarks, demos)
+# ──────────────────────────────────────────────────────────────────────────────
+# Rows follow the real export layout: airport networks (AdPortal / RTB AdServer)
+# with several displays each, plus SpotChart roadside boards named
+# <digits><market><digits>. Plays follow a day-shaped curve per airport so
+# prime windows come out realistic.
+AIRPORT_SYSTEMS = ("AdPortal", "RTB AdServer")
+ROADSIDE_SYSTEM = "SpotChart"
+NETWORK_SUFFIXES = ("DIG", "WALL", "BAG", "GATE")
+ROADSIDE_MARKETS = ("ATL", "MIA", "DAL", "HOU", "PHX")
+ROADSIDE_SHARE = 0.2
+START_DATE = "2025-05-01"
+
+
+def _hour_curve(rng: np.random.Generator) -> np.ndarray:
+    """Relative plays per hour of day: a quiet night plus one or two busy bumps."""
+    hours = np.arange(24)
+    curve = np.full(24, 0.15)
+    for _ in range(rng.integers(1, 3)):
+        peak, width = rng.integers(7, 21), rng.uniform(1.5, 4.0)
+        curve += rng.uniform(0.6, 1.0) * np.exp(-0.5 * ((hours - peak) / width) ** 2)
+    return curve / curve.max()
+
+
+def generate_report(
+    n_rows: int = 20_000,
+    days: int = 14,
+    n_airports: int = 12,
+    displays_per_network: int = 4,
+    seed: int = 0,
+    airports: Optional[List[str]] = None,
+    extra_metrics: bool = False,
+) -> pd.DataFrame:
+    """
+    A frame shaped like a PowerBI hourly export with roughly ``n_rows`` rows;
+    ``extra_metrics`` adds ``# Impressions`` and ``Spend`` columns.
+    """
+    rng = np.random.default_rng(seed)
+    if airports is None:
+        codes = sorted(AIRPORT_TO_MARKET)
+        airports = list(rng.choice(codes, size=min(n_airports, len(codes)), replace=False))
+    curves = np.stack([_hour_curve(rng) for _ in airports])  # airport × hour
+
+    networks = [(i, f"{a}_{s}") for i, a in enumerate(airports) for s in NETWORK_SUFFIXES]
+    stamps = pd.date_range(START_DATE, periods=days * 24, freq="h")
+
+    n_roadside = int(n_rows * ROADSIDE_SHARE)
+    n_airport = n_rows - n_roadside
+
+    # ── airport rows ─────────────────────────────────────────────────────
+    pick = rng.integers(0, len(networks), n_airport)
+    airport_idx = np.array([i for i, _ in networks])[pick]
+    network = np.array([code for _, code in networks])[pick]
+    display = np.char.add(np.char.add(network, "-D"), rng.integers(1, displays_per_network + 1, n_airport).astype(str))
+    when = rng.integers(0, len(stamps), n_airport)
+    weight = curves[airport_idx, stamps.hour[when]]
+    airport_rows = pd.DataFrame({
+        "System": rng.choice(AIRPORT_SYSTEMS, n_airport),
+        "Network Code": network,
+        "Display": display,
+        "Date & Hour - EST": stamps[when],
+        "# Plays": rng.poisson(120 * weight),
+    })
+
+    # ── roadside rows ────────────────────────────────────────────────────
+    when = rng.integers(0, len(stamps), n_roadside)
+    market = rng.choice(ROADSIDE_MARKETS, n_roadside)
+    roadside_rows = pd.DataFrame({
+        "System": ROADSIDE_SYSTEM,
+        "Network Code": None,  # boards carry their market in the display name only
+        "Display": np.char.add(np.char.add(rng.integers(10, 99, n_roadside).astype(str), market),
+                               rng.integers(100, 999, n_roadside).astype(str)),
+        "Date & Hour - EST": stamps[when],
+        "# Plays": rng.poisson(60, n_roadside),
+    })
+
+    df = pd.concat([airport_rows, roadside_rows], ignore_index=True)
+    if extra_metrics:
+        df["# Impressions"] = df["# Plays"] * rng.integers(5, 40, len(df))
+        df["Spend"] = (df["# Impressions"] * rng.uniform(2.0, 12.0, len(df)) / 1000).round(2)
+    df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+    df["Date & Hour - EST"] = df["Date & Hour - EST"].dt.strftime("%m/%d/%Y %I:%M:%S %p")
+    return df
+
+
+def as_upload(data: bytes, name: str, mime: str = "text/csv") -> UploadedFile:
+    """``data`` wrapped in a real ``UploadedFile``, so it hashes (and caches) like a file from ``st.file_uploader``."""
+    file_id = hashlib.sha1(data).hexdigest()
+    return UploadedFile(UploadedFileRec(file_id, name, mime, data), FileURLs(file_id=file_id))
+
+
+def synthetic_upload(n_rows: int = 20_000, seed: int = 0, gzipped: bool = False, **kwargs) -> UploadedFile:
+    """``generate_report`` as an uploaded CSV (``.csv.gz`` with ``gzipped``)."""
+    data = generate_report(n_rows=n_rows, seed=seed, **kwargs).to_csv(index=False).encode("utf-8")
+    name, mime = f"synthetic_{n_rows}_{seed}.csv", "text/csv"
+    if gzipped:
+        data, name, mime = gzip.compress(data, mtime=0), name + ".gz", "application/gzip"
+    return as_upload(data, name, mime)